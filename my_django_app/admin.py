@@ -1,13 +1,177 @@
 from django.contrib import admin
+from django.contrib.admin import widgets
+from django.contrib.admin.views.main import ChangeList
 from django.apps import apps
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections, models, router
+from django.forms.models import BaseInlineFormSet
+from django.utils.functional import cached_property
+from time import monotonic
 import sys
-import inspect
 from . import fields
+from .utils import get_caller_module
 
+_table_sizes = {}
 
-class CustomAdmin(admin.ModelAdmin):
+
+def get_large_table_threshold():
+    return getattr(settings, "ADMIN_LARGE_TABLE_THRESHOLD", 10000)
+
+
+def estimate_count(model, using=None):
+    """The planner's row estimate on PostgreSQL, None elsewhere or before ANALYZE."""
+    connection = connections[using or router.db_for_read(model)]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+            [connection.ops.quote_name(model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    return row[0] if row and row[0] >= 0 else None
+
+
+def is_large_table(model, using=None, max_age=300):
+    """Whether the table has more rows than ADMIN_LARGE_TABLE_THRESHOLD, cached for max_age seconds."""
+    using = using or router.db_for_read(model)
+    key = (using, model._meta.label)
+    cached = _table_sizes.get(key)
+    if cached and monotonic() - cached[1] < max_age:
+        return cached[0]
+
+    threshold = get_large_table_threshold()
+    estimate = estimate_count(model, using)
+    if estimate is None:
+        # COUNT(*) over a LIMIT stops after threshold + 1 rows
+        estimate = model._default_manager.using(using)[: threshold + 1].count()
+    large = estimate > threshold
+    _table_sizes[key] = (large, monotonic())
+    return large
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Uses the planner's estimate instead of COUNT(*) for unfiltered
+    changelists of tables over ADMIN_LARGE_TABLE_THRESHOLD rows.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, models.QuerySet) and not queryset.query.where:
+            estimate = estimate_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > get_large_table_threshold():
+                return estimate
+        return super().count
+
+
+class CustomChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        prefetch = self.model_admin.get_list_prefetch_related(request)
+        return queryset.prefetch_related(*prefetch) if prefetch else queryset
+
+
+class LargeRelationMixin:
+    """
+    Foreign keys and many-to-many fields pointing at large tables get an
+    autocomplete widget when the target's admin can search, else a raw id
+    input, instead of a select listing every row.
+    """
+
+    def get_search_fields(self, request):
+        if self.search_fields:
+            return self.search_fields
+        char_fields = [
+            f.name for f in self.model._meta.fields if isinstance(f, models.CharField)
+        ]
+        return [
+            name
+            for name in char_fields
+            if getattr(self.model._meta.get_field(name), "display", False)
+        ] or char_fields
+
+    def get_large_relation_widget(self, db_field, request, kwargs):
+        if "widget" in kwargs or db_field.name in self.raw_id_fields:
+            return None
+        if db_field.name in self.get_autocomplete_fields(request):
+            return None
+        related = db_field.remote_field.model
+        db = kwargs.get("using")
+        if not is_large_table(related, db):
+            return None
+
+        related_admin = self.admin_site._registry.get(related)
+        if related_admin is not None and related_admin.get_search_fields(request):
+            widget = (
+                widgets.AutocompleteSelectMultiple
+                if db_field.many_to_many
+                else widgets.AutocompleteSelect
+            )
+            return widget(db_field, self.admin_site, using=db)
+        widget = (
+            widgets.ManyToManyRawIdWidget
+            if db_field.many_to_many
+            else widgets.ForeignKeyRawIdWidget
+        )
+        return widget(db_field.remote_field, self.admin_site, using=db)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        widget = self.get_large_relation_widget(db_field, request, kwargs)
+        if widget is not None:
+            kwargs["widget"] = widget
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        widget = self.get_large_relation_widget(db_field, request, kwargs)
+        if widget is not None:
+            kwargs["widget"] = widget
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    per_page = 20
+    page_param = "page"
+    page_number = 1
+
+    def get_queryset(self):
+        if not hasattr(self, "_page_queryset"):
+            paginator = Paginator(super().get_queryset(), self.per_page)
+            self.page = paginator.get_page(self.page_number)
+            self._page_queryset = self.page.object_list
+        return self._page_queryset
+
+
+class PaginatedTabularInline(LargeRelationMixin, admin.TabularInline):
+    """
+    Tabular inline showing one page of the related rows, chosen with
+    ?<model_name>_page=N on the change form.
+    """
+
+    formset = PaginatedInlineFormSet
+    template = "admin/my_django_app/paginated_tabular.html"
+    extra = 1
+
+    @property
+    def per_page(self):
+        return getattr(settings, "ADMIN_INLINE_PER_PAGE", 20)
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.per_page = self.per_page
+        formset.page_param = f"{self.model._meta.model_name}_page"
+        formset.page_number = request.GET.get(formset.page_param, 1)
+        return formset
+
+
+class CustomAdmin(LargeRelationMixin, admin.ModelAdmin):
     model = None
     items = []
+    paginator = EstimatedCountPaginator
+    # The unfiltered total would be one more COUNT(*) per page
+    show_full_result_count = False
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
@@ -25,8 +189,8 @@ class CustomAdmin(admin.ModelAdmin):
             cls.inlines = [
                 type(
                     f"{item.__name__}Inline",
-                    (admin.TabularInline,),
-                    {"model": item, "extra": 1},
+                    (PaginatedTabularInline,),
+                    {"model": item},
                 )
                 for item in cls.items
             ]
@@ -34,36 +198,65 @@ class CustomAdmin(admin.ModelAdmin):
     def get_list_display(self, request):
         return [field.name for field in self.model._meta.fields]
 
+    def get_list_select_related(self, request):
+        """
+        Foreign keys shown in the changelist, plus the display foreign keys
+        their __str__ reads.
+        """
+        if self.list_select_related:
+            return self.list_select_related
+        related = []
+        for field in self.model._meta.fields:
+            if not (field.many_to_one or field.one_to_one):
+                continue
+            if field.name not in self.get_list_display(request):
+                continue
+            related.append(field.name)
+            for sub in field.related_model._meta.fields:
+                if (sub.many_to_one or sub.one_to_one) and getattr(sub, "display", False):
+                    related.append(f"{field.name}__{sub.name}")
+        return related
+
+    def get_list_prefetch_related(self, request):
+        """
+        Many-to-many fields read by __str__ of the rows (for the action
+        checkbox label) and of the listed foreign keys.
+        """
+        prefetch = [
+            m2m.name
+            for m2m in self.model._meta.many_to_many
+            if m2m.related_model is not self.model
+        ]
+        for name in self.get_list_select_related(request) or []:
+            if "__" in name:
+                continue
+            related = self.model._meta.get_field(name).related_model
+            if not issubclass(related, fields.CustomModel):
+                continue
+            for m2m in related._meta.many_to_many:
+                if m2m.related_model is not related:
+                    prefetch.append(f"{name}__{m2m.name}")
+        return prefetch
+
+    def get_changelist(self, request, **kwargs):
+        return CustomChangeList
+
     def has_delete_permission(self, request, obj=None):
         if obj and obj.pk < 0:
             return False
         return super().has_delete_permission(request, obj)
 
 
-def auto_create_admins(models, excluded_models=None):
-
-    frame = inspect.stack()[1]
-    caller_module = inspect.getmodule(frame[0])
-    target_module = caller_module.__name__
-
-    excluded_models = excluded_models or []
-
-    for name in dir(models):
-        obj = getattr(models, name)
-        if name in excluded_models:
-            continue
-        if (
-            isinstance(obj, type)
-            and issubclass(obj, fields.CustomModel)
-            and obj.__module__ == models.__name__
-        ):
-            model_class = obj
-            model_name = model_class.__name__
-            admin_name = f"{model_name}Admin"
-            admin_class = type(
-                name + "Admin",
-                (CustomAdmin,),
-                {"model": model_class},
-            )
-            admin.site.register(model_class, admin_class)
-            setattr(sys.modules[target_module], admin_name, admin_class)
+def auto_create_admins(models, excluded_models=None, target_module=None):
+    target_module = target_module or get_caller_module()
+
+    for name, model_class in fields.iter_custom_models(models, excluded_models):
+        model_name = model_class.__name__
+        admin_name = f"{model_name}Admin"
+        admin_class = type(
+            name + "Admin",
+            (CustomAdmin,),
+            {"model": model_class},
+        )
+        admin.site.register(model_class, admin_class)
+        setattr(sys.modules[target_module], admin_name, admin_class)
@@ -0,0 +1,323 @@
+"""
+GROUP BY aggregation over the filtered queryset of a list endpoint, for
+totals and per-group figures that would otherwise need page=all.
+
+    ?group_by=category,status,created_at__month
+    &measures=count,sum:price,avg:price,min:qty,max:qty,
+              count_distinct:category,sum_product:price*qty
+    &sample=5
+
+Group and measure fields are snake_case or camelCase names, attnames or
+paths through foreign keys (category__parent). A date or datetime group
+may end in __year, __quarter, __month, __week, __day or __date. Measures
+are named <measure>_<field> (sum_price, sum_product_price_qty). sum, avg
+and sum_product take numeric fields; min and max also take dates, times
+and text.
+
+Everything runs as one GROUP BY query. Decimal sums and averages keep the
+field's decimal places. Every column name is a snake_case key (of
+`group_by`, `measures`, `related` and each result), so the renderer
+camelizes them all alike:
+
+    {
+        "group_by": {"category": {"field": "category", "trunc": null}},
+        "measures": {"sum_price": {"measure": "sum", "fields": ["price"]}},
+        "results": [{"category": 3, "sum_price": "120.50"}],
+        "related": {"category": [{"id": 3, "name": "Tools"}]},
+        ...
+    }
+
+sample=N aggregates an N% TABLESAMPLE SYSTEM of the table on PostgreSQL
+and scales count and sum measures by 100/N; other databases ignore it.
+"""
+
+from decimal import Decimal
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, models
+from django.db.models import Avg, Count, ExpressionWrapper, F, Max, Min, Sum
+from django.db.models.functions import Trunc, TruncDate
+from django.db.models.sql.datastructures import BaseTable
+from djangorestframework_camel_case.util import camel_to_underscore
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+
+MEASURES = ("count", "count_distinct", "sum", "avg", "min", "max", "sum_product")
+TRUNC_KINDS = ("year", "quarter", "month", "week", "day", "date")
+SCALED_MEASURES = ("count", "sum", "sum_product")
+NUMERIC_FIELDS = (models.IntegerField, models.FloatField, models.DecimalField)
+ORDERED_FIELDS = NUMERIC_FIELDS + (
+    models.DateField,
+    models.DateTimeField,
+    models.TimeField,
+    models.DurationField,
+    models.CharField,
+    models.TextField,
+)
+
+
+class SampledTable(BaseTable):
+    """Base table of a query read through TABLESAMPLE SYSTEM."""
+
+    def __init__(self, table_name, alias, percent):
+        super().__init__(table_name, alias)
+        self.percent = percent
+
+    def as_sql(self, compiler, connection):
+        sql, params = super().as_sql(compiler, connection)
+        return f"{sql} TABLESAMPLE SYSTEM (%s)", [*params, self.percent]
+
+    # Subqueries relabel their aliases through these
+    def relabeled_clone(self, change_map):
+        return self.__class__(
+            self.table_name,
+            change_map.get(self.table_alias, self.table_alias),
+            self.percent,
+        )
+
+    @property
+    def identity(self):
+        return (*super().identity, self.percent)
+
+
+def resolve_path(model, path, param):
+    """The field a snake_case __ path ends on, through foreign keys only."""
+    attnames = {f.attname: f.name for f in model._meta.concrete_fields}
+    path = attnames.get(path, path)
+    field = None
+    for part in path.split("__"):
+        if field is not None:
+            if not (field.many_to_one or field.one_to_one):
+                raise exceptions.ValidationError({param: f"Cannot follow {path}."})
+            model = field.related_model
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            raise exceptions.ValidationError({param: f"Unknown field {path}."})
+    if not field.concrete or field.many_to_many:
+        raise exceptions.ValidationError({param: f"Cannot aggregate on {path}."})
+    return path, field
+
+
+def check_measure_field(measure, path, field):
+    """Reject fields the measure cannot be computed on."""
+    if field.is_relation or isinstance(field, models.BooleanField):
+        allowed = False
+    elif measure in ("min", "max"):
+        allowed = isinstance(field, ORDERED_FIELDS)
+    else:
+        allowed = isinstance(field, NUMERIC_FIELDS)
+    if not allowed:
+        raise exceptions.ValidationError(
+            {"measures": f"{measure} is not available on {path}."}
+        )
+
+
+def parse_group_by(model, value):
+    """[(alias, path, expression or None, field, trunc kind)] for ?group_by=."""
+    groups = []
+    for name in filter(None, (n.strip() for n in value.split(","))):
+        path = camel_to_underscore(name)
+        kind = None
+        head, _, tail = path.rpartition("__")
+        if head and tail in TRUNC_KINDS:
+            path, kind = head, tail
+        path, field = resolve_path(model, path, "group_by")
+        if kind is None:
+            if "__" in path:
+                groups.append((path.replace("__", "_"), path, F(path), field, None))
+            else:
+                groups.append((path, path, None, field, None))
+            continue
+        if not isinstance(field, (models.DateField, models.DateTimeField)):
+            raise exceptions.ValidationError(
+                {"group_by": f"{path} is not a date or datetime."}
+            )
+        expression = TruncDate(path) if kind == "date" else Trunc(path, kind)
+        groups.append(
+            (f"{path}_{kind}".replace("__", "_"), path, expression, field, kind)
+        )
+    return groups
+
+
+def widen(field, extra_digits=10):
+    """Output field for sums of a decimal field: same places, room for the total."""
+    return models.DecimalField(
+        max_digits=field.max_digits + extra_digits,
+        decimal_places=field.decimal_places,
+    )
+
+
+def product_output(a, b):
+    if isinstance(a, models.FloatField) or isinstance(b, models.FloatField):
+        return models.FloatField()
+    if isinstance(a, models.DecimalField) or isinstance(b, models.DecimalField):
+        digits = [getattr(f, "max_digits", 19) for f in (a, b)]
+        places = [getattr(f, "decimal_places", 0) for f in (a, b)]
+        return models.DecimalField(
+            max_digits=sum(digits) + 10, decimal_places=sum(places)
+        )
+    return models.BigIntegerField()
+
+
+def parse_measures(model, value):
+    """{alias: (measure, aggregate, decimal places or None, paths)} for ?measures=."""
+    measures = {}
+    for item in filter(None, (m.strip() for m in (value or "count").split(","))):
+        measure, _, target = item.partition(":")
+        measure = camel_to_underscore(measure)
+        if measure not in MEASURES:
+            raise exceptions.ValidationError(
+                {"measures": f"Choose measures from {', '.join(MEASURES)}."}
+            )
+        if measure == "count":
+            measures["count"] = ("count", Count("pk"), None, [])
+            continue
+        if not target:
+            raise exceptions.ValidationError({"measures": f"{measure} needs a field."})
+
+        if measure == "sum_product":
+            names = [camel_to_underscore(n.strip()) for n in target.split("*")]
+            if len(names) != 2:
+                raise exceptions.ValidationError(
+                    {"measures": "sum_product takes two fields: a*b."}
+                )
+            resolved = [resolve_path(model, n, "measures") for n in names]
+            (a_path, a), (b_path, b) = resolved
+            check_measure_field(measure, a_path, a)
+            check_measure_field(measure, b_path, b)
+            output = product_output(a, b)
+            aggregate = Sum(
+                ExpressionWrapper(F(a_path) * F(b_path), output_field=output),
+                output_field=output,
+            )
+            alias = f"sum_product_{a_path}_{b_path}".replace("__", "_")
+            places = getattr(output, "decimal_places", None)
+            measures[alias] = (measure, aggregate, places, [a_path, b_path])
+            continue
+
+        path, field = resolve_path(model, camel_to_underscore(target), "measures")
+        if measure != "count_distinct":
+            check_measure_field(measure, path, field)
+        decimal = isinstance(field, models.DecimalField)
+        places = field.decimal_places if decimal else None
+        if measure == "count_distinct":
+            aggregate, places = Count(path, distinct=True), None
+        elif measure == "sum":
+            aggregate = Sum(path, output_field=widen(field)) if decimal else Sum(path)
+        elif measure == "avg":
+            aggregate = (
+                Avg(path, output_field=widen(field)) if decimal else Avg(path)
+            )
+        else:
+            aggregate = (Min if measure == "min" else Max)(path)
+        alias = f"{measure}_{path}".replace("__", "_")
+        measures[alias] = (measure, aggregate, places, [path])
+    return measures
+
+
+def to_number(value, places):
+    if value is None or not isinstance(value, (Decimal, float)) or places is None:
+        return value
+    value = Decimal(str(value)).quantize(Decimal(1).scaleb(-places))
+    return str(value) if api_settings.COERCE_DECIMAL_TO_STRING else float(value)
+
+
+def get_related_labels(queryset, groups, rows):
+    """{alias: [{"id", "name"}]} for the foreign key and choice values of the groups."""
+    from .viewsets import annotate_display_name
+
+    related = {}
+    for alias, _, _, field, kind in groups:
+        if kind is not None:
+            continue
+        values = {row[alias] for row in rows if row[alias] is not None}
+        if not values:
+            continue
+        if field.many_to_one or field.one_to_one:
+            manager = field.related_model._default_manager.using(queryset.db)
+            labels = dict(
+                annotate_display_name(manager.filter(pk__in=values)).values_list(
+                    "pk", "display_name"
+                )
+            )
+        elif field.choices:
+            labels = dict(field.flatchoices)
+        else:
+            continue
+        related[alias] = [
+            {"id": value, "name": str(labels.get(value, value))}
+            for value in sorted(values, key=str)
+        ]
+    return related
+
+
+def aggregate_queryset(queryset, group_by="", measures="", sample=None, max_groups=10000):
+    """The grouped measures of a filtered queryset, as a response body."""
+    model = queryset.model
+    groups = parse_group_by(model, group_by or "")
+    measures = parse_measures(model, measures)
+
+    percent = None
+    if sample:
+        try:
+            percent = float(sample)
+        except ValueError:
+            percent = 0
+        if not 0 < percent <= 100:
+            raise exceptions.ValidationError({"sample": "Use a percentage in (0, 100]."})
+        if percent == 100 or connections[queryset.db].vendor != "postgresql":
+            percent = None
+
+    # The list ordering would be added to the GROUP BY
+    queryset = queryset.order_by()
+    aggregates = {alias: aggregate for alias, (_, aggregate, _, _) in measures.items()}
+    if percent is not None:
+        query = queryset.query
+        alias = query.get_initial_alias()
+        query.alias_map[alias] = SampledTable(model._meta.db_table, alias, percent)
+
+    aliases = [alias for alias, *_ in groups]
+    if groups:
+        queryset = (
+            queryset.values(
+                *[alias for alias, _, e, _, _ in groups if e is None],
+                **{alias: e for alias, _, e, _, _ in groups if e is not None},
+            )
+            .annotate(**aggregates)
+            .order_by(*aliases)
+        )
+        rows = list(queryset[: max_groups + 1])
+    else:
+        rows = [queryset.aggregate(**aggregates)]
+    truncated = len(rows) > max_groups
+    rows = rows[:max_groups]
+
+    scale = Decimal(100) / Decimal(str(percent)) if percent else None
+    results = []
+    for row in rows:
+        result = {alias: row[alias] for alias in aliases}
+        for alias, (measure, _, places, _) in measures.items():
+            value = row[alias]
+            if scale is not None and value is not None and measure in SCALED_MEASURES:
+                if isinstance(value, Decimal):
+                    value *= scale
+                elif isinstance(value, float):
+                    value *= float(scale)
+                else:
+                    value = round(value * scale)
+            result[alias] = to_number(value, places)
+        results.append(result)
+
+    return {
+        "group_by": {
+            alias: {"field": path, "trunc": kind} for alias, path, _, _, kind in groups
+        },
+        "measures": {
+            alias: {"measure": measure, "fields": paths}
+            for alias, (measure, _, _, paths) in measures.items()
+        },
+        "results": results,
+        "related": get_related_labels(queryset, groups, rows),
+        "sample": percent,
+        "truncated": truncated,
+    }
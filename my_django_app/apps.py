@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class MyDjangoAppConfig(AppConfig):
+    name = "my_django_app"
+
+    def ready(self):
+        from . import checks  # noqa: F401
@@ -0,0 +1,321 @@
+"""
+Benchmarks for the generic REST stack.
+
+Synthetic CustomModels are created in a throwaway test database (SQLite
+by default, or any configured alias such as a Postgres one) and the hot
+paths are timed against them. Each case records wall time, query count
+and peak Python memory.
+
+    python manage.py benchmark --output bench.json
+    python manage.py benchmark --baseline bench.json
+"""
+
+import json
+import platform
+import random
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+from functools import lru_cache
+from statistics import median
+from time import perf_counter
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from . import fields
+from .paginations import CustomPagination
+from .serializers import CustomSerializer
+from .utils import generate_period_list
+from .viewsets import CustomModelViewSet, annotate_display_name
+
+STATUS_CHOICES = [(0, "Draft"), (1, "Active"), (2, "Archived")]
+LABEL_CHOICES = ["red", "green", "blue", "small", "large"]
+
+
+@lru_cache(maxsize=None)
+def get_models():
+    """Define the synthetic models on first use, so importing this module registers nothing."""
+
+    class BenchCategory(fields.CustomModel):
+        name = fields.ShortCharField(display=True)
+        parent = fields.SetNullOptionalForeignKey("self")
+
+        class Meta:
+            app_label = "my_django_app"
+
+    class BenchTag(fields.CustomModel):
+        name = fields.ShortCharField(display=True)
+
+        class Meta:
+            app_label = "my_django_app"
+
+    class BenchItem(fields.CustomModel):
+        name = fields.MediumCharField(display=True)
+        category = fields.CascadeRequiredForeignKey(BenchCategory, display=True)
+        tags = fields.OptionalManyToManyField(BenchTag)
+        status = fields.ChoiceIntegerField(STATUS_CHOICES, display=True)
+        price = fields.AmountField()
+        qty = fields.LimitedIntegerField(0, 1000, 1)
+        is_featured = fields.DefaultBooleanField(False, display=True)
+        labels = fields.ChoicesStringArrayField(choices=LABEL_CHOICES)
+        sizes = fields.NumberArrayField()
+        happened_at = fields.DefaultNowField()
+
+        class Meta:
+            app_label = "my_django_app"
+
+    return BenchCategory, BenchTag, BenchItem
+
+
+@lru_cache(maxsize=None)
+def get_viewset():
+    _, _, BenchItem = get_models()
+
+    class BenchItemSerializer(CustomSerializer):
+        class Meta:
+            model = BenchItem
+            fields = "__all__"
+
+    class BenchItemViewSet(CustomModelViewSet):
+        queryset = BenchItem.objects.all()
+        serializer_class = BenchItemSerializer
+
+    return BenchItemViewSet
+
+
+class BenchRouter:
+    """Sends every query to the benchmark database."""
+
+    def __init__(self, using):
+        self.using = using
+
+    def db_for_read(self, model, **hints):
+        return self.using
+
+    def db_for_write(self, model, **hints):
+        return self.using
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+def create_tables(using):
+    with connections[using].schema_editor() as editor:
+        for model in get_models():
+            editor.create_model(model)
+
+
+def populate(rows, using, seed=0):
+    BenchCategory, BenchTag, BenchItem = get_models()
+    rng = random.Random(seed)
+    words = ["alpha", "beta", "gamma", "delta", "omega", "sigma", "kappa", "theta"]
+
+    categories = BenchCategory.objects.using(using).bulk_create(
+        BenchCategory(name=f"{w}-{i}") for i, w in enumerate(words * 6)
+    )
+    for category in categories[len(words) :]:
+        category.parent = rng.choice(categories[: len(words)])
+    BenchCategory.objects.using(using).bulk_update(categories, ["parent"])
+
+    tags = BenchTag.objects.using(using).bulk_create(
+        BenchTag(name=f"tag-{i}") for i in range(30)
+    )
+
+    now = timezone.now()
+    items = BenchItem.objects.using(using).bulk_create(
+        (
+            BenchItem(
+                name=f"{rng.choice(words)} {rng.choice(words)} {i}",
+                category=rng.choice(categories),
+                status=rng.choice(STATUS_CHOICES)[0],
+                price=Decimal(rng.randint(100, 100000)) / 100,
+                qty=rng.randint(0, 1000),
+                is_featured=rng.random() < 0.1,
+                labels=rng.sample(LABEL_CHOICES, rng.randint(0, 3)),
+                sizes=[rng.randint(1, 50) for _ in range(rng.randint(0, 4))],
+                happened_at=now - timedelta(minutes=rng.randint(0, 60 * 24 * 730)),
+            )
+            for i in range(rows)
+        ),
+        batch_size=500,
+    )
+
+    Through = BenchItem.tags.through
+    Through.objects.using(using).bulk_create(
+        (
+            Through(benchitem_id=item.pk, benchtag_id=tag.pk)
+            for item in items
+            for tag in rng.sample(tags, 3)
+        ),
+        batch_size=1000,
+    )
+
+
+def measure(func, using, repeat):
+    """Wall time over `repeat` runs, queries of one run and peak memory of one run."""
+    connection = connections[using]
+    timings = []
+    for _ in range(repeat):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        # Not CaptureQueriesContext: its log is capped at 9000 queries
+        with connection.execute_wrapper(count):
+            start = perf_counter()
+            func()
+            timings.append(perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "min_ms": min(timings) * 1000,
+        "median_ms": median(timings) * 1000,
+        "max_ms": max(timings) * 1000,
+        "queries": queries,
+        "peak_kb": peak / 1024,
+    }
+
+
+def get_cases(sample_size=200):
+    """name -> callable for every benchmarked hot path."""
+    _, _, BenchItem = get_models()
+    viewset = get_viewset()
+    factory = APIRequestFactory()
+    user = User(username="benchmark", is_active=True, is_superuser=True)
+    list_view = viewset.as_view({"get": "list"})
+
+    def list_request(params):
+        def run():
+            request = factory.get("/bench-items/", params)
+            force_authenticate(request, user=user)
+            response = list_view(request)
+            response.render()
+
+        return run
+
+    def sample():
+        return list(BenchItem.objects.order_by("id")[:sample_size])
+
+    def build_field_metadata():
+        paginator = CustomPagination()
+        paginator.model = BenchItem
+        paginator.build_field_metadata(sample(), None)
+
+    def serializer_many():
+        viewset.serializer_class(sample(), many=True).data
+
+    def model_str():
+        [str(obj) for obj in sample()]
+
+    def display_name():
+        list(
+            annotate_display_name(BenchItem.objects.all()).values_list(
+                "display_name", flat=True
+            )[:1000]
+        )
+
+    def period_list():
+        generate_period_list(BenchItem.objects.all(), "happened_at", "year", "month")
+        generate_period_list(BenchItem.objects.all(), "happened_at", "year", "week")
+
+    return {
+        "list": list_request({}),
+        "list_filter": list_request({"status": "1", "qty__gte": "100"}),
+        "list_search": list_request({"name__search": "alpha beta"}),
+        "list_page_all": list_request({"page": "all", "status": "2"}),
+        "build_field_metadata": build_field_metadata,
+        "serializer_many": serializer_many,
+        "model_str": model_str,
+        "annotate_display_name": display_name,
+        "generate_period_list": period_list,
+    }
+
+
+def run_cases(using="default", rows=2000, repeat=5, only=None):
+    """Create and populate the synthetic tables on `using`, then time the cases."""
+    # The list cases go through APIRequestFactory, whose host is testserver
+    with override_settings(
+        DATABASE_ROUTERS=[BenchRouter(using)],
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+    ):
+        create_tables(using)
+        populate(rows, using)
+        results = {}
+        for name, func in get_cases().items():
+            if only and name not in only:
+                continue
+            func()  # warm caches before timing
+            results[name] = measure(func, using, repeat)
+    return results
+
+
+def run_benchmarks(using="default", rows=2000, repeat=5, only=None):
+    """Run every case in a fresh test database and return the report."""
+    connection = connections[using]
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        results = run_cases(using, rows, repeat, only)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    return {
+        "meta": {
+            "vendor": connection.vendor,
+            "django": django.get_version(),
+            "python": platform.python_version(),
+            "rows": rows,
+            "repeat": repeat,
+            "created_at": timezone.now().isoformat(),
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, threshold=1.1):
+    """
+    Cases whose median time grew by more than `threshold`, or whose query
+    count grew at all, compared to the baseline report.
+    """
+    regressions = []
+    for name, result in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        ratio = result["median_ms"] / base["median_ms"] if base["median_ms"] else 1
+        if ratio > threshold or result["queries"] > base["queries"]:
+            regressions.append(
+                {
+                    "case": name,
+                    "ratio": ratio,
+                    "median_ms": result["median_ms"],
+                    "baseline_median_ms": base["median_ms"],
+                    "queries": result["queries"],
+                    "baseline_queries": base["queries"],
+                }
+            )
+    return regressions
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
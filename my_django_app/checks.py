@@ -0,0 +1,60 @@
+from django.apps import apps
+from django.core.checks import Tags, Warning, register
+from .fields import BaseArrayField, CustomModel, IndexedFieldMixin
+
+
+def get_leading_columns(model):
+    """Fields some index or unique constraint of the model starts with."""
+    leading = set()
+    for index in model._meta.indexes:
+        if index.fields:
+            leading.add(index.fields[0].lstrip("-"))
+    for constraint in model._meta.constraints:
+        if getattr(constraint, "fields", None):
+            leading.add(constraint.fields[0])
+    for fields in model._meta.unique_together:
+        leading.add(fields[0])
+    return leading
+
+
+@register(Tags.models, Tags.database)
+def check_filter_indexes(app_configs=None, **kwargs):
+    """
+    Foreign keys and choice fields of the generated list endpoints are the
+    usual filters; warn about the ones no index starts with.
+    """
+    errors = []
+    if app_configs is None:
+        models = apps.get_models()
+    else:
+        models = [m for config in app_configs for m in config.get_models()]
+    for model in models:
+        if not issubclass(model, CustomModel) or not model._meta.managed:
+            continue
+        leading = get_leading_columns(model)
+        for field in model._meta.concrete_fields:
+            if field.primary_key or field.unique or field.db_index:
+                continue
+            if field.name in leading:
+                continue
+            if field.many_to_one:
+                kind = "Foreign key"
+            elif field.choices and not isinstance(field, BaseArrayField):
+                kind = "Choice field"
+            else:
+                continue
+            # Only the field helpers with IndexedFieldMixin take indexed=
+            if isinstance(field, IndexedFieldMixin):
+                hint = "Pass indexed=True to the field"
+            else:
+                hint = "Set db_index=True on the field"
+            errors.append(
+                Warning(
+                    f"{kind} {model._meta.label}.{field.name} is filterable "
+                    "in list endpoints but no index starts with it.",
+                    hint=f"{hint} or add a Meta index leading with it.",
+                    obj=field,
+                    id="my_django_app.W001",
+                )
+            )
+    return errors
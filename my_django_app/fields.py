@@ -1,16 +1,62 @@
-from django.db import models
+from django.db import models, transaction, router, connections
 from django.utils import timezone
+from django.utils.module_loading import import_string
+from django.utils.functional import SimpleLazyObject, lazy
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.core.exceptions import ValidationError
+from django.core.exceptions import ValidationError, ImproperlyConfigured
 from django import forms
 from datetime import datetime, time
-from django.utils import timezone, formats
+from django.utils import formats
 import re
-import inflect
-from django.db.models import BooleanField, DateField, DateTimeField
+import json
+import uuid
+from time import sleep
+from django.db.models import BooleanField, DateField, DateTimeField, Max, Q
+from django.db.models import Lookup
+from django.db.models.lookups import FieldGetDbPrepValueMixin
+from .utils import get_inflect_engine, pluralize
+from .indexes import (
+    AliveIndex,
+    ArrayIndex,
+    DeadIndex,
+    PartialIndex,
+    TrigramIndex,
+    add_field_index,
+    add_field_constraint,
+)
+from .storage import get_content_storage
+
+
+class IndexedFieldMixin:
+    """
+    indexed=True adds a B-tree index on the field, whatever Meta the model
+    ends up inheriting. display=True char fields get a trigram index for
+    the __search filters unless indexed=False.
+    """
+
+    def __init__(self, *args, indexed=None, **kwargs):
+        self.indexed = indexed
+        super().__init__(*args, **kwargs)
+
+    def get_field_indexes(self, cls, name):
+        indexes = []
+        if self.indexed:
+            indexes.append(models.Index(fields=[name]))
+        if (
+            self.indexed is not False
+            and getattr(self, "display", False)
+            and isinstance(self, models.CharField)
+        ):
+            indexes.append(TrigramIndex(fields=[name]))
+        return indexes
+
+    def contribute_to_class(self, cls, name, **kwargs):
+        super().contribute_to_class(cls, name, **kwargs)
+        for index in self.get_field_indexes(cls, name):
+            add_field_index(cls, index)
 
 
-class AmountField(models.DecimalField):
+class AmountField(IndexedFieldMixin, models.DecimalField):
     def __init__(self, display=False, *args, **kwargs):
         self.display = display
         kwargs.setdefault("max_digits", 10)
@@ -18,7 +64,7 @@ class AmountField(models.DecimalField):
         super().__init__(*args, **kwargs)
 
 
-class LimitedIntegerField(models.IntegerField):
+class LimitedIntegerField(IndexedFieldMixin, models.IntegerField):
     """
     A IntegerField with optional min, max, and default value via positional args.
 
@@ -66,7 +112,7 @@ class LimitedIntegerField(models.IntegerField):
         super().__init__(**kwargs)
 
 
-class DecimalField(models.DecimalField):
+class DecimalField(IndexedFieldMixin, models.DecimalField):
     def __init__(self, display=False, *args, **kwargs):
         self.display = display
         kwargs.setdefault("max_digits", 10)
@@ -74,7 +120,7 @@ class DecimalField(models.DecimalField):
         super().__init__(*args, **kwargs)
 
 
-class LongCharField(models.CharField):
+class LongCharField(IndexedFieldMixin, models.CharField):
     def __init__(self, display=False, *args, **kwargs):
         self.display = display
         kwargs.setdefault("max_length", 1023)
@@ -83,7 +129,7 @@ class LongCharField(models.CharField):
         super().__init__(*args, **kwargs)
 
 
-class MediumCharField(models.CharField):
+class MediumCharField(IndexedFieldMixin, models.CharField):
     def __init__(self, display=False, *args, **kwargs):
         self.display = display
         kwargs.setdefault("max_length", 255)
@@ -92,7 +138,7 @@ class MediumCharField(models.CharField):
         super().__init__(*args, **kwargs)
 
 
-class ShortCharField(models.CharField):
+class ShortCharField(IndexedFieldMixin, models.CharField):
     def __init__(self, display=False, *args, **kwargs):
         self.display = display
         kwargs.setdefault("max_length", 50)
@@ -101,7 +147,7 @@ class ShortCharField(models.CharField):
         super().__init__(*args, **kwargs)
 
 
-class ColorField(models.CharField):
+class ColorField(IndexedFieldMixin, models.CharField):
     def __init__(self, display=False, *args, **kwargs):
         self.display = display
         kwargs.setdefault("max_length", 7)
@@ -111,7 +157,7 @@ class ColorField(models.CharField):
         super().__init__(*args, **kwargs)
 
 
-class AutoCreatedAtField(models.DateTimeField):
+class AutoCreatedAtField(IndexedFieldMixin, models.DateTimeField):
     """
     Automatically sets the datetime when the object is first created.
     Equivalent to auto_now_add=True. Not editable.
@@ -123,10 +169,13 @@ class AutoCreatedAtField(models.DateTimeField):
         super().__init__(*args, **kwargs)
 
 
-class AutoUpdatedAtField(models.DateTimeField):
+class AutoUpdatedAtField(IndexedFieldMixin, models.DateTimeField):
     """
     Automatically updates the datetime every time the object is saved.
     Equivalent to auto_now=True. Not editable.
+
+    indexed=True indexes (updated_at, id), the watermark incremental syncs
+    filter and page on.
     """
 
     def __init__(self, display=False, *args, **kwargs):
@@ -134,8 +183,14 @@ class AutoUpdatedAtField(models.DateTimeField):
         kwargs.setdefault("auto_now", True)
         super().__init__(*args, **kwargs)
 
+    def get_field_indexes(self, cls, name):
+        if not self.indexed:
+            return []
+        pk = cls._meta.pk.name if cls._meta.pk else "id"
+        return [models.Index(fields=[name, pk])]
+
 
-class DefaultNowField(models.DateTimeField):
+class DefaultNowField(IndexedFieldMixin, models.DateTimeField):
     """
     Sets the default datetime to now, but allows manual editing.
     Useful for editable timestamps that default to current time.
@@ -149,7 +204,7 @@ class DefaultNowField(models.DateTimeField):
         super().__init__(*args, **kwargs)
 
 
-class DefaultTodayField(models.DateField):
+class DefaultTodayField(IndexedFieldMixin, models.DateField):
     """
     Sets the default date to now, but allows manual editing.
     Useful for editable timestamps that default to current time.
@@ -163,7 +218,7 @@ class DefaultTodayField(models.DateField):
         super().__init__(*args, **kwargs)
 
 
-class OptionalDateTimeField(models.DateTimeField):
+class OptionalDateTimeField(IndexedFieldMixin, models.DateTimeField):
     """
     A fully optional DateTimeField with no default.
     Useful for fields that may be left empty (e.g. closed_at, due_at).
@@ -176,7 +231,7 @@ class OptionalDateTimeField(models.DateTimeField):
         super().__init__(*args, **kwargs)
 
 
-class OptionalDateField(models.DateField):
+class OptionalDateField(IndexedFieldMixin, models.DateField):
     """
     A fully optional DateTimeField with no default.
     Useful for fields that may be left empty (e.g. closed_at, due_at).
@@ -189,7 +244,7 @@ class OptionalDateField(models.DateField):
         super().__init__(*args, **kwargs)
 
 
-class ChoiceIntegerField(models.IntegerField):
+class ChoiceIntegerField(IndexedFieldMixin, models.IntegerField):
     """
     IntegerField that accepts choices as first positional argument.
     Automatically sets default to 0. Safe for migrations.
@@ -224,7 +279,7 @@ class ChoiceIntegerField(models.IntegerField):
         return name, path, args, kwargs
 
 
-class DefaultBooleanField(models.BooleanField):
+class DefaultBooleanField(IndexedFieldMixin, models.BooleanField):
     """
     BooleanField where the first argument is treated as the default value.
     Usage:
@@ -245,7 +300,7 @@ class DefaultBooleanField(models.BooleanField):
         return name, path, args, kwargs
 
 
-class OptionalLimitedTimeField(models.TimeField):
+class OptionalLimitedTimeField(IndexedFieldMixin, models.TimeField):
     """
     A TimeField that:
     - Accepts only 'h:mm AM/PM' format from user input
@@ -430,7 +485,7 @@ class OneToOneField(OneToOneField):
         super().__init__(to, *args, **kwargs)
 
 
-class OptionalEmailField(models.EmailField):
+class OptionalEmailField(IndexedFieldMixin, models.EmailField):
     """
     EmailField with null=True, blank=True by default.
     """
@@ -442,7 +497,7 @@ class OptionalEmailField(models.EmailField):
         super().__init__(*args, **kwargs)
 
 
-class OptionalURLField(models.URLField):
+class OptionalURLField(IndexedFieldMixin, models.URLField):
     """
     EmailField with null=True, blank=True by default.
     """
@@ -454,7 +509,7 @@ class OptionalURLField(models.URLField):
         super().__init__(*args, **kwargs)
 
 
-class LimitedDecimalField(models.DecimalField):
+class LimitedDecimalField(IndexedFieldMixin, models.DecimalField):
     """
     A DecimalField with optional min, max, and default value via positional args.
 
@@ -510,7 +565,7 @@ class LimitedDecimalField(models.DecimalField):
         super().__init__(**kwargs)
 
 
-class OptionalLimitedDecimalField(models.DecimalField):
+class OptionalLimitedDecimalField(IndexedFieldMixin, models.DecimalField):
     """
     A DecimalField with optional min, max, and default value via positional args.
 
@@ -564,6 +619,16 @@ class OptionalLimitedDecimalField(models.DecimalField):
 
 
 class BaseArrayField(models.JSONField):
+    """
+    List of base_type values stored as JSON.
+
+    native=True stores the list as a PostgreSQL array (text[]/integer[])
+    and falls back to JSON on other databases. indexed=True adds a GIN
+    index backing the has/contains, overlaps and contained_by lookups.
+    """
+
+    native_db_types = {str: "text", int: "integer", float: "double precision"}
+
     def __init__(
         self,
         choices=None,
@@ -571,9 +636,13 @@ class BaseArrayField(models.JSONField):
         min_items=None,
         max_items=None,
         display=False,
+        native=False,
+        indexed=False,
         **kwargs,
     ):
         self.display = display
+        self.native = native
+        self.indexed = indexed
         kwargs.setdefault("blank", True)
         kwargs.setdefault("default", list)
 
@@ -591,10 +660,40 @@ class BaseArrayField(models.JSONField):
         else:
             self.choices = None
             self.valid_choices = []
+        self.valid_choice_set = frozenset(self.valid_choices)
 
         super().__init__(**kwargs)
         self.validators.append(self._validate_array)
 
+    def contribute_to_class(self, cls, name, **kwargs):
+        super().contribute_to_class(cls, name, **kwargs)
+        if self.indexed:
+            add_field_index(cls, ArrayIndex(fields=[name]))
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.native:
+            kwargs["native"] = True
+        return name, path, args, kwargs
+
+    def is_native(self, connection):
+        return self.native and connection.vendor == "postgresql"
+
+    def db_type(self, connection):
+        if self.is_native(connection):
+            return "%s[]" % self.native_db_types.get(self.base_type, "text")
+        return super().db_type(connection)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if self.is_native(connection):
+            return value if value is None else list(value)
+        return super().get_db_prep_value(value, connection, prepared)
+
+    def from_db_value(self, value, expression, connection):
+        if self.is_native(connection):
+            return value
+        return super().from_db_value(value, expression, connection)
+
     def formfield(self, **kwargs):
         if self.valid_choices:
             return forms.MultipleChoiceField(
@@ -608,14 +707,15 @@ class BaseArrayField(models.JSONField):
     def to_python(self, value):
         if isinstance(value, str):
             try:
-                import json
-
                 value = json.loads(value)
             except Exception:
                 pass
         if isinstance(value, list):
+            base_type = self.base_type
+            if all(type(v) is base_type for v in value):
+                return value
             try:
-                return [self.base_type(v) for v in value]
+                return [base_type(v) for v in value]
             except Exception:
                 return value
         return value
@@ -640,12 +740,119 @@ class BaseArrayField(models.JSONField):
         if self.max_items is not None and len(coerced) > self.max_items:
             raise ValidationError(f"Maximum {self.max_items} items allowed.")
 
-        if self.valid_choices:
+        if self.valid_choice_set:
             for item in coerced:
-                if item not in self.valid_choices:
+                if item not in self.valid_choice_set:
                     raise ValidationError(f"{item} is not a valid choice.")
 
 
+class ArrayLookup(FieldGetDbPrepValueMixin, Lookup):
+    """
+    Base for BaseArrayField lookups. Accepts a list or a comma separated
+    string, so they can be used straight from query params:
+        ?tags__has=a,b
+    """
+
+    postgres_operator = None
+    mysql_template = None
+    # Over json_each(), for SQLite and other backends
+    generic_template = None
+
+    def get_prep_lookup(self):
+        if hasattr(self.rhs, "resolve_expression"):
+            return self.rhs
+        values = self.rhs
+        if isinstance(values, str):
+            values = [v.strip() for v in values.split(",") if v.strip()]
+        base_type = self.lhs.output_field.base_type
+        return [base_type(v) for v in values]
+
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        field = self.lhs.output_field
+        if field.is_native(connection):
+            rhs = "%s::%s" % (rhs, field.db_type(connection))
+        else:
+            rhs = "%s::jsonb" % rhs
+        return "%s %s %s" % (lhs, self.postgres_operator, rhs), (
+            *lhs_params,
+            *rhs_params,
+        )
+
+    def as_mysql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return self.mysql_template % {"lhs": lhs, "rhs": rhs}, (
+            self.order_params(lhs_params, rhs_params, self.mysql_template)
+        )
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return self.generic_template % {"lhs": lhs, "rhs": rhs}, (
+            self.order_params(lhs_params, rhs_params, self.generic_template)
+        )
+
+    @staticmethod
+    def order_params(lhs_params, rhs_params, template):
+        if template.index("%(lhs)s") < template.index("%(rhs)s"):
+            return (*lhs_params, *rhs_params)
+        return (*rhs_params, *lhs_params)
+
+
+class ArrayContains(ArrayLookup):
+    lookup_name = "contains"
+    postgres_operator = "@>"
+    mysql_template = "JSON_CONTAINS(%(lhs)s, %(rhs)s)"
+    generic_template = (
+        "NOT EXISTS (SELECT 1 FROM json_each(%(rhs)s) AS r"
+        " WHERE r.value NOT IN (SELECT value FROM json_each(%(lhs)s)))"
+    )
+
+
+class ArrayOverlap(ArrayLookup):
+    lookup_name = "overlaps"
+    postgres_operator = "&&"
+    mysql_template = "JSON_OVERLAPS(%(lhs)s, %(rhs)s)"
+    generic_template = (
+        "EXISTS (SELECT 1 FROM json_each(%(lhs)s) AS l"
+        " WHERE l.value IN (SELECT value FROM json_each(%(rhs)s)))"
+    )
+
+    def as_postgresql(self, compiler, connection):
+        field = self.lhs.output_field
+        if field.is_native(connection):
+            return super().as_postgresql(compiler, connection)
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        if field.base_type is str:
+            # jsonb ?| matches string array elements and uses jsonb_ops GIN
+            return "%s ?| %%s" % lhs, (*lhs_params, [str(v) for v in self.rhs])
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return (
+            "EXISTS (SELECT 1 FROM jsonb_array_elements(%s) AS l"
+            " WHERE l.value IN (SELECT jsonb_array_elements(%s::jsonb)))"
+            % (lhs, rhs),
+            (*lhs_params, *rhs_params),
+        )
+
+
+class ArrayContainedBy(ArrayLookup):
+    lookup_name = "contained_by"
+    postgres_operator = "<@"
+    mysql_template = "JSON_CONTAINS(%(rhs)s, %(lhs)s)"
+    generic_template = (
+        "NOT EXISTS (SELECT 1 FROM json_each(%(lhs)s) AS l"
+        " WHERE l.value NOT IN (SELECT value FROM json_each(%(rhs)s)))"
+    )
+
+
+BaseArrayField.register_lookup(ArrayContains)
+BaseArrayField.register_lookup(ArrayContains, lookup_name="has")
+BaseArrayField.register_lookup(ArrayOverlap)
+BaseArrayField.register_lookup(ArrayContainedBy)
+
+
 class StringArrayField(BaseArrayField):
     def __init__(self, display=False, **kwargs):
         self.display = display
@@ -719,22 +926,32 @@ class ChoicesNumberArrayField(BaseArrayField):
 
 
 class FileField(models.FileField):
-    def __init__(self, upload_to, display=False, *args, **kwargs):
+    def __init__(
+        self, upload_to, display=False, content_addressed=False, *args, **kwargs
+    ):
         self.display = display
+        if content_addressed:
+            # Identical uploads share one file, see storage.py
+            kwargs.setdefault("storage", get_content_storage)
         kwargs.setdefault("null", True)
         kwargs.setdefault("blank", True)
         super().__init__(upload_to=upload_to, *args, **kwargs)
 
 
 class ImageField(models.FileField):
-    def __init__(self, upload_to, display=False, *args, **kwargs):
+    def __init__(
+        self, upload_to, display=False, content_addressed=False, *args, **kwargs
+    ):
         self.display = display
+        if content_addressed:
+            # Identical uploads share one file, see storage.py
+            kwargs.setdefault("storage", get_content_storage)
         kwargs.setdefault("null", True)
         kwargs.setdefault("blank", True)
         super().__init__(upload_to=upload_to, *args, **kwargs)
 
 
-p = inflect.engine()
+p = SimpleLazyObject(get_inflect_engine)
 
 
 class CustomModelMeta(models.base.ModelBase):
@@ -745,14 +962,28 @@ class CustomModelMeta(models.base.ModelBase):
         if not new_class._meta.abstract:
             verbose = new_class._meta.verbose_name or name.lower()
             new_class._meta.verbose_name = verbose
-            new_class._meta.verbose_name_plural = p.plural(verbose)
+            new_class._meta.verbose_name_plural = lazy(pluralize, str)(verbose)
 
         return new_class
 
 
+def iter_custom_models(models_module, excluded_models=None):
+    """(name, model) for each CustomModel defined in the given models module."""
+    excluded_models = excluded_models or []
+    for name, obj in vars(models_module).items():
+        if name in excluded_models:
+            continue
+        if (
+            isinstance(obj, type)
+            and issubclass(obj, CustomModel)
+            and obj.__module__ == models_module.__name__
+        ):
+            yield name, obj
+
+
 class CustomModel(models.Model, metaclass=CustomModelMeta):
     created_at = AutoCreatedAtField()
-    updated_at = AutoUpdatedAtField()
+    updated_at = AutoUpdatedAtField(indexed=True)
 
     def __str__(self):
         display_fields = []
@@ -839,17 +1070,244 @@ class CustomModel(models.Model, metaclass=CustomModelMeta):
         abstract = True
 
 
+class ImmutableQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(is_active=True)
+
+    def as_of(self, when):
+        """Versions that were current at the given datetime."""
+        return self.filter(valid_from__lte=when).filter(
+            Q(valid_to__isnull=True) | Q(valid_to__gt=when)
+        )
+
+    def archivable(self, before):
+        """
+        Inactive versions closed before the given datetime. Versions other
+        rows still point to stay in the hot table.
+        """
+        qs = self.filter(is_active=False, valid_to__lt=before)
+        for rel in self.model._meta.related_objects:
+            qs = qs.exclude(**{f"{rel.name}__isnull": False})
+        return qs
+
+    def _archive_target(self):
+        target = self.model.archive_model or self.model
+        using = self.model.archive_database or router.db_for_write(target)
+        source = self._db or router.db_for_write(self.model)
+        if target is self.model and using == source:
+            raise ImproperlyConfigured(
+                f"{self.model.__name__} needs an archive_model or archive_database."
+            )
+        return target, using, source
+
+    def archived(self):
+        """Queryset over archived versions."""
+        target, using, _ = self._archive_target()
+        return target._base_manager.using(using)
+
+    def history(self, lineage_id):
+        """Versions of a lineage still in the hot table, oldest first."""
+        return self.filter(lineage_id=lineage_id).order_by("version")
+
+    def full_history(self, lineage_id):
+        """
+        List of every version of a lineage, archived ones included, oldest
+        first. The versions can come from two databases, so this is not a
+        queryset.
+        """
+        versions = list(self.history(lineage_id))
+        if self.model.archive_model or self.model.archive_database:
+            versions += self.archived().filter(lineage_id=lineage_id)
+        return sorted(versions, key=lambda version: version.version)
+
+    def archive(self, before, batch_size=1000, pause=0):
+        """
+        Move archivable versions to the archive table/database in batches,
+        each copied and deleted inside one transaction per database.
+        Returns the number of versions moved.
+        """
+        target, using, source = self._archive_target()
+        fields = [f.attname for f in target._meta.concrete_fields]
+        stale = self.using(source).archivable(before).order_by("pk")
+        total = 0
+        while True:
+            batch = list(stale[:batch_size])
+            if not batch:
+                break
+            rows = [target(**{f: getattr(obj, f) for f in fields}) for obj in batch]
+            with transaction.atomic(using=using), transaction.atomic(using=source):
+                target._base_manager.using(using).bulk_create(
+                    rows, ignore_conflicts=True
+                )
+                models.QuerySet(self.model, using=source).filter(
+                    pk__in=[obj.pk for obj in batch]
+                ).delete()
+            total += len(batch)
+            if pause:
+                sleep(pause)
+        return total
+
+    def archive_report(self, before):
+        """Dry run of archive(): row counts and, on PostgreSQL, reclaimable bytes."""
+        target, using, source = self._archive_target()
+        rows = self.using(source).archivable(before).count()
+        total = self.model._base_manager.using(source).count()
+        table_bytes = None
+        connection = connections[source]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_total_relation_size(%s)", [self.model._meta.db_table]
+                )
+                table_bytes = cursor.fetchone()[0]
+        return {
+            "model": self.model._meta.label,
+            "archive": target._meta.label,
+            "database": using,
+            "archivable_rows": rows,
+            "total_rows": total,
+            "table_bytes": table_bytes,
+            "reclaimable_bytes": (
+                int(table_bytes * rows / total) if table_bytes and total else None
+            ),
+        }
+
+    def _close_versions(self, objs, now):
+        """
+        Lock the lineages of objs and deactivate their current versions,
+        whichever instances the caller loaded. Returns {lineage_id: highest
+        stored version} to number the new versions from. Must run in a
+        transaction.
+        """
+        base = models.QuerySet(self.model, using=self.db)
+        lineages = {obj.lineage_id for obj in objs if obj.lineage_id is not None}
+        unlinked = [
+            obj.pk for obj in objs if obj.pk is not None and obj.lineage_id is None
+        ]
+        latest = {}
+        if lineages:
+            versions = base.filter(lineage_id__in=lineages)
+            # Aggregates cannot be locked: lock the rows, then read the
+            # maximum in a new statement that sees concurrent commits
+            list(versions.select_for_update().values_list("pk", flat=True))
+            latest = dict(
+                versions.order_by()
+                .values("lineage_id")
+                .annotate(latest=Max("version"))
+                .values_list("lineage_id", "latest")
+            )
+            versions.filter(is_active=True).update(is_active=False, valid_to=now)
+        if unlinked:
+            base.filter(pk__in=unlinked).update(is_active=False, valid_to=now)
+        return latest
+
+    def bulk_save(self, objs, batch_size=None):
+        """
+        Versioned save for many records: one UPDATE deactivating the current
+        versions of the saved objects and one (batched) INSERT of the new ones.
+        Several objects of one lineage become consecutive versions, the last
+        one active.
+        """
+        objs = list(objs)
+        now = timezone.now()
+        with transaction.atomic(using=self.db, savepoint=False):
+            latest = self._close_versions(objs, now)
+            newest = {}
+            for obj in objs:
+                obj._prepare_new_version(now, latest.get(obj.lineage_id))
+                latest[obj.lineage_id] = obj.version
+                previous = newest.get(obj.lineage_id)
+                if previous is not None:
+                    previous.is_active = False
+                    previous.valid_to = now
+                newest[obj.lineage_id] = obj
+            return self.bulk_create(objs, batch_size=batch_size)
+
+
+class LineageField(models.UUIDField):
+    """
+    Identifier shared by every version of the same record. Adds the indexes
+    ImmutableModel lookups rely on, whatever Meta the model ends up inheriting.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("null", True)
+        kwargs.setdefault("blank", True)
+        kwargs.setdefault("editable", False)
+        super().__init__(*args, **kwargs)
+
+    def contribute_to_class(self, cls, name, **kwargs):
+        super().contribute_to_class(cls, name, **kwargs)
+        # Current version of a lineage, answerable from the index alone
+        add_field_index(
+            cls,
+            PartialIndex(
+                fields=[name, "id"], condition=Q(is_active=True), suffix="cur"
+            ),
+        )
+        # as_of(): valid_to IS NULL OR valid_to > t, then valid_from <= t
+        add_field_index(cls, models.Index(fields=["valid_to", "valid_from"]))
+        add_field_constraint(
+            cls,
+            models.UniqueConstraint(
+                fields=[name, "version"],
+                name=f"{cls._meta.app_label}_{cls._meta.model_name}_unique_version",
+            ),
+        )
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        return name, "django.db.models.UUIDField", args, kwargs
+
+
 class ImmutableModel(models.Model):
+    """
+    Every save inserts a new version and deactivates the previous one.
+    Versions of the same record share a lineage_id and are numbered by version.
+
+    Rows that existed before lineage_id was added keep a NULL lineage and get
+    one assigned on their next save.
+    """
+
     is_active = models.BooleanField(default=True)
+    lineage_id = LineageField()
+    version = models.PositiveIntegerField(default=1, editable=False)
+    valid_from = models.DateTimeField(default=timezone.now, editable=False)
+    valid_to = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = ImmutableQuerySet.as_manager()
+
+    # Where archive() moves old versions, see make_archive_model()
+    archive_model = None
+    archive_database = None
 
     class Meta:
         abstract = True
 
-    def save(self, *args, **kwargs):
+    def _prepare_new_version(self, now, latest=None):
+        """latest: the highest version stored for the lineage, if known."""
         if self.pk is not None:
-            self.__class__.objects.filter(pk=self.pk).update(is_active=False)
             self.pk = None
-        return super().save(*args, **kwargs)
+            self._state.adding = True
+            if latest is None:
+                latest = self.version
+        if latest is not None:
+            self.version = latest + 1
+        if self.lineage_id is None:
+            self.lineage_id = uuid.uuid4()
+        self.is_active = True
+        self.valid_from = now
+        self.valid_to = None
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(
+            self.__class__, instance=self
+        )
+        now = timezone.now()
+        with transaction.atomic(using=using, savepoint=False):
+            latest = self.__class__.objects.using(using)._close_versions([self], now)
+            self._prepare_new_version(now, latest.get(self.lineage_id))
+            return super().save(*args, **kwargs)
 
     def delete(self, *args, **kwargs):
         raise NotImplementedError(
@@ -857,16 +1315,85 @@ class ImmutableModel(models.Model):
         )
 
 
-from django.db import models
-from django.utils import timezone
+def make_archive_model(model, db_table=None, database=None):
+    """
+    Build the companion archive table for an ImmutableModel and register it
+    as the model's archive. Call it in the app's models.py so migrations
+    create the table:
+
+        PriceArchive = make_archive_model(Price)
+
+    Archived rows keep their primary key. Relations are copied without
+    database constraints or reverse accessors.
+    """
+    attrs = {
+        "__module__": model.__module__,
+        "Meta": type(
+            "Meta",
+            (),
+            {
+                "app_label": model._meta.app_label,
+                "db_table": db_table or f"{model._meta.db_table}_archive",
+                "indexes": [models.Index(fields=["lineage_id", "version"])],
+            },
+        ),
+    }
+    for field in model._meta.concrete_fields:
+        if field.primary_key and isinstance(field, models.fields.AutoFieldMixin):
+            attrs[field.name] = models.BigIntegerField(primary_key=True)
+            continue
+        if field.is_relation:
+            to = field.remote_field.model
+            attrs[field.name] = models.ForeignKey(
+                model if to == "self" else to,
+                on_delete=models.DO_NOTHING,
+                related_name="+",
+                db_constraint=False,
+                null=field.null,
+                blank=field.blank,
+            )
+            continue
+        name, path, args, kwargs = field.deconstruct()
+        attrs[name] = import_string(path)(*args, **kwargs)
+
+    archive = type(f"{model.__name__}Archive", (models.Model,), attrs)
+    model.archive_model = archive
+    if database:
+        model.archive_database = database
+    return archive
 
 
 class SoftDeleteQuerySet(models.QuerySet):
     def delete(self):
         return super().update(deleted_at=timezone.now())
 
-    def hard_delete(self):
-        return super().delete()
+    def hard_delete(self, batch_size=None, pause=0):
+        """
+        Permanently delete the rows. With batch_size, delete in chunks of
+        primary keys, each in its own transaction, sleeping `pause` seconds
+        between chunks so long purges don't hold locks or flood replication.
+        Returns (count, {label: count}) like QuerySet.delete() either way.
+        """
+        if not batch_size:
+            return super().delete()
+
+        pks = self.order_by().values_list("pk", flat=True)
+        total = 0
+        per_model = {}
+        while True:
+            batch = list(pks[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic(using=self.db):
+                deleted, counts = models.QuerySet(self.model, using=self.db).filter(
+                    pk__in=batch
+                ).delete()
+            total += deleted
+            for label, count in counts.items():
+                per_model[label] = per_model.get(label, 0) + count
+            if pause:
+                sleep(pause)
+        return total, per_model
 
     def alive(self):
         return self.filter(deleted_at__isnull=True)
@@ -879,9 +1406,63 @@ class SoftDeleteManager(models.Manager):
     def get_queryset(self):
         return SoftDeleteQuerySet(self.model, using=self._db).alive()
 
+    def purge(self, before, batch_size=1000, pause=0):
+        """Hard-delete rows soft-deleted before the given datetime, in batches."""
+        return (
+            SoftDeleteQuerySet(self.model, using=self._db)
+            .filter(deleted_at__lt=before)
+            .hard_delete(batch_size=batch_size, pause=pause)
+        )
+
+
+class DeletedAtField(models.DateTimeField):
+    """
+    Nullable deletion timestamp. Adds partial indexes on the primary key
+    and on (updated_at, pk) for alive rows (every default query filters on
+    deleted_at IS NULL and orders by id, incremental syncs page on
+    updated_at) and on `deleted_at` for dead rows (used by purges),
+    whatever Meta the model ends up inheriting.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("null", True)
+        kwargs.setdefault("blank", True)
+        super().__init__(*args, **kwargs)
+
+    def contribute_to_class(self, cls, name, **kwargs):
+        super().contribute_to_class(cls, name, **kwargs)
+        add_field_index(cls, DeadIndex(name))
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        # Same column as a plain DateTimeField, keep existing migrations valid
+        return name, "django.db.models.DateTimeField", args, kwargs
+
+
+def add_alive_indexes(sender, **kwargs):
+    """
+    Alive-only indexes of a model with a DeletedAtField, added once the
+    class is complete: its primary key and updated_at may come after it.
+    """
+    fields = sender._meta.local_fields
+    if not any(isinstance(f, DeletedAtField) for f in fields):
+        return
+    pk = sender._meta.pk.name
+    indexes = [AliveIndex(pk)]
+    indexes += [
+        AliveIndex(f.name, pk) for f in fields if isinstance(f, AutoUpdatedAtField)
+    ]
+    for index in indexes:
+        # ModelBase names the Meta indexes before class_prepared
+        index.set_name_with_model(sender)
+        add_field_index(sender, index)
+
+
+models.signals.class_prepared.connect(add_alive_indexes)
+
 
 class SoftDeleteModel(models.Model):
-    deleted_at = models.DateTimeField(null=True, blank=True)
+    deleted_at = DeletedAtField()
 
     objects = SoftDeleteManager()  # Default: only alive
     all_objects = models.Manager()  # Can see everything
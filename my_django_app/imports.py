@@ -0,0 +1,311 @@
+"""
+Bulk import of CSV or NDJSON rows through a model's CustomSerializer.
+
+The file is read incrementally and handled in batches: every foreign key
+referenced by a batch is loaded with one in_bulk() query per related
+model, rows are validated by the serializer (so model clean() still
+runs), then written with bulk_create / bulk_update in one transaction per
+batch. Rows with an existing `id` are updated, the others created.
+Invalid rows are reported and skipped; the rest of the batch is written.
+Many-to-many values replace the current links with one DELETE and one
+bulk INSERT per field and batch. ImmutableModels go through bulk_save(),
+so updates add versions instead of overwriting them.
+
+The columns are the ones export produces: field names, attnames or their
+camelCase forms, with choice labels accepted in place of values.
+"""
+
+import csv
+import io
+import json
+import os
+import threading
+import uuid
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, models, transaction
+from django.utils import timezone
+from djangorestframework_camel_case.util import camel_to_underscore
+from rest_framework import serializers
+from .fields import BaseArrayField, ImmutableModel
+
+IMPORT_FORMATS = ("csv", "tsv", "ndjson")
+READ_ONLY_COLUMNS = {"display_name", "created_at", "updated_at"}
+
+
+def guess_import_format(filename, default="csv"):
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    return extension if extension in IMPORT_FORMATS else default
+
+
+def iter_records(fileobj, import_format="csv"):
+    """Yield (line number, dict) for each record, reading the file incrementally."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    if import_format == "ndjson":
+        for number, line in enumerate(text, start=1):
+            if line.strip():
+                yield number, json.loads(line)
+        return
+    reader = csv.DictReader(text, delimiter="\t" if import_format == "tsv" else ",")
+    for number, row in enumerate(reader, start=2):
+        yield number, row
+
+
+class RowImporter:
+    def __init__(self, serializer_class, batch_size=1000, dry_run=False, max_errors=1000):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.max_errors = max_errors
+        self.result = {
+            "rows": 0,
+            "created": 0,
+            "updated": 0,
+            "failed": 0,
+            "errors": [],
+            "dry_run": dry_run,
+        }
+
+        meta = self.model._meta
+        self.columns = {}
+        for field in meta.concrete_fields + meta.many_to_many:
+            for name in {field.name, field.attname}:
+                self.columns[name] = field
+        self.relations = [
+            field
+            for field in meta.concrete_fields + meta.many_to_many
+            if field.is_relation
+        ]
+        self.choice_labels = {
+            field.name: {str(label): value for value, label in field.flatchoices}
+            for field in meta.concrete_fields
+            if field.choices and not field.is_relation
+        }
+
+    def normalize(self, record):
+        """Map columns to field names and coerce CSV strings where needed."""
+        row = {}
+        for key, value in record.items():
+            if key is None:
+                continue
+            name = key if key in self.columns else camel_to_underscore(key)
+            if name == "id" or name in READ_ONLY_COLUMNS or name not in self.columns:
+                if name == "id" and value not in (None, ""):
+                    row["id"] = value
+                continue
+            field = self.columns[name]
+            if isinstance(value, str):
+                if value == "" and (field.null or field.many_to_many):
+                    value = [] if field.many_to_many else None
+                elif field.many_to_many:
+                    value = json.loads(value) if value.startswith("[") else value.split(",")
+                elif isinstance(field, (BaseArrayField, models.JSONField)) and value:
+                    try:
+                        value = json.loads(value)
+                    except ValueError:
+                        pass
+            labels = self.choice_labels.get(field.name)
+            if labels and value not in (None, "") and str(value) in labels:
+                value = labels[str(value)]
+            row[field.name] = value
+        return row
+
+    def related_cache(self, rows):
+        """{model: {pk: obj}} for every FK/M2M value referenced by the batch."""
+        related = {}
+        for field in self.relations:
+            pk_field = field.related_model._meta.pk
+            ids = set()
+            for row in rows:
+                value = row.get(field.name)
+                values = value if isinstance(value, list) else [value]
+                for v in values:
+                    if v in (None, ""):
+                        continue
+                    try:
+                        ids.add(pk_field.to_python(v))
+                    except Exception:
+                        pass
+            model = field.related_model
+            found = model._default_manager.in_bulk(list(ids)) if ids else {}
+            related.setdefault(model, {}).update(found)
+        return related
+
+    def add_error(self, number, detail):
+        self.result["failed"] += 1
+        if len(self.result["errors"]) < self.max_errors:
+            self.result["errors"].append({"row": number, "errors": detail})
+
+    def import_batch(self, batch):
+        numbers = [number for number, _ in batch]
+        rows = [self.normalize(record) for _, record in batch]
+        ids = {row["id"] for row in rows if "id" in row}
+        existing = self.model._default_manager.in_bulk(list(ids)) if ids else {}
+        existing = {str(pk): obj for pk, obj in existing.items()}
+
+        serializer = self.serializer_class(
+            context={"related_cache": self.related_cache(rows)}
+        )
+        creates, updates, update_fields, m2m = [], [], set(), []
+        for number, row in zip(numbers, rows):
+            instance = existing.get(str(row.pop("id", "")))
+            serializer.instance = instance
+            serializer.partial = instance is not None
+            try:
+                validated = serializer.run_validation(row)
+            except serializers.ValidationError as e:
+                self.add_error(number, e.detail)
+                continue
+            many = {
+                name: validated.pop(name)
+                for name in list(validated)
+                if self.columns[name].many_to_many
+            }
+            if instance is None:
+                instance = self.model(**validated)
+                creates.append(instance)
+            else:
+                for name, value in validated.items():
+                    setattr(instance, name, value)
+                update_fields.update(validated)
+                updates.append(instance)
+            if many:
+                m2m.append((instance, many))
+
+        self.result["created"] += len(creates)
+        self.result["updated"] += len(updates)
+        if self.dry_run:
+            return
+
+        manager = self.model._default_manager
+        with transaction.atomic(using=manager.db):
+            if issubclass(self.model, ImmutableModel):
+                # Every save is a new version, updated rows included
+                if creates or updates:
+                    manager.bulk_save(creates + updates)
+            else:
+                self.save_creates(manager, creates, m2m)
+                if updates and update_fields:
+                    if any(f.name == "updated_at" for f in self.model._meta.fields):
+                        now = timezone.now()
+                        for obj in updates:
+                            obj.updated_at = now
+                        update_fields.add("updated_at")
+                    manager.bulk_update(updates, list(update_fields))
+            self.save_m2m(m2m, manager.db)
+
+    def save_creates(self, manager, creates, m2m):
+        if not creates:
+            return
+        if connections[manager.db].features.can_return_rows_from_bulk_insert:
+            manager.bulk_create(creates)
+            return
+        # Without ids back from bulk_create (MySQL), rows with links to
+        # write are saved one by one
+        linked = {id(instance) for instance, _ in m2m}
+        for obj in creates:
+            if id(obj) in linked:
+                obj.save(force_insert=True)
+        manager.bulk_create([obj for obj in creates if id(obj) not in linked])
+
+    def save_m2m(self, m2m, using):
+        """Replace the links of the batch with one DELETE and one INSERT per field."""
+        links = {}
+        for instance, many in m2m:
+            for name, values in many.items():
+                links.setdefault(name, []).append((instance.pk, values))
+        for name, rows in links.items():
+            field = self.columns[name]
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            through._default_manager.using(using).filter(
+                **{f"{source}_id__in": [pk for pk, _ in rows]}
+            ).delete()
+            through._default_manager.using(using).bulk_create(
+                [
+                    through(
+                        **{f"{source}_id": pk, f"{target}_id": getattr(value, "pk", value)}
+                    )
+                    for pk, values in rows
+                    for value in values
+                ],
+                batch_size=self.batch_size,
+                ignore_conflicts=True,
+            )
+
+    def run(self, records):
+        batch = []
+        for number, record in records:
+            self.result["rows"] += 1
+            batch.append((number, record))
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                batch = []
+        if batch:
+            self.import_batch(batch)
+        return self.result
+
+
+def import_rows(serializer_class, fileobj, import_format="csv", **kwargs):
+    """Import a CSV/TSV/NDJSON file object and return the counts and row errors."""
+    importer = RowImporter(serializer_class, **kwargs)
+    try:
+        return importer.run(iter_records(fileobj, import_format))
+    except (ValueError, csv.Error, UnicodeDecodeError) as e:
+        importer.result["error"] = f"Could not read the file: {e}"
+        return importer.result
+
+
+def import_job_key(job_id):
+    return f"my_django_app:import:{job_id}"
+
+
+def check_job_cache():
+    """
+    Job status is polled from whichever worker serves the next request, so
+    it has to live in a cache every worker shares.
+    """
+    if isinstance(caches["default"], (LocMemCache, DummyCache)):
+        raise ImproperlyConfigured(
+            "Background imports need a shared cache (Redis, Memcached, "
+            "database); the default cache is local to this process."
+        )
+
+
+def start_import_job(serializer_class, path, import_format="csv", **kwargs):
+    """
+    Import a file already saved at `path` in a thread of this worker, with
+    its status in the shared cache under the returned id. The job is not
+    durable: it is lost if the worker stops before it finishes. Use the
+    import_rows command, or a task queue, for imports that must complete.
+    """
+    check_job_cache()
+    job_id = uuid.uuid4().hex
+    key = import_job_key(job_id)
+    cache.set(key, {"status": "running"}, 86400)
+
+    def run():
+        try:
+            with open(path, "rb") as f:
+                result = import_rows(serializer_class, f, import_format, **kwargs)
+            cache.set(key, {"status": "done", **result}, 86400)
+        except Exception as e:
+            cache.set(key, {"status": "failed", "error": str(e)}, 86400)
+        finally:
+            # This thread's connections are not closed by any request cycle
+            connections.close_all()
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    threading.Thread(target=run, daemon=True).start()
+    return job_id
+
+
+def get_import_job(job_id):
+    return cache.get(import_job_key(job_id))
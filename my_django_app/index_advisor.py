@@ -0,0 +1,406 @@
+"""
+Index advice from the list requests clients actually make.
+
+With LIST_SHAPE_LOG set, CustomModelViewSet.list() appends a sampled
+share of its requests to that JSON-lines file: the filter, exclude and
+search keys, order_by and the latency (values are only kept for isnull
+and boolean filters, which can become partial index conditions). The
+index_advisor command aggregates the file, checks the candidate indexes
+against the ones the database has and prints the missing ones, or writes
+them as a migration. Migrations are only written into the project's own
+apps; join candidates on installed packages (django.contrib.auth, ...)
+are always printed as SQL.
+
+Candidates, per model:
+    - B-tree over the equality filters of a request followed by its order
+      column (or a range filter), e.g. (status, category_id, id DESC)
+    - the same restricted to the isnull/boolean filters as a partial index
+    - B-tree on filtered columns reached through a join
+    - trigram GIN (PostgreSQL) on searched and icontains'd text columns
+
+Settings:
+    LIST_SHAPE_LOG = BASE_DIR / "list_shapes.jsonl"
+    LIST_SHAPE_SAMPLE_RATE = 0.05
+"""
+
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+
+logger = logging.getLogger(__name__)
+
+EQUALITY_LOOKUPS = {"exact", "iexact", "in", "isnull"}
+RANGE_LOOKUPS = {"gt", "gte", "lt", "lte", "range", "date", "year", "month", "day"}
+TEXT_LOOKUPS = {"contains", "icontains", "search", "endswith", "iendswith"}
+
+_lock = threading.Lock()
+
+
+def resolve_key(model, key):
+    """
+    (model, field, lookup) a filter key ends on, following relations, or
+    None when it does not end on a concrete column.
+    """
+    parts = key.split("__")
+    field = None
+    while parts:
+        try:
+            field = model._meta.get_field(parts[0])
+        except FieldDoesNotExist:
+            break
+        parts.pop(0)
+        if field.is_relation and parts and field.related_model is not None:
+            try:
+                field.related_model._meta.get_field(parts[0])
+            except FieldDoesNotExist:
+                break
+            model = field.related_model
+    if field is None or not field.concrete or field.many_to_many:
+        return None
+    lookup = "__".join(parts) or "exact"
+    return model, field, lookup
+
+
+def list_shape(model, params, order_by):
+    """The shape of one list() call: which keys it filters, excludes, searches and orders by."""
+    model_fields = {f.name for f in model._meta.get_fields()}
+    shape = {
+        "model": model._meta.label,
+        "filter": [],
+        "exclude": [],
+        "search": [],
+        "order_by": list(order_by),
+        "values": {},
+    }
+    for key in params:
+        if key.split("__")[0] not in model_fields:
+            continue
+        if "__search" in key:
+            shape["search"].append(key)
+            continue
+        if "__not_" in key:
+            shape["exclude"].append(key.replace("__not_", "__"))
+            continue
+        shape["filter"].append(key)
+        resolved = resolve_key(model, key)
+        if resolved and resolved[0] is model:
+            _, field, lookup = resolved
+            if lookup == "isnull" or (
+                lookup == "exact" and isinstance(field, models.BooleanField)
+            ):
+                shape["values"][key] = str(params[key]).lower()
+    for name in ("filter", "exclude", "search"):
+        shape[name].sort()
+    return shape
+
+
+def sample_list_shape(model, params, order_by, elapsed):
+    """The shape to record for this request, or None when it is not sampled."""
+    path = getattr(settings, "LIST_SHAPE_LOG", None)
+    if not path or random.random() >= getattr(settings, "LIST_SHAPE_SAMPLE_RATE", 0.05):
+        return None
+    shape = list_shape(model, params, order_by)
+    shape["ms"] = round(elapsed * 1000, 2)
+    shape["ts"] = round(time.time(), 3)
+    return shape
+
+
+def write_list_shape(shape):
+    try:
+        with _lock, open(settings.LIST_SHAPE_LOG, "a") as f:
+            f.write(json.dumps(shape) + "\n")
+    except OSError as e:
+        logger.warning("Could not record list shape: %s", e)
+
+
+def record_list_shape(model, params, order_by, elapsed):
+    shape = sample_list_shape(model, params, order_by, elapsed)
+    if shape is not None:
+        write_list_shape(shape)
+
+
+def load_shapes(path):
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class Candidate:
+    def __init__(self, model, kind, columns, condition=()):
+        self.model = model
+        self.kind = kind  # "btree" or "trigram"
+        self.columns = tuple(columns)  # (column, descending)
+        self.condition = tuple(condition)  # (column, "IS NULL" | "IS NOT NULL" | "" | "NOT")
+        self.requests = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    @property
+    def key(self):
+        return (self.model._meta.label, self.kind, self.columns, self.condition)
+
+    @property
+    def name(self):
+        digest = hashlib.md5(repr(self.key).encode()).hexdigest()[:8]
+        columns = "_".join(column for column, _ in self.columns)
+        suffix = "trg" if self.kind == "trigram" else ("prt" if self.condition else "idx")
+        return f"{self.model._meta.db_table[:20]}_{columns[:20]}_{digest}_{suffix}"
+
+    def describe(self):
+        columns = ", ".join(c + (" DESC" if desc else "") for c, desc in self.columns)
+        text = f"{self.model._meta.label} {self.kind} ({columns})"
+        if self.condition:
+            text += " WHERE " + " AND ".join(
+                f"{op} {c}".strip() if op == "NOT" else f"{c} {op}".strip()
+                for c, op in self.condition
+            )
+        return text
+
+    def without_condition(self):
+        """Full index leading with the condition columns, for backends without partial indexes."""
+        leading = [column for column, _ in self.condition]
+        candidate = Candidate(
+            self.model,
+            self.kind,
+            [(column, False) for column in leading]
+            + [c for c in self.columns if c[0] not in leading],
+        )
+        candidate.requests = self.requests
+        candidate.total_ms = self.total_ms
+        candidate.max_ms = self.max_ms
+        return candidate
+
+    def create_sql(self, connection):
+        qn = connection.ops.quote_name
+        concurrently = "CONCURRENTLY " if connection.vendor == "postgresql" else ""
+        # MySQL and Oracle have no CREATE INDEX IF NOT EXISTS
+        if_not_exists = (
+            "IF NOT EXISTS " if connection.vendor in ("postgresql", "sqlite") else ""
+        )
+        if self.kind == "trigram":
+            using = " USING gin"
+            # icontains compares UPPER(column), see indexes.TrigramIndex
+            columns = ", ".join(f"UPPER({qn(c)}) gin_trgm_ops" for c, _ in self.columns)
+        else:
+            using = ""
+            columns = ", ".join(qn(c) + (" DESC" if desc else "") for c, desc in self.columns)
+        sql = (
+            f"CREATE INDEX {concurrently}{if_not_exists}{qn(self.name)} "
+            f"ON {qn(self.model._meta.db_table)}{using} ({columns})"
+        )
+        if self.condition:
+            if not connection.features.supports_partial_indexes:
+                raise ValueError(f"{connection.vendor} has no partial indexes.")
+            sql += " WHERE " + " AND ".join(
+                f"NOT {qn(c)}" if op == "NOT" else f"{qn(c)} {op}".strip()
+                for c, op in self.condition
+            )
+        return sql
+
+    def drop_sql(self, connection):
+        qn = connection.ops.quote_name
+        if connection.vendor == "mysql":
+            return f"DROP INDEX {qn(self.name)} ON {qn(self.model._meta.db_table)}"
+        if connection.vendor == "oracle":
+            return f"DROP INDEX {qn(self.name)}"
+        concurrently = "CONCURRENTLY " if connection.vendor == "postgresql" else ""
+        return f"DROP INDEX {concurrently}IF EXISTS {qn(self.name)}"
+
+
+def text_columns(model):
+    return [
+        f.column
+        for f in model._meta.concrete_fields
+        if isinstance(f, (models.CharField, models.TextField))
+    ]
+
+
+def shape_candidates(model, shape):
+    """The indexes that would serve one recorded list() shape."""
+    candidates = []
+    equality, ranges, condition = [], [], []
+    for key in shape["filter"]:
+        resolved = resolve_key(model, key)
+        if resolved is None:
+            continue
+        target, field, lookup = resolved
+        if target is not model:
+            if lookup in EQUALITY_LOOKUPS | RANGE_LOOKUPS:
+                candidates.append(Candidate(target, "btree", [(field.column, False)]))
+            elif lookup in TEXT_LOOKUPS:
+                candidates.append(Candidate(target, "trigram", [(field.column, False)]))
+            continue
+        value = shape["values"].get(key)
+        if lookup == "isnull" and value is not None:
+            condition.append(
+                (field.column, "IS NULL" if value in ("true", "1") else "IS NOT NULL")
+            )
+        elif isinstance(field, models.BooleanField) and value is not None:
+            condition.append((field.column, "" if value in ("true", "1") else "NOT"))
+        elif lookup in EQUALITY_LOOKUPS:
+            equality.append((field.column, False))
+        elif lookup in RANGE_LOOKUPS:
+            ranges.append((field.column, False))
+        elif lookup in TEXT_LOOKUPS:
+            candidates.append(Candidate(model, "trigram", [(field.column, False)]))
+
+    order = None
+    for name in shape["order_by"] or ["-id"]:
+        resolved = resolve_key(model, name.lstrip("-"))
+        if resolved and resolved[0] is model:
+            order = (resolved[1].column, name.startswith("-"))
+        break
+
+    columns = sorted(set(equality))
+    if ranges and (not order or order[0] == model._meta.pk.column):
+        # The default -id order is cheap to sort after a range scan
+        columns.append(sorted(set(ranges))[0])
+    elif order:
+        columns.append(order)
+    pk_only = [c for c, _ in columns] == [model._meta.pk.column]
+    if columns and not (pk_only and not condition):
+        candidates.append(Candidate(model, "btree", columns, sorted(set(condition))))
+
+    for key in shape["search"]:
+        resolved = resolve_key(model, key.replace("__search", ""))
+        if resolved is None:
+            continue
+        target, field, _ = resolved
+        if field.is_relation:
+            for column in text_columns(field.related_model):
+                candidates.append(
+                    Candidate(field.related_model, "trigram", [(column, False)])
+                )
+        elif isinstance(field, (models.CharField, models.TextField)):
+            candidates.append(Candidate(target, "trigram", [(field.column, False)]))
+    return candidates
+
+
+def aggregate(shapes):
+    """Candidates from all recorded shapes, with the requests and time they account for."""
+    from django.apps import apps
+
+    merged = {}
+    for shape in shapes:
+        try:
+            model = apps.get_model(shape["model"])
+        except LookupError:
+            continue
+        for candidate in shape_candidates(model, shape):
+            candidate = merged.setdefault(candidate.key, candidate)
+            candidate.requests += 1
+            candidate.total_ms += shape.get("ms", 0)
+            candidate.max_ms = max(candidate.max_ms, shape.get("ms", 0))
+    return sorted(merged.values(), key=lambda c: -c.total_ms)
+
+
+def get_existing_indexes(model, connection):
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, model._meta.db_table
+        )
+    return [
+        c
+        for c in constraints.values()
+        if c.get("index") or c.get("primary_key") or c.get("unique")
+    ]
+
+
+def is_covered(candidate, indexes):
+    """Whether an existing index leads with the candidate's columns and is of its kind."""
+    columns = [column for column, _ in candidate.columns]
+    for index in indexes:
+        index_type = (index.get("type") or "").lower()
+        if candidate.kind == "trigram":
+            # Expression indexes only show up in the definition
+            definition = index.get("definition") or ""
+            if index_type in ("gin", "gist") and (
+                index["columns"] == columns
+                or ("gin_trgm_ops" in definition and f"({columns[0]})" in definition)
+            ):
+                return True
+        elif index_type not in ("gin", "gist", "brin", "hash"):
+            if index["columns"][: len(columns)] == columns:
+                return True
+    return False
+
+
+def missing_indexes(candidates, connection):
+    existing = {}
+    missing = {}
+    for candidate in candidates:
+        if candidate.kind == "trigram" and connection.vendor != "postgresql":
+            continue
+        if candidate.condition and not connection.features.supports_partial_indexes:
+            candidate = candidate.without_condition()
+        model = candidate.model
+        if model not in existing:
+            existing[model] = get_existing_indexes(model, connection)
+        if candidate.key not in missing and not is_covered(candidate, existing[model]):
+            missing[candidate.key] = candidate
+    return list(missing.values())
+
+
+MIGRATION_TEMPLATE = '''from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Generated by index_advisor. CREATE INDEX CONCURRENTLY cannot run
+    # inside a transaction.
+    atomic = False
+
+    dependencies = {dependencies!r}
+
+    operations = [
+{operations}
+    ]
+'''
+
+
+def render_migration(candidates, connection, dependencies):
+    operations = []
+    if connection.vendor == "postgresql" and any(
+        c.kind == "trigram" for c in candidates
+    ):
+        operations.append(
+            "        migrations.RunSQL(\n"
+            '            "CREATE EXTENSION IF NOT EXISTS pg_trgm",\n'
+            "            migrations.RunSQL.noop,\n"
+            "        ),"
+        )
+    for candidate in candidates:
+        operations.append(
+            f"        # {candidate.describe()}: {candidate.requests} requests, "
+            f"{candidate.total_ms:.0f} ms\n"
+            "        migrations.RunSQL(\n"
+            f"            {candidate.create_sql(connection)!r},\n"
+            f"            {candidate.drop_sql(connection)!r},\n"
+            "        ),"
+        )
+    return MIGRATION_TEMPLATE.format(
+        dependencies=dependencies, operations="\n".join(operations)
+    )
+
+
+def group_by_app(candidates):
+    groups = defaultdict(list)
+    for candidate in candidates:
+        groups[candidate.model._meta.app_label].append(candidate)
+    return groups
+
+
+def is_project_app(app_label):
+    """Whether the app is the project's own code rather than an installed package."""
+    from django.apps import apps
+
+    parts = Path(apps.get_app_config(app_label).path).resolve().parts
+    return not {"site-packages", "dist-packages"} & set(parts)
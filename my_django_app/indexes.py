@@ -0,0 +1,111 @@
+from django.contrib.postgres.indexes import OpClass
+from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Upper
+
+
+class PartialIndex(models.Index):
+    """
+    Index that may be declared without a name, even with a condition,
+    opclasses or include columns. Django names it per concrete model
+    (like a plain Index), so it is safe to put on abstract models.
+
+    Usage:
+        PartialIndex(fields=["id"], condition=Q(deleted_at__isnull=True), suffix="alv")
+    """
+
+    suffix = "prt"
+
+    def __init__(self, *expressions, name=None, suffix=None, **kwargs):
+        super().__init__(*expressions, name=name or "unnamed", **kwargs)
+        if suffix:
+            # set_name_with_model() hashes the suffix, keep it to 3 characters
+            self.suffix = suffix[:3]
+        if not name:
+            self.name = ""
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        if not self.name and self.suffix != type(self).suffix:
+            kwargs["suffix"] = self.suffix
+        return path, args, kwargs
+
+
+def AliveIndex(*fields):
+    """Index over rows that are not soft-deleted."""
+    return PartialIndex(
+        fields=list(fields), condition=Q(deleted_at__isnull=True), suffix="alv"
+    )
+
+
+def DeadIndex(*fields):
+    """Index over soft-deleted rows, used when purging them."""
+    return PartialIndex(
+        fields=list(fields), condition=Q(deleted_at__isnull=False), suffix="ded"
+    )
+
+
+def add_field_index(cls, index):
+    """
+    Attach an index declared by a field to a concrete model.
+    Skipped when an equivalent index is already declared, e.g. in Meta or
+    when a migration renders the model from its recorded state.
+    """
+    if cls._meta.abstract:
+        return
+    for existing in cls._meta.indexes:
+        if (
+            type(existing) is type(index)
+            and existing.fields == index.fields
+            and existing.condition == index.condition
+            and existing.opclasses == index.opclasses
+        ):
+            return
+    cls._meta.indexes = [*cls._meta.indexes, index]
+    # Migrations only pick up indexes when the model declares the option
+    cls._meta.original_attrs["indexes"] = cls._meta.indexes
+
+
+def add_field_constraint(cls, constraint):
+    """Same as add_field_index, for constraints (matched by name)."""
+    if cls._meta.abstract:
+        return
+    if any(c.name == constraint.name for c in cls._meta.constraints):
+        return
+    cls._meta.constraints = [*cls._meta.constraints, constraint]
+    cls._meta.original_attrs["constraints"] = cls._meta.constraints
+
+
+class ArrayIndex(PartialIndex):
+    """
+    GIN index for array/JSON containment lookups on PostgreSQL.
+    Other databases get a plain index, so the same migrations run everywhere.
+    """
+
+    suffix = "gin"
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        if schema_editor.connection.vendor == "postgresql":
+            using = " USING gin"
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+
+class TrigramIndex(PartialIndex):
+    """
+    Trigram GIN index on UPPER(field), the expression icontains compares on
+    PostgreSQL, so __search and icontains filters can use it. Creates the
+    pg_trgm extension if needed. Other databases get a plain index.
+    """
+
+    suffix = "trg"
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().create_sql(model, schema_editor, using=using, **kwargs)
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        index = models.Index(
+            *[OpClass(Upper(name), name="gin_trgm_ops") for name in self.fields],
+            name=self.name,
+            condition=self.condition,
+        )
+        return index.create_sql(model, schema_editor, using=" USING gin", **kwargs)
@@ -0,0 +1,195 @@
+"""
+Per-request SQL instrumentation.
+
+QueryInstrumentationMiddleware records every query run while a request
+is handled (on all database aliases) and reports the count, total time,
+connections opened, slowest statements and repeated statement shapes
+(N+1) through a Server-Timing header and one structured log line.
+
+Settings:
+    QUERY_BUDGET = 50                   # queries per request, None to disable
+    QUERY_BUDGET_ACTION = "warn"        # or "raise"
+    QUERY_REPEAT_THRESHOLD = 5          # same shape this often counts as N+1
+    QUERY_SLOWEST_COUNT = 3
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger("my_django_app.queries")
+
+# Frames from these packages never count as the origin of a query
+SKIPPED_PATHS = tuple(
+    os.sep + name + os.sep for name in ("django", "rest_framework", "knox", "asgiref")
+)
+
+NUMBER_RE = re.compile(r"\b\d+\b")
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+IN_LIST_RE = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+# Recorders active in the current context, told about new connections
+active_recorders = ContextVar("active_recorders", default=())
+
+
+def count_connection(sender, connection, **kwargs):
+    for recorder in active_recorders.get():
+        recorder.connections += 1
+
+
+connection_created.connect(count_connection)
+
+
+def sql_shape(sql):
+    """The SQL with literals and IN lists collapsed, so N+1 repeats compare equal."""
+    sql = STRING_RE.sub("?", sql)
+    sql = NUMBER_RE.sub("?", sql)
+    return IN_LIST_RE.sub("(...)", sql)
+
+
+def query_origin():
+    """file:line (function) of the innermost frame outside Django/DRF and this module."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename != __file__ and not any(p in filename for p in SKIPPED_PATHS):
+            return f"{filename}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return None
+
+
+class QueryRecorder:
+    """execute_wrapper that keeps count, time and shape statistics of queries."""
+
+    def __init__(self, repeat_threshold=5):
+        self.repeat_threshold = repeat_threshold
+        self.count = 0
+        self.time = 0.0
+        self.connections = 0  # opened while recording, high with CONN_MAX_AGE = 0
+        self.queries = []
+        self.shapes = defaultdict(lambda: {"count": 0, "time": 0.0, "origin": None})
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - start
+            alias = context["connection"].alias
+            self.count += 1
+            self.time += elapsed
+            self.queries.append((elapsed, alias, sql))
+            shape = self.shapes[sql_shape(sql)]
+            shape["count"] += 1
+            shape["time"] += elapsed
+            # The stack is only walked once a shape starts repeating
+            if shape["count"] == 2:
+                shape["origin"] = query_origin()
+
+    def slowest(self, n=3):
+        return [
+            {"sql": sql, "database": alias, "ms": round(elapsed * 1000, 2)}
+            for elapsed, alias, sql in sorted(self.queries, reverse=True)[:n]
+        ]
+
+    def repeated(self):
+        """Statement shapes run at least repeat_threshold times (likely N+1)."""
+        return sorted(
+            (
+                {
+                    "sql": shape,
+                    "count": stats["count"],
+                    "ms": round(stats["time"] * 1000, 2),
+                    "origin": stats["origin"],
+                }
+                for shape, stats in self.shapes.items()
+                if stats["count"] >= self.repeat_threshold
+            ),
+            key=lambda item: -item["count"],
+        )
+
+
+@contextmanager
+def record_queries(repeat_threshold=5, using=None):
+    """
+    Record the queries run inside the block, on every alias by default.
+
+        with record_queries() as recorder:
+            ...
+        recorder.count, recorder.repeated()
+    """
+    recorder = QueryRecorder(repeat_threshold)
+    aliases = [using] if using else list(connections)
+    token = active_recorders.set((*active_recorders.get(), recorder))
+    try:
+        with ExitStack() as stack:
+            for alias in aliases:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            yield recorder
+    finally:
+        active_recorders.reset(token)
+
+
+class QueryInstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.budget = getattr(settings, "QUERY_BUDGET", None)
+        self.budget_action = getattr(settings, "QUERY_BUDGET_ACTION", "warn")
+        self.repeat_threshold = getattr(settings, "QUERY_REPEAT_THRESHOLD", 5)
+        self.slowest_count = getattr(settings, "QUERY_SLOWEST_COUNT", 3)
+
+    def __call__(self, request):
+        start = perf_counter()
+        with record_queries(self.repeat_threshold) as recorder:
+            response = self.get_response(request)
+        total = perf_counter() - start
+
+        db_ms = recorder.time * 1000
+        timing = (
+            f'db;dur={db_ms:.1f};desc="{recorder.count} queries, '
+            f'{recorder.connections} connects", '
+            f"app;dur={(total * 1000 - db_ms):.1f}"
+        )
+        if response.has_header("Server-Timing"):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response["Server-Timing"] = timing
+
+        repeated = recorder.repeated()
+        over_budget = self.budget is not None and recorder.count > self.budget
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": recorder.count,
+            "connections": recorder.connections,
+            "db_ms": round(db_ms, 2),
+            "total_ms": round(total * 1000, 2),
+            "slowest": recorder.slowest(self.slowest_count),
+            "repeated": repeated,
+        }
+        level = logging.WARNING if repeated or over_budget else logging.INFO
+        logger.log(level, json.dumps(record), extra={"queries": record})
+
+        if over_budget:
+            message = (
+                f"{request.method} {request.path} ran {recorder.count} queries "
+                f"(budget {self.budget})"
+            )
+            if self.budget_action == "raise":
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
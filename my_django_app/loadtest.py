@@ -0,0 +1,268 @@
+"""
+Local load driver for the routes built by auto_create_urlpatterns.
+
+Workers replay a weighted mix of list, filter, search, page=all and
+write requests against a running server and the latencies are reported
+per request kind. Request parameters are sampled from the database the
+command runs against, which should be the one the server uses.
+
+    python manage.py loadtest --base-url http://127.0.0.1:8000 \\
+        --concurrency 16 --duration 60 --mix list=40,filter=25,search=20,all=5,write=10
+"""
+
+import json
+import logging
+import random
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.urls import URLPattern, URLResolver, get_resolver
+from .synthetic import DataGenerator
+from .viewsets import CustomModelViewSet, get_char_fields
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIX = {"list": 40, "filter": 25, "search": 20, "all": 5, "write": 10}
+
+
+def parse_mix(value):
+    """'list=40,write=10' -> {"list": 40, "write": 10}"""
+    mix = {}
+    for part in value.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in DEFAULT_MIX:
+            raise ValueError(f"Unknown request kind {kind!r}.")
+        mix[kind] = int(weight or 1)
+    return mix
+
+
+def iter_list_routes(patterns=None, prefix=""):
+    """(viewset, path) for the list route of every CustomModelViewSet in the URLconf."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_list_routes(
+                pattern.url_patterns, prefix + str(pattern.pattern)
+            )
+        elif isinstance(pattern, URLPattern):
+            callback = pattern.callback
+            cls = getattr(callback, "cls", None)
+            actions = getattr(callback, "actions", None) or {}
+            route = str(pattern.pattern)
+            if (
+                cls
+                and issubclass(cls, CustomModelViewSet)
+                and actions.get("get") == "list"
+                and "(?P" not in route
+            ):
+                yield cls, "/" + (prefix + route).replace("^", "").replace("$", "")
+
+
+def percentile(values, q):
+    if not values:
+        return 0
+    values = sorted(values)
+    k = (len(values) - 1) * q / 100
+    low = int(k)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (k - low)
+
+
+class Target:
+    """Request templates for one routed model, sampled from existing rows."""
+
+    def __init__(self, viewset, path, generator, sample_size=200):
+        self.model = viewset.queryset.model
+        self.path = path
+        self.generator = generator
+        self.filters = []
+        self.searches = []
+
+        meta = self.model._meta
+        rows = list(self.model._default_manager.order_by("-pk")[:sample_size])
+        for field in meta.concrete_fields:
+            if field.choices or (field.many_to_one and not field.null):
+                values = {getattr(row, field.attname) for row in rows}
+                # filter_list_queryset takes field names, not attnames
+                self.filters.extend((field.name, v) for v in values if v is not None)
+        for name in get_char_fields(self.model, max_depth=0):
+            words = {
+                word
+                for row in rows
+                for word in str(getattr(row, name, "") or "").split()
+            }
+            self.searches.extend((f"{name}__search", w) for w in words)
+
+    def request(self, kind, rng):
+        """(method, path, body) for one request of the given kind."""
+        if kind == "filter" and self.filters:
+            key, value = rng.choice(self.filters)
+            return "GET", f"{self.path}?{urlencode({key: value})}", None
+        if kind == "search" and self.searches:
+            key, value = rng.choice(self.searches)
+            return "GET", f"{self.path}?{urlencode({key: value})}", None
+        if kind == "all":
+            return "GET", f"{self.path}?page=all", None
+        if kind == "write":
+            return "POST", self.path, self.payload()
+        return "GET", f"{self.path}?page={rng.randint(1, 5)}", None
+
+    def payload(self):
+        with self.generator.lock:
+            obj = self.generator.build(self.model, 0, self.generator.fk_fields(self.model))
+            data = {}
+            for field in self.model._meta.concrete_fields:
+                if field.primary_key or not field.editable:
+                    continue
+                if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+                    continue
+                value = getattr(obj, field.attname)
+                if isinstance(field, models.FileField) or value is None:
+                    continue
+                data[field.name] = value
+        return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+class LoadGenerator(DataGenerator):
+    """DataGenerator whose FK candidates are loaded once and shared by the workers."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self._fk_fields = {}
+
+    def fk_fields(self, model):
+        if model not in self._fk_fields:
+            self._fk_fields[model] = {
+                field: self.get_pks(field.related_model)[:10000]
+                for field in model._meta.concrete_fields
+                if field.is_relation
+            }
+        return self._fk_fields[model]
+
+
+def run_load(
+    base_url,
+    mix=None,
+    concurrency=8,
+    duration=30,
+    requests=None,
+    token=None,
+    models=None,
+    timeout=30,
+    seed=None,
+):
+    """
+    Replay the request mix for `duration` seconds (or `requests` requests)
+    with `concurrency` workers and return latency statistics per kind.
+    A request that raises is counted under its exception's class name in
+    the statuses of its kind; anything failing outside a request is
+    re-raised here.
+    """
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    generator = LoadGenerator(seed=seed)
+    targets = [
+        Target(viewset, path, generator)
+        for viewset, path in iter_list_routes()
+        if not models or viewset.queryset.model._meta.label in models
+    ]
+    if not targets:
+        raise ValueError("No CustomModelViewSet routes found.")
+
+    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+    if token:
+        headers["Authorization"] = f"Token {token}"
+
+    kinds = list(mix)
+    weights = [mix[k] for k in kinds]
+    latencies = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    lock = threading.Lock()
+    sent = 0
+    deadline = perf_counter() + duration
+
+    def next_request():
+        nonlocal sent
+        with lock:
+            if requests is not None and sent >= requests:
+                return None
+            if requests is None and perf_counter() >= deadline:
+                return None
+            sent += 1
+            return rng.choices(kinds, weights)[0], rng.choice(targets)
+
+    def send(kind, target):
+        with lock:
+            method, path, body = target.request(kind, rng)
+        request = Request(base_url.rstrip("/") + path, data=body, method=method)
+        for key, value in headers.items():
+            request.add_header(key, value)
+        try:
+            with urlopen(request, timeout=timeout) as response:
+                response.read()
+                return response.status
+        except HTTPError as e:
+            return e.code
+        except (URLError, OSError):
+            return "error"
+
+    logged = set()
+
+    def worker():
+        while True:
+            item = next_request()
+            if item is None:
+                return
+            kind, target = item
+            start = perf_counter()
+            try:
+                status = send(kind, target)
+            except Exception as e:
+                status = type(e).__name__
+                with lock:
+                    first = status not in logged
+                    logged.add(status)
+                if first:
+                    logger.exception("Load test %s request failed", kind)
+            elapsed = perf_counter() - start
+            with lock:
+                latencies[kind].append(elapsed)
+                statuses[kind][status] += 1
+
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(worker) for _ in range(concurrency)]
+    wall = perf_counter() - start
+    for future in futures:
+        future.result()
+
+    report = {"concurrency": concurrency, "seconds": wall, "kinds": {}}
+    for kind, values in latencies.items():
+        report["kinds"][kind] = {
+            "requests": len(values),
+            "rps": len(values) / wall if wall else 0,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p90_ms": percentile(values, 90) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "max_ms": max(values) * 1000,
+            "statuses": {str(k): v for k, v in statuses[kind].items()},
+        }
+    total = [v for values in latencies.values() for v in values]
+    report["total"] = {
+        "requests": len(total),
+        "rps": len(total) / wall if wall else 0,
+        "p50_ms": percentile(total, 50) * 1000,
+        "p95_ms": percentile(total, 95) * 1000,
+        "p99_ms": percentile(total, 99) * 1000,
+    }
+    return report
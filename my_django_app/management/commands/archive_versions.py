@@ -0,0 +1,61 @@
+from datetime import timedelta
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from ...fields import ImmutableModel
+
+
+class Command(BaseCommand):
+    help = "Move inactive ImmutableModel versions older than N days to their archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help="app_label.Model to archive (default: every ImmutableModel with an archive).",
+        )
+        parser.add_argument("--days", type=int, default=90)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.1,
+            help="Seconds to sleep between batches.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be archived and the space it would reclaim.",
+        )
+
+    def handle(self, *args, **options):
+        if options["models"]:
+            try:
+                models = [apps.get_model(label) for label in options["models"]]
+            except (LookupError, ValueError) as e:
+                raise CommandError(e)
+        else:
+            models = [
+                m
+                for m in apps.get_models()
+                if issubclass(m, ImmutableModel)
+                and (m.archive_model or m.archive_database)
+            ]
+
+        before = timezone.now() - timedelta(days=options["days"])
+        for model in models:
+            if not issubclass(model, ImmutableModel):
+                raise CommandError(f"{model._meta.label} is not an ImmutableModel.")
+            if options["dry_run"]:
+                report = model.objects.archive_report(before)
+                reclaimable = report["reclaimable_bytes"]
+                self.stdout.write(
+                    f"{report['model']} -> {report['archive']} ({report['database']}): "
+                    f"{report['archivable_rows']}/{report['total_rows']} rows"
+                    + (f", ~{reclaimable} bytes" if reclaimable is not None else "")
+                )
+                continue
+            moved = model.objects.archive(
+                before, batch_size=options["batch_size"], pause=options["pause"]
+            )
+            self.stdout.write(f"{model._meta.label}: archived {moved} versions")
@@ -0,0 +1,89 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from ...benchmarks import compare, load_report, run_benchmarks, save_report
+
+
+class Command(BaseCommand):
+    help = "Benchmark the generic REST stack on synthetic models and compare with a baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "cases",
+            nargs="*",
+            help="Only run these cases (default: all).",
+        )
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Database alias to benchmark on; a test database is created for it.",
+        )
+        parser.add_argument("--rows", type=int, default=2000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+        parser.add_argument("--baseline", help="Compare against this JSON report.")
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Overwrite the --baseline file with this run.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=1.1,
+            help="Median time ratio above which a case counts as a regression.",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error when a regression is found.",
+        )
+
+    def handle(self, *args, **options):
+        if options["database"] not in connections:
+            raise CommandError(f"Unknown database alias {options['database']!r}.")
+
+        report = run_benchmarks(
+            using=options["database"],
+            rows=options["rows"],
+            repeat=options["repeat"],
+            only=options["cases"],
+        )
+
+        self.stdout.write(
+            f"{'case':<24}{'median ms':>12}{'min ms':>10}{'queries':>9}{'peak KB':>10}"
+        )
+        for name, r in report["results"].items():
+            self.stdout.write(
+                f"{name:<24}{r['median_ms']:>12.2f}{r['min_ms']:>10.2f}"
+                f"{r['queries']:>9}{r['peak_kb']:>10.0f}"
+            )
+
+        if options["output"]:
+            save_report(report, options["output"])
+
+        baseline = options["baseline"]
+        if not baseline:
+            return
+        if options["save_baseline"]:
+            save_report(report, baseline)
+            self.stdout.write(f"Saved baseline to {baseline}")
+            return
+
+        try:
+            regressions = compare(
+                report, load_report(baseline), threshold=options["threshold"]
+            )
+        except FileNotFoundError:
+            raise CommandError(f"Baseline {baseline} does not exist, use --save-baseline.")
+
+        for r in regressions:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{r['case']}: {r['baseline_median_ms']:.2f} -> {r['median_ms']:.2f} ms "
+                    f"(x{r['ratio']:.2f}), queries {r['baseline_queries']} -> {r['queries']}"
+                )
+            )
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+        elif options["fail_on_regression"]:
+            raise CommandError(f"{len(regressions)} regression(s) against {baseline}.")
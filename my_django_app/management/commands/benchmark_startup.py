@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+from statistics import median
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from importlib import import_module
+from django.conf import settings
+from django.urls import get_resolver
+import_module(settings.ROOT_URLCONF)
+get_resolver().url_patterns
+end = time.perf_counter()
+print(setup - start, end - setup, end - start)
+"""
+
+
+class Command(BaseCommand):
+    help = "Measure cold start time (django.setup() and URLconf import) in fresh interpreters."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--json", action="store_true", help="Print the timings as JSON."
+        )
+
+    def handle(self, *args, **options):
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": os.environ.get(
+                "DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE
+            ),
+            # The child should find the project the same way manage.py did
+            "PYTHONPATH": os.pathsep.join(p for p in sys.path if p),
+        }
+        runs = []
+        for _ in range(options["repeat"]):
+            result = subprocess.run(
+                [sys.executable, "-c", STARTUP_SCRIPT],
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode:
+                raise CommandError(result.stderr.strip())
+            runs.append([float(t) for t in result.stdout.split()[-3:]])
+
+        report = {}
+        for i, stage in enumerate(["setup", "urls", "total"]):
+            times = [run[i] for run in runs]
+            report[stage] = {
+                "min": min(times),
+                "median": median(times),
+                "max": max(times),
+            }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for stage, t in report.items():
+            self.stdout.write(
+                f"{stage:>6}: min {t['min'] * 1000:.1f} ms, "
+                f"median {t['median'] * 1000:.1f} ms, max {t['max'] * 1000:.1f} ms"
+            )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from ...storage import collect_garbage
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove content-addressed files that no row refers to any more. "
+        "Deleting a row never removes its file, since other rows may share it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=float,
+            default=24,
+            help="Keep files younger than this many hours (uploads not yet saved).",
+        )
+        parser.add_argument("--database", default=None)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the files that would be removed.",
+        )
+
+    def handle(self, *args, **options):
+        removed = collect_garbage(
+            min_age=options["min_age"] * 3600,
+            dry_run=options["dry_run"],
+            using=options["database"],
+        )
+        for name in removed:
+            self.stdout.write(name)
+        verb = "would be removed" if options["dry_run"] else "removed"
+        self.stdout.write(f"{len(removed)} files {verb}")
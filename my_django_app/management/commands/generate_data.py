@@ -0,0 +1,69 @@
+from time import perf_counter
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from ...fields import CustomModel
+from ...synthetic import DataGenerator
+
+
+class Command(BaseCommand):
+    help = "Bulk-generate synthetic rows for CustomModels, filling FK targets as needed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="+",
+            help="app_label.Model, optionally with a row count: shop.Item=1000000",
+        )
+        parser.add_argument(
+            "--rows", type=int, default=1000, help="Rows per model without a count."
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--fanout",
+            type=int,
+            default=10,
+            help="Average number of rows per FK target row.",
+        )
+        parser.add_argument(
+            "--m2m", type=int, default=3, help="Average links per M2M field."
+        )
+        parser.add_argument("--null-ratio", type=float, default=0.1)
+        parser.add_argument(
+            "--deleted-ratio",
+            type=float,
+            default=0.0,
+            help="Share of soft-deletable rows generated as deleted.",
+        )
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        targets = []
+        for spec in options["models"]:
+            label, _, rows = spec.partition("=")
+            try:
+                model = apps.get_model(label)
+            except (LookupError, ValueError) as e:
+                raise CommandError(e)
+            if not issubclass(model, CustomModel):
+                raise CommandError(f"{model._meta.label} is not a CustomModel.")
+            targets.append((model, int(rows) if rows else options["rows"]))
+
+        generator = DataGenerator(
+            using=options["database"],
+            seed=options["seed"],
+            fanout=options["fanout"],
+            m2m=options["m2m"],
+            null_ratio=options["null_ratio"],
+            deleted_ratio=options["deleted_ratio"],
+            batch_size=options["batch_size"],
+            log=self.stdout.write if options["verbosity"] > 1 else None,
+        )
+        for model, rows in targets:
+            start = perf_counter()
+            created = generator.generate(model, rows)
+            elapsed = perf_counter() - start
+            self.stdout.write(
+                f"{model._meta.label}: {created} rows in {elapsed:.1f}s "
+                f"({created / elapsed if elapsed else 0:.0f} rows/s)"
+            )
@@ -0,0 +1,54 @@
+import json
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from ...imports import IMPORT_FORMATS, guess_import_format, import_rows
+from ...serializers import get_serializer_class
+
+
+class Command(BaseCommand):
+    help = "Import a CSV, TSV or NDJSON file into a model through its CustomSerializer."
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", help="app_label.Model")
+        parser.add_argument("path")
+        parser.add_argument(
+            "--import-format",
+            choices=IMPORT_FORMATS,
+            help="Default: from the file extension.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument(
+            "--errors", type=int, default=20, help="Row errors to print."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options["model"])
+        except (LookupError, ValueError) as e:
+            raise CommandError(e)
+
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+        import_format = options["import_format"] or guess_import_format(options["path"])
+        try:
+            with open(options["path"], "rb") as f:
+                result = import_rows(
+                    get_serializer_class(model),
+                    f,
+                    import_format,
+                    batch_size=options["batch_size"],
+                    dry_run=options["dry_run"],
+                )
+        except OSError as e:
+            raise CommandError(e)
+        if "error" in result:
+            raise CommandError(result["error"])
+
+        for error in result["errors"][: options["errors"]]:
+            self.stderr.write(f"row {error['row']}: {json.dumps(error['errors'])}")
+        self.stdout.write(
+            f"{model._meta.label}: {result['rows']} rows, {result['created']} created, "
+            f"{result['updated']} updated, {result['failed']} failed"
+            + (" (dry run)" if result["dry_run"] else "")
+        )
@@ -0,0 +1,110 @@
+import os
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.loader import MigrationLoader
+from ...index_advisor import (
+    aggregate,
+    group_by_app,
+    is_project_app,
+    load_shapes,
+    missing_indexes,
+    render_migration,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Propose the indexes missing for the list requests recorded in "
+        "LIST_SHAPE_LOG, or write them as a migration."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--log",
+            help="JSON-lines file written by the viewsets (default: LIST_SHAPE_LOG).",
+        )
+        parser.add_argument(
+            "--min-count",
+            type=int,
+            default=5,
+            help="Ignore indexes serving fewer recorded requests.",
+        )
+        parser.add_argument(
+            "--min-ms",
+            type=float,
+            default=0,
+            help="Ignore indexes whose requests averaged less than this.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--write",
+            action="store_true",
+            help=(
+                "Write a migration per project app instead of printing the SQL; "
+                "indexes on installed packages are still printed."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        path = options["log"] or getattr(settings, "LIST_SHAPE_LOG", None)
+        if not path:
+            raise CommandError("Pass --log or set LIST_SHAPE_LOG.")
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist.")
+
+        connection = connections[options["database"]]
+        candidates = [
+            c
+            for c in aggregate(load_shapes(path))
+            if c.requests >= options["min_count"]
+            and c.total_ms / c.requests >= options["min_ms"]
+        ]
+        missing = missing_indexes(candidates, connection)
+        if connection.vendor != "postgresql":
+            self.stderr.write("Trigram indexes are only proposed on PostgreSQL.")
+        if not connection.features.supports_partial_indexes:
+            self.stderr.write(
+                f"{connection.vendor} has no partial indexes: their conditions "
+                "lead full indexes instead."
+            )
+        if not missing:
+            self.stdout.write("No missing indexes.")
+            return
+
+        groups = group_by_app(missing)
+        written = set()
+        if options["write"]:
+            written = {label for label in groups if is_project_app(label)}
+
+        for candidate in missing:
+            self.stdout.write(
+                f"{candidate.describe()}: {candidate.requests} requests, "
+                f"avg {candidate.total_ms / candidate.requests:.1f} ms, "
+                f"max {candidate.max_ms:.1f} ms"
+            )
+            if candidate.model._meta.app_label not in written:
+                self.stdout.write(f"    {candidate.create_sql(connection)};")
+
+        if options["write"]:
+            for app_label in sorted(set(groups) - written):
+                self.stderr.write(
+                    f"{app_label} is an installed package: apply its SQL above "
+                    "by hand or from a migration of your own."
+                )
+            loader = MigrationLoader(connection, ignore_no_migrations=True)
+            for app_label in sorted(written):
+                self.write_migration(loader, connection, app_label, groups[app_label])
+
+    def write_migration(self, loader, connection, app_label, candidates):
+        leaves = loader.graph.leaf_nodes(app_label)
+        if not leaves:
+            raise CommandError(f"{app_label} has no migrations to depend on.")
+        numbers = [name.split("_")[0] for _, name in leaves]
+        number = max((int(n) for n in numbers if n.isdigit()), default=0) + 1
+        directory = os.path.join(apps.get_app_config(app_label).path, "migrations")
+        path = os.path.join(directory, f"{number:04d}_index_advisor.py")
+        with open(path, "w") as f:
+            f.write(render_migration(candidates, connection, leaves))
+        self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
@@ -0,0 +1,82 @@
+import json
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from ...loadtest import DEFAULT_MIX, parse_mix, run_load
+
+
+class Command(BaseCommand):
+    help = "Replay a mix of list/filter/search/page=all/write requests against a running server."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--duration", type=float, default=30, help="Seconds.")
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=None,
+            help="Stop after this many requests instead of after --duration.",
+        )
+        parser.add_argument(
+            "--mix",
+            default=",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+            help="Weighted request kinds: list, filter, search, all, write.",
+        )
+        parser.add_argument("--token", help="Knox token to authenticate with.")
+        parser.add_argument(
+            "--user", help="Create a knox token for this username instead of --token."
+        )
+        parser.add_argument(
+            "--models", nargs="*", help="Only hit these app_label.Model routes."
+        )
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options["mix"])
+        except ValueError as e:
+            raise CommandError(e)
+
+        token = options["token"]
+        if options["user"]:
+            from knox.models import AuthToken
+
+            try:
+                user = get_user_model().objects.get_by_natural_key(options["user"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user {options['user']!r}.")
+            _, token = AuthToken.objects.create(user)
+
+        try:
+            report = run_load(
+                options["base_url"],
+                mix=mix,
+                concurrency=options["concurrency"],
+                duration=options["duration"],
+                requests=options["requests"],
+                token=token,
+                models=options["models"],
+                seed=options["seed"],
+            )
+        except ValueError as e:
+            raise CommandError(e)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'kind':<8}{'reqs':>7}{'rps':>8}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}  statuses"
+        )
+        for kind, r in report["kinds"].items():
+            self.stdout.write(
+                f"{kind:<8}{r['requests']:>7}{r['rps']:>8.1f}{r['p50_ms']:>9.1f}"
+                f"{r['p90_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}  {r['statuses']}"
+            )
+        t = report["total"]
+        self.stdout.write(
+            f"total: {t['requests']} requests in {report['seconds']:.1f}s, "
+            f"{t['rps']:.1f} req/s, p50 {t['p50_ms']:.1f} ms, "
+            f"p95 {t['p95_ms']:.1f} ms, p99 {t['p99_ms']:.1f} ms"
+        )
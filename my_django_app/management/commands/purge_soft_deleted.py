@@ -0,0 +1,55 @@
+from datetime import timedelta
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from ...fields import SoftDeleteModel
+
+
+class Command(BaseCommand):
+    help = "Permanently delete rows soft-deleted more than N days ago, in throttled batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help="app_label.Model to purge (default: every SoftDeleteModel).",
+        )
+        parser.add_argument("--days", type=int, default=30)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.1,
+            help="Seconds to sleep between batches.",
+        )
+        parser.add_argument("--database", default=None)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the rows that would be purged.",
+        )
+
+    def handle(self, *args, **options):
+        if options["models"]:
+            try:
+                models = [apps.get_model(label) for label in options["models"]]
+            except (LookupError, ValueError) as e:
+                raise CommandError(e)
+        else:
+            models = [m for m in apps.get_models() if issubclass(m, SoftDeleteModel)]
+
+        before = timezone.now() - timedelta(days=options["days"])
+        for model in models:
+            if not issubclass(model, SoftDeleteModel):
+                raise CommandError(f"{model._meta.label} is not a SoftDeleteModel.")
+            manager = model.objects.db_manager(options["database"])
+            if options["dry_run"]:
+                count = model.all_objects.db_manager(options["database"]).filter(
+                    deleted_at__lt=before
+                ).count()
+                self.stdout.write(f"{model._meta.label}: {count} rows would be purged")
+                continue
+            deleted, _ = manager.purge(
+                before, batch_size=options["batch_size"], pause=options["pause"]
+            )
+            self.stdout.write(f"{model._meta.label}: purged {deleted} rows")
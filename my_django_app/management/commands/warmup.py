@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from ...warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = "Build the URL resolver, serializer and metadata caches a worker needs, and report the time taken."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-connect",
+            action="store_true",
+            help="Do not open database connections.",
+        )
+
+    def handle(self, *args, **options):
+        timings = warm_up(connect=not options["no_connect"])
+        for stage, seconds in timings.items():
+            self.stdout.write(f"{stage}: {seconds * 1000:.1f} ms")
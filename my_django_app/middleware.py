@@ -1,8 +1,171 @@
-class CsrfExemptMobileMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+from lzstring import LZString
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
-    def __call__(self, request):
+
+class CsrfExemptMobileMiddleware(MiddlewareMixin):
+    # MiddlewareMixin makes it usable in both WSGI and ASGI stacks
+    def process_request(self, request):
         if request.headers.get("X-From-Mobile") == "true":
             setattr(request, "_dont_enforce_csrf_checks", True)
-        return self.get_response(request)
+
+
+def parse_accept_encoding(value):
+    """'gzip, br;q=0.5' -> {"gzip": 1.0, "br": 0.5}"""
+    codings = {}
+    for part in value.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            codings[coding.lower()] = q
+    return codings
+
+
+def is_text_content(content_type):
+    """Whether a Content-Type is text LZString can carry."""
+    media_type = content_type.split(";")[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type.endswith(("/json", "+json", "/xml", "+xml"))
+        or media_type == "application/javascript"
+    )
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses responses with brotli (when the brotli package is installed)
+    or gzip, as negotiated by Accept-Encoding. Bodies under
+    COMPRESSION_MIN_SIZE bytes are sent as they are.
+
+    A request with `X-Compress: lzstring` gets a text body (text/*, JSON,
+    JavaScript or XML) as LZString.compressToEncodedURIComponent() text
+    instead, marked with an `X-Content-Encoding: lzstring` response header,
+    for clients that already decode `q` with lz-string. Other bodies are
+    negotiated by Accept-Encoding as usual.
+
+    Place it below UpdateCacheMiddleware and above FetchFromCacheMiddleware:
+
+        MIDDLEWARE = [
+            "django.middleware.cache.UpdateCacheMiddleware",
+            "my_django_app.middleware.CompressionMiddleware",
+            ...
+            "django.middleware.cache.FetchFromCacheMiddleware",
+        ]
+
+    The cache then stores the compressed body, keyed on the Vary headers
+    set here, and a cache hit already carries its Content-Encoding so it
+    is not compressed again.
+
+    Settings:
+        COMPRESSION_MIN_SIZE = 1024
+        COMPRESSION_BROTLI_QUALITY = 5
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+        self.brotli_quality = getattr(settings, "COMPRESSION_BROTLI_QUALITY", 5)
+
+    def get_encoding(self, request, response):
+        # LZString needs the whole body as text, others fall back to Accept-Encoding
+        if (
+            request.headers.get("X-Compress", "").lower() == "lzstring"
+            and not response.streaming
+            and is_text_content(response.get("Content-Type", ""))
+        ):
+            return "lzstring"
+        codings = parse_accept_encoding(request.headers.get("Accept-Encoding", ""))
+        if brotli is not None and codings.get("br", 0) > 0:
+            return "br"
+        if codings.get("gzip", codings.get("*", 0)) > 0:
+            return "gzip"
+        return None
+
+    def compress(self, encoding, content, charset="utf-8"):
+        if encoding == "br":
+            return brotli.compress(content, quality=self.brotli_quality)
+        if encoding == "gzip":
+            return compress_string(content)
+        try:
+            text = content.decode(charset)
+        except (UnicodeDecodeError, LookupError):
+            return None
+        return LZString().compressToEncodedURIComponent(text).encode()
+
+    def compress_sequence(self, encoding, sequence):
+        if encoding == "gzip":
+            yield from compress_sequence(sequence)
+            return
+        compressor = brotli.Compressor(quality=self.brotli_quality)
+        for chunk in sequence:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+
+    async def acompress_sequence(self, encoding, sequence):
+        if encoding == "gzip":
+            # Each chunk is its own gzip member, as in Django's GZipMiddleware
+            async for chunk in sequence:
+                yield compress_string(chunk)
+            return
+        compressor = brotli.Compressor(quality=self.brotli_quality)
+        async for chunk in sequence:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+
+    def process_response(self, request, response):
+        # Already compressed, e.g. a hit from the cache middleware
+        if response.has_header("Content-Encoding") or response.has_header(
+            "X-Content-Encoding"
+        ):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding", "X-Compress"))
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        encoding = self.get_encoding(request, response)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.acompress_sequence(
+                    encoding, response.streaming_content
+                )
+            else:
+                response.streaming_content = self.compress_sequence(
+                    encoding, response.streaming_content
+                )
+            del response.headers["Content-Length"]
+        else:
+            content = self.compress(encoding, response.content, response.charset)
+            if content is None or len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers["Content-Length"] = str(len(content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        if encoding == "lzstring":
+            response.headers["X-Content-Encoding"] = "lzstring"
+        else:
+            response.headers["Content-Encoding"] = encoding
+        return response
+
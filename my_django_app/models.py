@@ -0,0 +1,3 @@
+# The app defines no models of its own. The module exists so that the
+# test models (tests/models.py), registered under this app's label, get
+# their tables created in the test database.
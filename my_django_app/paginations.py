@@ -4,13 +4,46 @@ from django.db.models import DateTimeField, DateField, TimeField
 from .fields import AmountField
 import math
 from django.db.models.fields import Field
+from functools import lru_cache
 
 
+@lru_cache(maxsize=1024)
 def to_camel_case(s):
     parts = s.split("_")
     return parts[0] + "".join(p.capitalize() for p in parts[1:])
 
 
+@lru_cache(maxsize=None)
+def get_field_kinds(model):
+    """
+    The fields build_field_metadata reports on, as
+    (field, camelCase name, kind, choice labels), computed once per model.
+    """
+    kinds = []
+    for field in model._meta.get_fields():
+        if not isinstance(field, Field):
+            continue
+        if field.is_relation and (
+            field.many_to_one or field.many_to_many or field.one_to_one
+        ):
+            kind = "related"
+        elif getattr(field, "choices", None):
+            kind = "option"
+        elif isinstance(field, DateTimeField):
+            kind = "datetime"
+        elif isinstance(field, DateField):
+            kind = "date"
+        elif isinstance(field, TimeField):
+            kind = "time"
+        elif isinstance(field, AmountField):
+            kind = "price"
+        else:
+            continue
+        labels = dict(field.choices) if kind == "option" else None
+        kinds.append((field, to_camel_case(field.name), kind, labels))
+    return tuple(kinds)
+
+
 class CustomPagination(PageNumberPagination):
     page_size_query_param = "page_size"
 
@@ -18,6 +51,8 @@ class CustomPagination(PageNumberPagination):
         self.model = None
         self.page_param = None
         self.all_data = None
+        self.fields = None
+        self.include_meta = True
         super().__init__(*args, **kwargs)
 
     def paginate_queryset(self, queryset, request, view=None):
@@ -34,16 +69,21 @@ class CustomPagination(PageNumberPagination):
         date_fields, price_fields, time_fields = [], [], []
 
         if self.model:
-            for field in self.model._meta.get_fields():
-                if not isinstance(field, Field):
-                    continue
+            kind_lists = {
+                "datetime": datetime_fields,
+                "date": date_fields,
+                "time": time_fields,
+                "price": price_fields,
+            }
+            for field, camel_name, kind, labels in get_field_kinds(self.model):
                 field_name = field.name
+                # Fields left out of a sparse response are not loaded either
+                if self.fields is not None and field_name not in self.fields:
+                    continue
                 values = set()
 
-                if field.is_relation and (
-                    field.many_to_one or field.many_to_many or field.one_to_one
-                ):
-                    related_fields.append(to_camel_case(field.name))
+                if kind == "related":
+                    related_fields.append(camel_name)
                     for obj in objects:
                         value = getattr(obj, field_name, None)
                         if not value:
@@ -55,15 +95,16 @@ class CustomPagination(PageNumberPagination):
                     related.extend(
                         [
                             {
-                                "field": to_camel_case(field_name),
+                                "field": camel_name,
                                 "id": rel.pk,
-                                "name": str(rel),
+                                # Annotated on ?expand= rows, see expand_queryset()
+                                "name": getattr(rel, "display_name", None) or str(rel),
                             }
                             for rel in values
                         ]
                     )
-                elif getattr(field, "choices", None):
-                    option_fields.append(to_camel_case(field.name))
+                elif kind == "option":
+                    option_fields.append(camel_name)
                     for obj in objects:
                         raw_value = getattr(obj, field_name, None)
                         if raw_value is not None:
@@ -71,21 +112,15 @@ class CustomPagination(PageNumberPagination):
                     related.extend(
                         [
                             {
-                                "field": to_camel_case(field_name),
+                                "field": camel_name,
                                 "id": val,
-                                "name": dict(field.choices).get(val, str(val)),
+                                "name": labels.get(val, str(val)),
                             }
                             for val in values
                         ]
                     )
-                elif isinstance(field, DateTimeField):
-                    datetime_fields.append(to_camel_case(field.name))
-                elif isinstance(field, DateField):
-                    date_fields.append(to_camel_case(field.name))
-                elif isinstance(field, TimeField):
-                    time_fields.append(to_camel_case(field.name))
-                elif isinstance(field, AmountField):
-                    price_fields.append(to_camel_case(field.name))
+                else:
+                    kind_lists[kind].append(camel_name)
 
         return {
             "related": related,
@@ -103,7 +138,11 @@ class CustomPagination(PageNumberPagination):
         ]
 
         if self.page_param == "all":
-            meta = self.build_field_metadata(self.all_data, data)
+            meta = (
+                self.build_field_metadata(self.all_data, data)
+                if self.include_meta
+                else {}
+            )
             return Response(
                 {
                     "count": len(data),
@@ -121,7 +160,7 @@ class CustomPagination(PageNumberPagination):
         total_pages = math.ceil(
             self.page.paginator.count / self.page.paginator.per_page
         )
-        meta = self.build_field_metadata(self.page, data)
+        meta = self.build_field_metadata(self.page, data) if self.include_meta else {}
 
         return Response(
             {
@@ -0,0 +1,222 @@
+"""
+On-demand profiling of single requests.
+
+With ProfilingMiddleware installed, a staff user can send a request with
+an `X-Profile: 1` header or a `_profile=1` query parameter to have it run
+under cProfile. The whole request is covered: authentication, the view
+(e.g. CustomModelViewSet.list), serialization, pagination metadata and
+rendering. Each profile is written to PROFILE_DIR as a pstats file with a
+JSON sidecar (view name, params, status, timing, top functions), and the
+response carries an X-Profile-Id header.
+
+Settings:
+    PROFILE_DIR = "/var/tmp/profiles"
+    PROFILE_SAMPLE_RATE = 1.0   # share of flagged requests that get profiled
+    PROFILE_KEEP = 200          # newest profiles kept on disk
+
+Profiles are listed and downloaded through profiling_url_patterns().
+
+Only one request per process is profiled at a time (Python refuses a
+second active profiler); a flagged request arriving meanwhile runs
+unprofiled, without an X-Profile-Id.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import uuid
+from time import perf_counter
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
+from rest_framework.exceptions import AuthenticationFailed
+
+PROFILE_NAME_RE = re.compile(r"^[\w.-]+\.prof$")
+profile_lock = threading.Lock()
+
+
+def get_profile_dir():
+    path = getattr(settings, "PROFILE_DIR", None) or os.path.join(
+        tempfile.gettempdir(), "my_django_app_profiles"
+    )
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_staff_user(request):
+    """The staff user behind the request, from the session or a knox token."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user if user.is_staff else None
+
+    # Only the cookie and header: reading request.data here would consume the body
+    token = request.COOKIES.get("knox_token")
+    header = request.headers.get("Authorization", "")
+    if not token and header.startswith("Token "):
+        token = header.split("Token ")[1]
+    if not token:
+        return None
+
+    from .viewsets import CustomAuthentication
+
+    try:
+        user, _ = CustomAuthentication().authenticate_credentials(token.encode("utf-8"))
+    except AuthenticationFailed:
+        return None
+    return user if user.is_staff else None
+
+
+def top_functions(profiler, limit=25):
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, name), (cc, nc, tt, ct, _) in stats.stats.items():
+        rows.append(
+            {
+                "function": f"{filename}:{line}({name})",
+                "calls": nc,
+                "tottime_ms": round(tt * 1000, 3),
+                "cumtime_ms": round(ct * 1000, 3),
+            }
+        )
+    rows.sort(key=lambda row: -row["cumtime_ms"])
+    return rows[:limit]
+
+
+def prune_profiles(directory, keep):
+    profiles = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith(".prof")),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in profiles[keep:]:
+        for path in (entry.path, entry.path[: -len(".prof")] + ".json"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "PROFILE_SAMPLE_RATE", 1.0)
+        self.keep = getattr(settings, "PROFILE_KEEP", 200)
+
+    def wants_profile(self, request):
+        flagged = (
+            request.headers.get("X-Profile") == "1"
+            or request.GET.get("_profile") == "1"
+        )
+        if not flagged or random.random() >= self.sample_rate:
+            return None
+        return get_staff_user(request)
+
+    def __call__(self, request):
+        user = self.wants_profile(request)
+        if user is None or not profile_lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self.profile(request, user)
+        finally:
+            profile_lock.release()
+
+    def profile(self, request, user):
+        profiler = cProfile.Profile()
+        start = perf_counter()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active, e.g. a debugger or coverage tool
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        elapsed = perf_counter() - start
+
+        now = timezone.now()
+        match = request.resolver_match
+        view = (match.view_name or match._func_path) if match else ""
+        slug = re.sub(r"[^\w.-]+", "-", view or "unresolved")[:60]
+        profile_id = f"{now:%Y%m%d-%H%M%S}-{slug}-{uuid.uuid4().hex[:8]}"
+        directory = get_profile_dir()
+        profiler.dump_stats(os.path.join(directory, f"{profile_id}.prof"))
+        meta = {
+            "id": profile_id,
+            "created_at": now.isoformat(),
+            "view": view,
+            "method": request.method,
+            "path": request.path,
+            "params": {k: request.GET.getlist(k) for k in request.GET},
+            "status": response.status_code,
+            "duration_ms": round(elapsed * 1000, 2),
+            "user": user.get_username(),
+            "top": top_functions(profiler),
+        }
+        with open(os.path.join(directory, f"{profile_id}.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        prune_profiles(directory, self.keep)
+
+        response["X-Profile-Id"] = profile_id
+        return response
+
+
+def load_profile_meta(directory, name):
+    try:
+        with open(os.path.join(directory, name[: -len(".prof")] + ".json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"id": name[: -len(".prof")]}
+
+
+@staff_member_required
+def profile_list(request):
+    directory = get_profile_dir()
+    names = sorted(
+        (n for n in os.listdir(directory) if PROFILE_NAME_RE.match(n)), reverse=True
+    )
+    rows = format_html_join(
+        "",
+        "<tr><td>{}</td><td>{} {}</td><td>{}</td><td>{}</td><td>{} ms</td>"
+        '<td><a href="{}">{}</a></td></tr>',
+        (
+            (
+                meta.get("created_at", ""),
+                meta.get("method", ""),
+                meta.get("path", ""),
+                meta.get("view", ""),
+                meta.get("status", ""),
+                meta.get("duration_ms", ""),
+                name,
+                name,
+            )
+            for name in names
+            for meta in [load_profile_meta(directory, name)]
+        ),
+    )
+    return HttpResponse(
+        format_html(
+            "<h1>Request profiles</h1><table><tr><th>Created</th><th>Request</th>"
+            "<th>View</th><th>Status</th><th>Duration</th><th>Profile</th></tr>"
+            "{}</table>",
+            rows,
+        )
+    )
+
+
+@staff_member_required
+def profile_download(request, name):
+    if not PROFILE_NAME_RE.match(name):
+        raise Http404
+    path = os.path.join(get_profile_dir(), name)
+    if not os.path.isfile(path):
+        raise Http404
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=name)
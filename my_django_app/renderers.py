@@ -0,0 +1,285 @@
+"""
+Renderers used by CustomModelViewSet.
+
+FastCamelCaseJSONRenderer produces the same bytes as
+djangorestframework-camel-case's CamelCaseJSONRenderer on top of DRF's
+JSONRenderer, but converts each distinct key once (the conversions are
+cached) and encodes with orjson when it is installed
+(`pip install my_django_app[fast]`). Decimal, datetime, date, time and
+UUID values are handled natively; anything orjson cannot encode, and
+indented output, go through DRF's encoder as before.
+
+ColumnarRenderer is selected with `Accept: application/vnd.columnar+json`
+or `?format=columnar`. Instead of a list of objects (and the `ids` array)
+the page is sent column by column:
+
+    {
+        "count": 3, "currentPage": 1, ..., "related": [...], ...,
+        "columns": ["id", "name", "status", "category"],
+        "encodings": {"id": "delta", "status": "dict", "category": "dict"},
+        "dictionaries": {"status": [0, 1], "category": [7, 9]},
+        "data": {
+            "id": [12, -1, -1],
+            "name": ["a", "b", "c"],
+            "status": [1, 0, 1],
+            "category": [0, 0, 1]
+        }
+    }
+
+With `?layout=rows`, "data" is replaced by "rows": one array per row with
+the values in "columns" order, e.g. [[12, "a", 1, 0], [-1, "b", 0, 0], ...].
+
+Decoding (every other key keeps its usual meaning):
+
+    - "delta": the first value is as-is, each next value is the previous
+      decoded value plus the given one.
+    - "dict": each non-null value is an index into dictionaries[column];
+      null stays null.
+    - columns without an encoding are sent as-is.
+
+    function decode(payload) {
+      const { columns, encodings = {}, dictionaries = {} } = payload;
+      const n = payload.rows ? payload.rows.length : payload.data[columns[0]].length;
+      const values = {};
+      columns.forEach((column, c) => {
+        let col = payload.rows ? payload.rows.map((row) => row[c]) : payload.data[column];
+        if (encodings[column] === "delta") {
+          let prev = 0;
+          col = col.map((v) => (prev += v));
+        } else if (encodings[column] === "dict") {
+          col = col.map((v) => (v === null ? null : dictionaries[column][v]));
+        }
+        values[column] = col;
+      });
+      return Array.from({ length: n }, (_, i) =>
+        Object.fromEntries(columns.map((column) => [column, values[column][i]]))
+      );
+    }
+
+Choice and foreign key columns are dictionary encoded, integer ids are
+delta encoded. Responses that are not a page of results (retrieve,
+errors, counts) are rendered as plain camelCase JSON.
+"""
+
+from functools import lru_cache
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+from djangorestframework_camel_case.settings import (
+    api_settings as camel_case_settings,
+)
+from djangorestframework_camel_case.util import (
+    camelize_re,
+    is_iterable,
+    underscore_to_camel,
+)
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from .paginations import get_field_kinds
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+class ExponentFloat(float):
+    """
+    A float json writes in exponent form (1e+16) where orjson would write
+    1e16; orjson rejects the subclass, so the json encoder renders it.
+    """
+
+
+def needs_exponent(value):
+    """Whether json and orjson write this float differently (or not at all)."""
+    return type(value) is float and value != 0 and not 1e-4 <= abs(value) < 1e16
+
+
+@lru_cache(maxsize=4096)
+def camelize_key(key):
+    return camelize_re.sub(underscore_to_camel, key)
+
+
+def fast_camelize(data, ignore_fields=None, ignore_keys=None, **options):
+    """djangorestframework_camel_case.util.camelize() with cached key conversion."""
+    if isinstance(data, dict):
+        new_dict = {}
+        for key, value in data.items():
+            if isinstance(key, Promise):
+                key = force_str(key)
+            if isinstance(key, str) and "_" in key:
+                new_key = camelize_key(key)
+            else:
+                new_key = key
+            if ignore_fields and (key in ignore_fields or new_key in ignore_fields):
+                result = value
+            else:
+                result = fast_camelize(value, ignore_fields, ignore_keys)
+            if ignore_keys and (key in ignore_keys or new_key in ignore_keys):
+                new_dict[key] = result
+            else:
+                new_dict[new_key] = result
+        return new_dict
+    if isinstance(data, SCALAR_TYPES):
+        if needs_exponent(data):
+            return ExponentFloat(data)
+        return data
+    if isinstance(data, (list, tuple)):
+        return [fast_camelize(item, ignore_fields, ignore_keys) for item in data]
+    if isinstance(data, Promise):
+        return force_str(data)
+    if is_iterable(data):
+        return [fast_camelize(item, ignore_fields, ignore_keys) for item in data]
+    return data
+
+
+def get_dictionary_columns(model):
+    """camelCase names of the choice and FK columns of a model."""
+    if model is None:
+        return set()
+    return {
+        camel_name
+        for field, camel_name, kind, _ in get_field_kinds(model)
+        if kind == "option" or (kind == "related" and not field.many_to_many)
+    }
+
+
+def delta_encode(values):
+    if not values or not all(type(v) is int for v in values):
+        return None
+    encoded = [values[0]]
+    encoded.extend(b - a for a, b in zip(values, values[1:]))
+    return encoded
+
+
+def dictionary_encode(values):
+    """(indexes, dictionary), or None when a value cannot be used as a key."""
+    positions = {}
+    dictionary = []
+    indexes = []
+    for value in values:
+        if value is None:
+            indexes.append(None)
+            continue
+        if isinstance(value, (list, dict)):
+            return None
+        if value not in positions:
+            positions[value] = len(dictionary)
+            dictionary.append(value)
+        indexes.append(positions[value])
+    return indexes, dictionary
+
+
+def to_columnar(data, model=None, layout="columns"):
+    """The camelCased page `data` with its results turned into columns."""
+    results = data["results"]
+    columns = []
+    for row in results:
+        for key in row:
+            if key not in columns:
+                columns.append(key)
+
+    dictionary_columns = get_dictionary_columns(model)
+    encodings = {}
+    dictionaries = {}
+    values = {}
+    for column in columns:
+        col = [row.get(column) for row in results]
+        if column == "id":
+            encoded = delta_encode(col)
+            if encoded is not None:
+                col = encoded
+                encodings[column] = "delta"
+        elif column in dictionary_columns:
+            encoded = dictionary_encode(col)
+            if encoded is not None:
+                col, dictionaries[column] = encoded
+                encodings[column] = "dict"
+        values[column] = col
+
+    payload = {k: v for k, v in data.items() if k not in ("results", "ids")}
+    payload["columns"] = columns
+    payload["encodings"] = encodings
+    payload["dictionaries"] = dictionaries
+    if layout == "rows":
+        payload["rows"] = [list(row) for row in zip(*(values[c] for c in columns))]
+    else:
+        payload["data"] = values
+    return payload
+
+
+class FastCamelCaseJSONRenderer(JSONRenderer):
+    json_underscoreize = camel_case_settings.JSON_UNDERSCOREIZE
+    json_default = JSONEncoder().default
+
+    def prepare(self, data, renderer_context):
+        return fast_camelize(data, **self.json_underscoreize)
+
+    def default(self, obj):
+        """
+        DRF's encoder default for orjson. Results orjson would write other
+        than json does (an exponent float from a Decimal, containers it
+        would not check) send the whole body through the json encoder.
+        """
+        value = self.json_default(obj)
+        if needs_exponent(value) or isinstance(value, (list, tuple, dict)):
+            raise TypeError
+        return value
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        data = self.prepare(data, renderer_context)
+
+        if (
+            orjson is not None
+            and self.compact
+            and not self.ensure_ascii
+            and self.get_indent(accepted_media_type, renderer_context) is None
+        ):
+            try:
+                ret = orjson.dumps(
+                    data,
+                    default=self.default,
+                    option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+                )
+            except (orjson.JSONEncodeError, TypeError):
+                pass  # e.g. ints over 64 bits, an ExponentFloat or default()
+            else:
+                # Same escaping as JSONRenderer
+                return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                    b"\xe2\x80\xa9", b"\\u2029"
+                )
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class ColumnarRenderer(FastCamelCaseJSONRenderer):
+    media_type = "application/vnd.columnar+json"
+    format = "columnar"
+
+    def prepare(self, data, renderer_context):
+        data = super().prepare(data, renderer_context)
+        if isinstance(data, dict) and isinstance(data.get("results"), list):
+            view = renderer_context.get("view")
+            request = renderer_context.get("request")
+            queryset = getattr(view, "queryset", None)
+            layout = request.query_params.get("layout") if request else None
+            data = to_columnar(
+                data, queryset.model if queryset is not None else None, layout
+            )
+        return data
+
+
+def get_renderer_classes():
+    """
+    DEFAULT_RENDERER_CLASSES with CamelCaseJSONRenderer replaced by
+    FastCamelCaseJSONRenderer, followed by ColumnarRenderer.
+    """
+    return [
+        FastCamelCaseJSONRenderer if renderer is CamelCaseJSONRenderer else renderer
+        for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+    ] + [ColumnarRenderer]
@@ -0,0 +1,106 @@
+"""
+Read replicas for the generated viewsets.
+
+CustomModelViewSet runs the querysets of GET/HEAD/OPTIONS requests on a
+replica; related objects follow the instance they were loaded from.
+Writes use the primary. After a successful write a client stays on the
+primary for REPLICA_STICKY_SECONDS, tracked with a cookie and, for
+clients that do not keep cookies, with its knox token in the cache.
+
+    DATABASES = {"default": {...}}
+    DATABASES.update(GET_REPLICA_DATABASES(DATABASES["default"]))
+    DATABASE_ROUTERS = ["my_django_app.routers.ReplicaRouter"]
+
+Settings:
+    DATABASE_REPLICAS = ["replica_1"]   # default: aliases with "REPLICA": True
+    REPLICA_STICKY_SECONDS = 10
+"""
+
+import random
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+STICKY_COOKIE = "db_primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def get_replica_aliases():
+    replicas = getattr(settings, "DATABASE_REPLICAS", None)
+    if replicas is None:
+        replicas = [
+            alias for alias, conf in settings.DATABASES.items() if conf.get("REPLICA")
+        ]
+    return replicas
+
+
+def get_sticky_seconds():
+    return getattr(settings, "REPLICA_STICKY_SECONDS", 10)
+
+
+def sticky_key(request):
+    token_key = getattr(getattr(request, "auth", None), "token_key", None)
+    return f"my_django_app:primary:{token_key}" if token_key else None
+
+
+def is_sticky(request):
+    """Whether the client wrote recently and should read from the primary."""
+    try:
+        if float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    key = sticky_key(request)
+    return bool(key and cache.get(key))
+
+
+def mark_sticky(request, response):
+    seconds = get_sticky_seconds()
+    if not seconds or not get_replica_aliases():
+        return
+    response.set_cookie(
+        STICKY_COOKIE,
+        str(time.time() + seconds),
+        max_age=seconds,
+        httponly=True,
+        samesite="Lax",
+    )
+    key = sticky_key(request)
+    if key:
+        cache.set(key, True, seconds)
+
+
+def get_read_alias(request):
+    """The replica for this request's reads, or None for the primary."""
+    if request.method not in SAFE_METHODS:
+        return None
+    replicas = get_replica_aliases()
+    if not replicas or is_sticky(request):
+        return None
+    return random.choice(replicas)
+
+
+class ReplicaRouter:
+    """
+    Lets objects from the primary and the replicas relate to each other
+    and keeps migrations off the replicas. Reads only go to a replica
+    when a queryset asks for one, see get_read_alias().
+    """
+
+    def db_for_read(self, model, **hints):
+        return None
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *get_replica_aliases()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replica_aliases():
+            return False
+        return None
@@ -3,10 +3,11 @@ from django.contrib.auth import authenticate, hashers, password_validation
 from django.contrib.auth.models import User
 from django.apps import apps
 import sys
-import inspect
 from . import fields
+from .utils import get_app_model, get_caller_module
 from django.db import models
 import typing
+from functools import lru_cache
 from django.core.exceptions import ValidationError as DjangoValidationError
 
 
@@ -93,10 +94,77 @@ class UserSerializer(serializers.ModelSerializer):
         return instance
 
 
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves pks from context["related_cache"] ({model: {pk: obj}}) when
+    present, so a batch of rows validates without one query per reference.
+    """
+
+    def to_internal_value(self, data):
+        model = self.queryset.model if self.queryset is not None else None
+        cache = self.context.get("related_cache", {}).get(model)
+        if cache is None:
+            return super().to_internal_value(data)
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            pk = model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if pk not in cache:
+            self.fail("does_not_exist", pk_value=data)
+        return cache[pk]
+
+
+@lru_cache(maxsize=None)
+def get_model_attributes(model):
+    """dir() of a model and the names of its properties, computed once per model."""
+    attrs = tuple(dir(model))
+    properties = frozenset(
+        attr
+        for attr in attrs
+        if attr != "pk" and isinstance(getattr(model, attr, None), property)
+    )
+    return attrs, properties
+
+
+@lru_cache(maxsize=None)
+def get_relations(model):
+    """
+    {name: relation} of the relations ?expand= can follow: forward foreign
+    keys, one-to-ones and many-to-manys by field name, reverse relations
+    by accessor name.
+    """
+    relations = {}
+    for field in model._meta.get_fields():
+        if not field.is_relation or field.related_model is None:
+            continue
+        if isinstance(field, models.ForeignObjectRel):
+            relations[field.get_accessor_name()] = field
+        else:
+            relations[field.name] = field
+    return relations
+
+
+@lru_cache(maxsize=None)
+def get_expanded_serializer_class(model, expand):
+    """The model's serializer, embedding the relations of the frozen expand tree."""
+    base = get_serializer_class(model)
+    return type(base.__name__, (base,), {"__module__": base.__module__, "expand": expand})
+
+
 class CustomSerializer(serializers.ModelSerializer):
+    serializer_related_field = CachedPrimaryKeyRelatedField
     display_name = serializers.SerializerMethodField()
+    # Frozen ?expand= tree of the serializers nested by get_expanded_serializer_class
+    expand = None
 
     def get_display_name(self, obj):
+        if self.expand is not None and hasattr(obj, "display_name"):
+            # Annotated on the related rows by expand_queryset()
+            return obj.display_name
         return str(obj)
 
     def get_fields(self):
@@ -141,14 +209,9 @@ class CustomSerializer(serializers.ModelSerializer):
         rejected_attrs = []
 
         if model:
-            model_instance = model()
-            for attr in dir(model_instance):
-                class_attr = getattr(model, attr, None)
-                if (
-                    isinstance(class_attr, property)
-                    and attr not in fields
-                    and attr != "pk"
-                ):
+            attrs, properties = get_model_attributes(model)
+            for attr in attrs:
+                if attr in properties and attr not in fields:
                     fields[attr] = serializers.ReadOnlyField()
                 # if attr.startswith("get_") and attr.endswith("_display"):
                 #     rejected_attrs.append(attr)
@@ -179,6 +242,26 @@ class CustomSerializer(serializers.ModelSerializer):
                 if not hasattr(self.__class__, method_name):
                     setattr(self.__class__, method_name, make_method(attr))
         # print(rejected_attrs)
+
+        # Related objects embedded with ?expand=, set by CustomModelViewSet
+        expand = self.expand if self.expand is not None else self.context.get("expand")
+        for name, subtree in expand or ():
+            relation = get_relations(model)[name]
+            fields[name] = get_expanded_serializer_class(
+                relation.related_model, subtree
+            )(many=relation.many_to_many or relation.one_to_many, read_only=True)
+        if self.expand is not None:
+            return fields
+
+        # Sparse fieldsets, set by CustomModelViewSet from ?fields= / ?omit=
+        requested = self.context.get("fields")
+        omitted = self.context.get("omit") or ()
+        if requested is not None or omitted:
+            fields = {
+                name: field
+                for name, field in fields.items()
+                if (requested is None or name in requested) and name not in omitted
+            }
         return fields
 
     def validate(self, attrs):
@@ -209,12 +292,10 @@ class CustomSerializer(serializers.ModelSerializer):
             return  # Skip the base
 
         model_name = cls.__name__.replace("Serializer", "")
-        model = None
-        for m in apps.get_models():
+        model = getattr(getattr(cls, "Meta", None), "model", None)
+        if model is None or model.__name__ != model_name:
             serializer_app_label = cls.__module__.split(".")[0]
-            if m.__name__ == model_name and m._meta.app_label == serializer_app_label:
-                model = m
-                break
+            model = get_app_model(serializer_app_label, model_name)
 
         if model:
             # Define Meta dynamically
@@ -229,31 +310,36 @@ class CustomSerializer(serializers.ModelSerializer):
             cls.Meta = meta_class
 
 
-def auto_create_serializers(models, excluded_models=None):
+def get_serializer_class(model):
+    """
+    <app>.serializers.<Model>Serializer, the serializer CustomModelViewSet
+    picks up, or a plain CustomSerializer for the model.
+    """
+    from django.utils.module_loading import import_string
+
+    path = f"{model.__module__.rsplit('.', 1)[0]}.serializers.{model.__name__}Serializer"
+    try:
+        return import_string(path)
+    except ImportError:
+        return type(
+            f"{model.__name__}Serializer",
+            (CustomSerializer,),
+            {"Meta": type("Meta", (), {"model": model, "fields": "__all__"})},
+        )
 
-    frame = inspect.stack()[1]
-    caller_module = inspect.getmodule(frame[0])
-    target_module = caller_module.__name__
 
-    excluded_models = excluded_models or []
+def auto_create_serializers(models, excluded_models=None, target_module=None):
+    target_module = target_module or get_caller_module()
 
-    for name in dir(models):
-        obj = getattr(models, name)
-        if name in excluded_models:
-            continue
-        if (
-            isinstance(obj, type)
-            and issubclass(obj, fields.CustomModel)
-            and obj.__module__ == models.__name__
-        ):
-            model_class = obj
-            model_name = model_class.__name__
-            serializer_name = f"{model_name}Serializer"
-            serializer = type(
-                name + "Serializer",
-                (CustomSerializer,),
-                {
-                    "__module__": target_module,
-                },
-            )
-            setattr(sys.modules[target_module], serializer_name, serializer)
+    for name, model_class in fields.iter_custom_models(models, excluded_models):
+        model_name = model_class.__name__
+        serializer_name = f"{model_name}Serializer"
+        serializer = type(
+            name + "Serializer",
+            (CustomSerializer,),
+            {
+                "__module__": target_module,
+                "Meta": type("Meta", (), {"model": model_class, "fields": "__all__"}),
+            },
+        )
+        setattr(sys.modules[target_module], serializer_name, serializer)
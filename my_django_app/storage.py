@@ -0,0 +1,205 @@
+"""
+Content-addressed file storage.
+
+Uploads are streamed chunk by chunk into a temporary file next to their
+destination while being hashed, then renamed into place as
+`<sha256[:2]>/<sha256><.ext>`. An identical upload resolves to the same
+name, so it is stored once, and a file is never visible half written.
+
+Settings:
+    CONTENT_STORAGE_ROOT = MEDIA_ROOT / "cas"
+    CONTENT_STORAGE_URL = "/files/"     # where file_url_patterns() is mounted
+
+Hashed names never change content, so file_url_patterns() serves them
+with a one year, immutable Cache-Control header.
+
+Rows share files, so delete() keeps them. The collect_content_garbage
+command removes files no FileField on this storage refers to any more.
+Files saved outside a FileField (avatars, see RegistrationAPI.upload) are
+kept by pin(), which leaves a marker under .pins/.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import time
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import SimpleLazyObject
+
+HASHED_NAME_RE = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{64}(\.[\w]{1,16})?$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PINS_DIR = ".pins"
+
+
+def hashed_name(digest, name):
+    extension = os.path.splitext(name or "")[1].lower()
+    if not re.match(r"^\.\w{1,16}$", extension):
+        extension = ""
+    return f"{digest[:2]}/{digest}{extension}"
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def __init__(self, location=None, base_url=None, **kwargs):
+        if location is None:
+            location = getattr(settings, "CONTENT_STORAGE_ROOT", None) or os.path.join(
+                settings.MEDIA_ROOT, "cas"
+            )
+        if base_url is None:
+            base_url = getattr(settings, "CONTENT_STORAGE_URL", "/files/")
+        super().__init__(location=location, base_url=base_url, **kwargs)
+
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content, see _save()
+        return name
+
+    def _save(self, name, content):
+        os.makedirs(self.location, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=self.location, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if hasattr(content, "seek"):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    f.write(chunk)
+
+            name = hashed_name(digest.hexdigest(), name)
+            path = self.path(name)
+            if os.path.exists(path):
+                os.remove(temp_path)
+                # The new row is not committed yet, keep collect_garbage() off it
+                os.utime(path)
+                return name
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, path)
+            return name
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def delete(self, name):
+        # Other rows may point at the same content, see collect_garbage()
+        pass
+
+    def purge(self, name):
+        super().delete(name)
+
+    def pin(self, name):
+        """Keep name through collect_garbage() though no FileField refers to it."""
+        path = self.path(f"{PINS_DIR}/{name}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "a").close()
+
+    def unpin(self, name):
+        super().delete(f"{PINS_DIR}/{name}")
+
+    def get_pinned_names(self):
+        root = self.path(PINS_DIR)
+        return {
+            os.path.relpath(os.path.join(directory, filename), root).replace(os.sep, "/")
+            for directory, _, filenames in os.walk(root)
+            for filename in filenames
+        }
+
+    def iter_files(self):
+        """(name, modification time) of every stored file and leftover upload."""
+        if not os.path.isdir(self.location):
+            return
+        for directory, subdirectories, filenames in os.walk(self.location):
+            if directory == self.location and PINS_DIR in subdirectories:
+                subdirectories.remove(PINS_DIR)
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.location).replace(os.sep, "/")
+                try:
+                    yield name, os.path.getmtime(path)
+                except FileNotFoundError:
+                    pass
+
+
+content_storage = SimpleLazyObject(ContentAddressedStorage)
+
+
+def get_content_storage():
+    """Storage callable for FileField(storage=...), keeps migrations setting-free."""
+    return content_storage
+
+
+def get_content_fields():
+    """Every concrete FileField of the installed models stored on content_storage."""
+    return [
+        field
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField)
+        and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+def get_referenced_names(fields, using=None):
+    names = set()
+    for field in fields:
+        manager = field.model._base_manager
+        if using is not None:
+            manager = manager.using(using)
+        names.update(
+            manager.exclude(**{field.attname: ""})
+            .exclude(**{f"{field.attname}__isnull": True})
+            .values_list(field.attname, flat=True)
+            .distinct()
+            .iterator()
+        )
+    return names
+
+
+def collect_garbage(min_age=86400, dry_run=False, using=None):
+    """
+    Remove content files no row refers to and nothing pinned, and uploads
+    left half written. Files younger than min_age seconds are kept: their row may not be
+    committed yet. Returns the names removed (or that would be).
+    """
+    referenced = get_referenced_names(get_content_fields(), using)
+    referenced |= content_storage.get_pinned_names()
+    cutoff = time.time() - min_age
+    removed = []
+    for name, modified in content_storage.iter_files():
+        if modified > cutoff or name in referenced:
+            continue
+        if not HASHED_NAME_RE.match(name) and not os.path.basename(name).startswith(
+            ".upload-"
+        ):
+            continue
+        if not dry_run:
+            content_storage.purge(name)
+        removed.append(name)
+    return removed
+
+
+def hashed_file(request, name):
+    """Serve a content-addressed file with long-lived cache headers."""
+    if not HASHED_NAME_RE.match(name):
+        raise Http404
+    digest = name.split("/")[1].split(".")[0]
+    etag = f'"{digest}"'
+    if etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponseNotModified()
+    else:
+        try:
+            response = FileResponse(content_storage.open(name, "rb"))
+        except FileNotFoundError:
+            raise Http404
+    response["ETag"] = etag
+    response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
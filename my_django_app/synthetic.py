@@ -0,0 +1,250 @@
+"""
+Synthetic data for CustomModels, generated from the model definition.
+
+Values respect choices, Min/MaxValueValidator bounds (LimitedIntegerField,
+LimitedDecimalField, ...), max_length, array choices and item counts.
+Foreign keys point at existing rows; when the target table is too small
+for the requested fan-out it is filled first. Soft-deletable rows are
+alive unless deleted_ratio says otherwise, and ImmutableModel rows are
+the first, active version of their own lineage.
+
+    DataGenerator(fanout=10, m2m=3).generate(Item, 1_000_000)
+"""
+
+import random
+import uuid
+from datetime import time, timedelta
+from decimal import Decimal
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models, transaction
+from django.utils import timezone
+from .fields import BaseArrayField, ColorField, DeletedAtField, ImmutableModel
+
+WORDS = (
+    "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima "
+    "mike november oscar papa quebec romeo sierra tango uniform victor whiskey "
+    "xray yankee zulu"
+).split()
+
+
+def get_bounds(field, default_min, default_max):
+    low, high = default_min, default_max
+    for validator in field.validators:
+        if isinstance(validator, MinValueValidator):
+            low = validator.limit_value
+        elif isinstance(validator, MaxValueValidator):
+            high = validator.limit_value
+    if high < low:
+        high = low
+    return low, high
+
+
+class DataGenerator:
+    def __init__(
+        self,
+        using="default",
+        seed=None,
+        fanout=10,
+        m2m=3,
+        null_ratio=0.1,
+        deleted_ratio=0.0,
+        batch_size=5000,
+        log=None,
+    ):
+        self.using = using
+        self.rng = random.Random(seed)
+        self.fanout = fanout
+        self.m2m = m2m
+        self.null_ratio = null_ratio
+        self.deleted_ratio = deleted_ratio
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+        self._pks = {}
+
+    def get_pks(self, model):
+        if model not in self._pks:
+            self._pks[model] = list(
+                model._default_manager.using(self.using).values_list("pk", flat=True)
+            )
+        return self._pks[model]
+
+    def ensure_parents(self, model, rows):
+        """Fill FK/M2M targets so every parent gets about `fanout` children."""
+        for field in model._meta.get_fields():
+            if not (field.many_to_one or field.one_to_one or field.many_to_many):
+                continue
+            if not field.concrete or field.related_model is model:
+                continue
+            target = field.related_model
+            if field.one_to_one:
+                wanted = rows
+            else:
+                wanted = max(1, rows // max(self.fanout, 1))
+            missing = wanted - len(self.get_pks(target))
+            if missing > 0:
+                self.generate(target, missing)
+
+    def value_for(self, field, index):
+        rng = self.rng
+        if isinstance(field, DeletedAtField):
+            if rng.random() >= self.deleted_ratio:
+                return None
+            return self.now - timedelta(seconds=rng.randint(0, 90 * 86400))
+        if field.null and rng.random() < self.null_ratio:
+            return None
+
+        if isinstance(field, BaseArrayField):
+            low = field.min_items or 0
+            high = max(field.max_items or 4, low)
+            size = rng.randint(low, high)
+            if field.valid_choices:
+                choices = list(field.valid_choices)
+                return rng.sample(choices, min(size, len(choices)))
+            if field.base_type is int:
+                return [rng.randint(0, 100) for _ in range(size)]
+            if field.base_type is float:
+                return [round(rng.uniform(0, 100), 2) for _ in range(size)]
+            return [rng.choice(WORDS) for _ in range(size)]
+
+        if field.choices:
+            return rng.choice([value for value, _ in field.flatchoices])
+
+        if isinstance(field, models.BooleanField):
+            return rng.random() < 0.5
+        if isinstance(field, (models.IntegerField, models.FloatField)):
+            low, high = get_bounds(field, 0, 1000)
+            if isinstance(field, models.FloatField):
+                return rng.uniform(low, high)
+            return rng.randint(int(low), int(high))
+        if isinstance(field, models.DecimalField):
+            limit = Decimal(10) ** (field.max_digits - field.decimal_places) - 1
+            low, high = get_bounds(field, Decimal(0), min(limit, Decimal(10000)))
+            scale = 10**field.decimal_places
+            return Decimal(
+                rng.randint(int(Decimal(low) * scale), int(Decimal(high) * scale))
+            ) / scale
+        if isinstance(field, models.DateTimeField):
+            return self.now - timedelta(seconds=rng.randint(0, 730 * 86400))
+        if isinstance(field, models.DateField):
+            return self.now.date() - timedelta(days=rng.randint(0, 730))
+        if isinstance(field, models.TimeField):
+            low, high = get_bounds(field, time.min, time(23, 59))
+            start = low.hour * 60 + low.minute
+            end = high.hour * 60 + high.minute
+            minutes = rng.randint(start, end)
+            return time(minutes // 60, minutes % 60)
+        if isinstance(field, models.UUIDField):
+            return uuid.UUID(int=rng.getrandbits(128), version=4)
+        if isinstance(field, models.EmailField):
+            return f"{rng.choice(WORDS)}{index}@example.com"
+        if isinstance(field, models.URLField):
+            return f"https://example.com/{rng.choice(WORDS)}/{index}"
+        if isinstance(field, ColorField):
+            return "#%06X" % rng.getrandbits(24)
+        if isinstance(field, (models.CharField, models.TextField)):
+            words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+            value = f"{words} {index}" if field.unique else words
+            if field.max_length:
+                value = value[-field.max_length :] if field.unique else value
+                value = value[: field.max_length]
+            return value
+        if isinstance(field, models.JSONField):
+            return {}
+        if isinstance(field, models.FileField):
+            return ""
+        if field.has_default():
+            return field.get_default()
+        return None
+
+    def build(self, model, index, fk_fields):
+        obj = model()
+        for field in model._meta.concrete_fields:
+            if field.primary_key or not field.editable:
+                continue
+            if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+                continue
+            if field in fk_fields:
+                pks = fk_fields[field]
+                if field.one_to_one:
+                    value = pks[index] if index < len(pks) else None
+                elif field.null and (not pks or self.rng.random() < self.null_ratio):
+                    value = None
+                else:
+                    value = self.rng.choice(pks) if pks else None
+                setattr(obj, field.attname, value)
+                continue
+            setattr(obj, field.attname, self.value_for(field, index))
+        if isinstance(obj, ImmutableModel):
+            obj.is_active = True
+            obj.lineage_id = uuid.UUID(int=self.rng.getrandbits(128), version=4)
+            obj.version = 1
+            obj.valid_from = self.now
+            obj.valid_to = None
+        return obj
+
+    def generate(self, model, rows):
+        """Insert `rows` generated rows into `model`, in batches. Returns the count."""
+        self.ensure_parents(model, rows)
+        fk_fields = {
+            field: self.get_pks(field.related_model)
+            for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model is not model
+        }
+        self_fks = [
+            field
+            for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model is model
+        ]
+        m2m_fields = [
+            field
+            for field in model._meta.many_to_many
+            if field.remote_field.through._meta.auto_created
+        ]
+        pks = self.get_pks(model)
+        offset = len(pks)
+        created = 0
+
+        while created < rows:
+            size = min(self.batch_size, rows - created)
+            batch = [
+                self.build(model, offset + created + i, fk_fields) for i in range(size)
+            ]
+            # Self-references point at rows from earlier batches, like a tree
+            for field in self_fks:
+                for obj in batch:
+                    if pks and self.rng.random() >= self.null_ratio:
+                        setattr(obj, field.attname, self.rng.choice(pks))
+            with transaction.atomic(using=self.using):
+                batch = model._default_manager.using(self.using).bulk_create(batch)
+                for field in m2m_fields:
+                    self.link(field, batch)
+            if batch and batch[0].pk is None:
+                # Backends that do not return ids from bulk_create (MySQL)
+                self._pks.pop(model)
+                pks = self.get_pks(model)
+            else:
+                pks.extend(obj.pk for obj in batch)
+            created += size
+            self.log(f"{model._meta.label}: {created}/{rows}")
+        return created
+
+    def link(self, field, objs):
+        through = field.remote_field.through
+        source = field.m2m_field_name()
+        target = field.m2m_reverse_field_name()
+        targets = self.get_pks(field.related_model)
+        if field.related_model is field.model:
+            targets = [obj.pk for obj in objs]
+        if not targets:
+            return
+        links = []
+        for obj in objs:
+            count = min(self.rng.randint(0, 2 * self.m2m), len(targets))
+            for pk in self.rng.sample(targets, count):
+                links.append(
+                    through(**{f"{source}_id": obj.pk, f"{target}_id": pk})
+                )
+        through.objects.using(self.using).bulk_create(
+            links, batch_size=self.batch_size, ignore_conflicts=True
+        )
@@ -0,0 +1,9 @@
+"""
+Behaviour tests, run from a project with my_django_app installed:
+
+    python manage.py test my_django_app
+
+The models in tests/models.py are registered under the my_django_app
+label, which has no migrations, so the test database creates their
+tables directly.
+"""
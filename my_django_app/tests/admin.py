@@ -0,0 +1,19 @@
+from django.contrib import admin
+from ..admin import CustomAdmin
+from .models import Category, Item
+
+# Own site, so the test admins do not end up on admin.site
+site = admin.AdminSite(name="admin")
+
+
+class CategoryAdmin(CustomAdmin):
+    model = Category
+    items = [Item]
+
+
+class ItemAdmin(CustomAdmin):
+    model = Item
+
+
+site.register(Category, CategoryAdmin)
+site.register(Item, ItemAdmin)
@@ -0,0 +1,79 @@
+from .. import fields
+from ..fields import CustomModel, ImmutableModel, SoftDeleteModel, make_archive_model
+
+
+class Category(CustomModel):
+    name = fields.ShortCharField(display=True)
+    parent = fields.SetNullOptionalForeignKey("self", display=False)
+
+    class Meta:
+        app_label = "my_django_app"
+
+
+class Tag(CustomModel):
+    label = fields.ShortCharField(display=True)
+
+    class Meta:
+        app_label = "my_django_app"
+
+    @property
+    def slug(self):
+        return self.label.lower().replace(" ", "-")
+
+
+class Item(CustomModel):
+    STATUS = [(0, "Draft"), (1, "Live")]
+
+    name = fields.MediumCharField(display=True)
+    category = fields.CascadeRequiredForeignKey(Category, display=True)
+    status = fields.ChoiceIntegerField(STATUS, indexed=True)
+    price = fields.AmountField()
+    qty = fields.LimitedIntegerField(0, 100, 1)
+    tags = fields.OptionalManyToManyField(Tag)
+    labels = fields.ChoicesStringArrayField(choices=["a", "b", "c"])
+    is_featured = fields.DefaultBooleanField(False)
+
+    class Meta:
+        app_label = "my_django_app"
+
+
+class Note(CustomModel, SoftDeleteModel):
+    text = fields.MediumCharField(display=True)
+
+    class Meta:
+        app_label = "my_django_app"
+
+
+class Price(CustomModel, ImmutableModel):
+    item = fields.CascadeRequiredForeignKey(Item)
+    amount = fields.AmountField()
+
+    class Meta:
+        app_label = "my_django_app"
+
+
+PriceArchive = make_archive_model(Price)
+
+
+class Attachment(CustomModel, SoftDeleteModel):
+    title = fields.ShortCharField(display=True)
+    file = fields.FileField("attachments", content_addressed=True)
+
+    class Meta:
+        app_label = "my_django_app"
+
+
+class Voucher(SoftDeleteModel):
+    code = fields.ShortCharField(primary_key=True)
+
+    class Meta:
+        app_label = "my_django_app"
+
+
+class Listing(CustomModel):
+    title = fields.ShortCharField(display=True)
+    labels = fields.ChoicesStringArrayField(choices=["a", "b", "c"], indexed=True)
+    sizes = fields.NumberArrayField(native=True)
+
+    class Meta:
+        app_label = "my_django_app"
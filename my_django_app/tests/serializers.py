@@ -0,0 +1,4 @@
+from ..serializers import auto_create_serializers
+from . import models
+
+auto_create_serializers(models)
@@ -0,0 +1,118 @@
+from django import forms
+from django.contrib.admin import widgets
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from .. import admin
+from .models import Category, Item, Tag
+from .utils import ApiTestCase, make_items
+
+
+def formset_post_data(formset):
+    """What a browser posts for the bound rows of an unbound formset."""
+    management = formset.management_form
+    data = {
+        management.add_prefix(name): management[name].value()
+        for name in management.fields
+    }
+    data[management.add_prefix("TOTAL_FORMS")] = len(formset.initial_forms)
+    for form in formset.initial_forms:
+        data.update(form_post_data(form))
+    return data
+
+
+def form_post_data(form):
+    data = {}
+    for name in form.fields:
+        value = form[name].value()
+        if value is None or value is False:
+            continue
+        data[form.add_prefix(name)] = value
+    return data
+
+
+@override_settings(ROOT_URLCONF="my_django_app.tests.urls", ADMIN_INLINE_PER_PAGE=2)
+class AdminTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        admin._table_sizes.clear()
+        self.addCleanup(admin._table_sizes.clear)
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/admin/my_django_app/item/")
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        make_items(3)
+        few = self.changelist_queries()
+        make_items(30)
+        self.assertEqual(self.changelist_queries(), few)
+
+    def test_inline_shows_one_page(self):
+        category = Category.objects.create(name="c")
+        items = [
+            Item.objects.create(name=f"Item {i}", category=category, status=0, price=1)
+            for i in range(5)
+        ]
+        url = f"/admin/my_django_app/category/{category.pk}/change/"
+        response = self.client.get(url, {"item_page": 2})
+        formset = response.context["inline_admin_formsets"][0].formset
+        self.assertEqual(
+            [form.instance.pk for form in formset.initial_forms],
+            [items[2].pk, items[3].pk],
+        )
+        self.assertContains(response, "2 / 3 (5)")
+        self.assertContains(response, 'href="?item_page=3"')
+
+    def test_inline_post_saves_only_its_page(self):
+        category = Category.objects.create(name="c")
+        items = [
+            Item.objects.create(name=f"Item {i}", category=category, status=0, price=1)
+            for i in range(5)
+        ]
+        url = f"/admin/my_django_app/category/{category.pk}/change/?item_page=2"
+        response = self.client.get(url)
+        formset = response.context["inline_admin_formsets"][0].formset
+        data = form_post_data(response.context["adminform"].form)
+        data.update(formset_post_data(formset))
+        for form in formset.initial_forms:
+            data[form.add_prefix("name")] = f"renamed {form.instance.pk}"
+
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 302)
+        names = dict(Item.objects.values_list("pk", "name"))
+        self.assertEqual(
+            names,
+            {
+                item.pk: f"renamed {item.pk}" if i in (2, 3) else item.name
+                for i, item in enumerate(items)
+            },
+        )
+
+    def form_widgets(self):
+        category = Category.objects.first()
+        item = Item.objects.filter(category=category).first()
+        response = self.client.get(f"/admin/my_django_app/item/{item.pk}/change/")
+        fields = response.context["adminform"].form.fields
+        return {name: fields[name].widget.widget for name in ("category", "tags")}
+
+    def test_small_related_tables_keep_selects(self):
+        make_items(3)
+        found = self.form_widgets()
+        self.assertIs(type(found["category"]), forms.Select)
+        self.assertIs(type(found["tags"]), forms.SelectMultiple)
+
+    @override_settings(ADMIN_LARGE_TABLE_THRESHOLD=2)
+    def test_large_related_tables(self):
+        make_items(3, categories=3)
+        Tag.objects.create(label="extra")
+        found = self.form_widgets()
+        # Category has an admin with search fields, Tag has no admin
+        self.assertIsInstance(found["category"], widgets.AutocompleteSelect)
+        self.assertIsInstance(found["tags"], widgets.ManyToManyRawIdWidget)
+        self.assertEqual(
+            admin.CustomAdmin(Category, None).get_search_fields(None), ["name"]
+        )
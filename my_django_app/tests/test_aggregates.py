@@ -0,0 +1,75 @@
+from decimal import Decimal
+from django.test import TestCase
+from ..aggregates import SampledTable
+from .models import Item
+from .utils import ApiTestCase, make_items
+
+
+class AggregateTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        make_items(10)
+
+    def aggregate(self, **params):
+        return self.client.get("/api/items/aggregate/", params)
+
+    def test_group_by_with_measures(self):
+        response = self.aggregate(
+            group_by="category", measures="count,sum:price,max:name"
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.data
+        self.assertEqual(list(data["group_by"]), ["category"])
+        self.assertEqual(list(data["measures"]), ["count", "sum_price", "max_name"])
+        totals = {row["category"]: row for row in data["results"]}
+        for category, row in totals.items():
+            items = Item.objects.filter(category=category)
+            self.assertEqual(row["count"], items.count())
+            self.assertEqual(
+                Decimal(str(row["sum_price"])), sum(i.price for i in items)
+            )
+        labels = {r["id"]: r["name"] for r in data["related"]["category"]}
+        self.assertEqual(set(labels), set(totals))
+
+    def test_rendered_names_match_result_keys(self):
+        data = self.aggregate(
+            group_by="category__parent,created_at__month", measures="avg:price"
+        ).json()
+        names = set(data.get("group_by", data.get("groupBy"))) | set(data["measures"])
+        self.assertEqual(set(data["results"][0]), names)
+
+    def test_filters_apply(self):
+        data = self.aggregate(status=1, measures="count").data
+        self.assertEqual(data["results"], [{"count": 5}])
+
+    def test_sum_and_avg_need_numbers(self):
+        for measures in ("sum:name", "avg:created_at", "sum:category", "sum_product:price*name"):
+            response = self.aggregate(measures=measures)
+            self.assertEqual(response.status_code, 400, measures)
+
+    def test_min_and_max_need_ordered_fields(self):
+        self.assertEqual(self.aggregate(measures="min:created_at").status_code, 200)
+        self.assertEqual(self.aggregate(measures="max:is_featured").status_code, 400)
+        self.assertEqual(self.aggregate(measures="max:labels").status_code, 400)
+
+    def test_unknown_names(self):
+        self.assertEqual(self.aggregate(group_by="nope").status_code, 400)
+        self.assertEqual(self.aggregate(measures="median:price").status_code, 400)
+
+
+class SampledTableTests(TestCase):
+    def test_sampled_query_as_subquery(self):
+        sampled = Item.objects.order_by()
+        query = sampled.query
+        alias = query.get_initial_alias()
+        query.alias_map[alias] = SampledTable(Item._meta.db_table, alias, 5.0)
+
+        outer = Item.objects.filter(pk__in=sampled.values("pk"))
+        sql, params = outer.query.get_compiler(using="default").as_sql()
+        self.assertEqual(sql.count("TABLESAMPLE SYSTEM (%s)"), 1)
+        self.assertIn(5.0, params)
+
+        table = query.alias_map[alias]
+        clone = table.relabeled_clone({alias: "U0"})
+        self.assertEqual((clone.table_alias, clone.percent), ("U0", 5.0))
+        self.assertNotEqual(table, SampledTable(Item._meta.db_table, alias, 10.0))
@@ -0,0 +1,36 @@
+from .utils import ApiTestCase, make_items
+
+
+class AsyncListTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.items = make_items(10)
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row["id"] for row in response.json()["results"]]
+
+    def test_pages_match_the_sync_viewset(self):
+        for page in ("1", "2", "3", "last"):
+            sync = self.client.get("/api/items/", {"page": page, "page_size": 4})
+            asynchronous = self.client.get("/aapi/items/", {"page": page, "page_size": 4})
+            self.assertEqual(self.ids(asynchronous), self.ids(sync))
+            self.assertEqual(asynchronous.json()["count"], 10)
+
+    def test_last_page(self):
+        response = self.client.get("/aapi/items/", {"page": "last", "page_size": 4})
+        self.assertEqual(len(self.ids(response)), 2)
+
+    def test_all(self):
+        response = self.client.get("/aapi/items/", {"page": "all"})
+        self.assertEqual(len(self.ids(response)), 10)
+
+    def test_invalid_page(self):
+        self.assertEqual(self.client.get("/aapi/items/", {"page": "9", "page_size": 4}).status_code, 404)
+        self.assertEqual(self.client.get("/aapi/items/", {"page": "x"}).status_code, 404)
+
+    def test_retrieve(self):
+        item = self.items[0]
+        response = self.client.get(f"/aapi/items/{item.pk}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], item.pk)
@@ -0,0 +1,16 @@
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from ..benchmarks import get_models, run_cases
+
+
+class BenchmarkTests(TransactionTestCase):
+    def tearDown(self):
+        with connection.schema_editor() as editor:
+            for model in reversed(get_models()):
+                editor.delete_model(model)
+
+    @override_settings(ALLOWED_HOSTS=["example.com"])
+    def test_smoke(self):
+        results = run_cases(rows=20, repeat=1, only=["list", "model_str"])
+        self.assertEqual(set(results), {"list", "model_str"})
+        self.assertGreater(results["list"]["queries"], 0)
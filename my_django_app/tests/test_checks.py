@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+from django.db import models
+from django.test import SimpleTestCase
+from django.test.utils import isolate_apps
+from .. import fields
+from ..checks import check_filter_indexes
+from ..fields import CustomModel
+from .models import Category
+
+
+@isolate_apps("my_django_app")
+class FilterIndexCheckTests(SimpleTestCase):
+    def check(self, model):
+        return check_filter_indexes([SimpleNamespace(get_models=lambda: [model])])
+
+    def test_unindexed_filters_warn_with_a_hint_that_applies(self):
+        class Ticket(CustomModel):
+            STATUS = [(0, "Open"), (1, "Closed")]
+            status = fields.ChoiceIntegerField(STATUS)
+            category = fields.CascadeRequiredForeignKey(Category, db_index=False)
+
+            class Meta:
+                app_label = "my_django_app"
+
+        warnings = {w.obj.name: w for w in self.check(Ticket)}
+        self.assertEqual(set(warnings), {"status", "category"})
+        self.assertEqual(warnings["status"].id, "my_django_app.W001")
+        self.assertIn("indexed=True", warnings["status"].hint)
+        self.assertIn("db_index=True", warnings["category"].hint)
+
+    def test_indexed_filters_pass(self):
+        class Ticket(CustomModel):
+            STATUS = [(0, "Open"), (1, "Closed")]
+            status = fields.ChoiceIntegerField(STATUS, indexed=True)
+            category = fields.CascadeRequiredForeignKey(Category)
+            kind = fields.ChoiceIntegerField(STATUS)
+
+            class Meta:
+                app_label = "my_django_app"
+                indexes = [models.Index(fields=["kind", "status"])]
+
+        self.assertEqual(self.check(Ticket), [])
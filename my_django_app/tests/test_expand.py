@@ -0,0 +1,68 @@
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from ..viewsets import annotate_display_name
+from .models import Category, Item, Price
+from .utils import ApiTestCase, make_items
+
+
+class ExpandTests(ApiTestCase):
+    def get(self, count, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/items/", {"page": "all", **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response, len(queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        make_items(5)
+        _, few = self.get(5, expand="category,category.parent,tags")
+        make_items(20)
+        _, many = self.get(25, expand="category,category.parent,tags")
+        self.assertEqual(few, many)
+
+    def test_nested_objects(self):
+        parent = Category.objects.create(name="Parent")
+        items = make_items(3)
+        Category.objects.update(parent=parent)
+        response, _ = self.get(3, expand="category.parent,tags")
+        rows = {row["id"]: row for row in response.data["results"]}
+        item = items[2]
+        row = rows[item.pk]
+        self.assertEqual(row["category"]["id"], item.category_id)
+        self.assertEqual(row["category"]["display_name"], item.category.name)
+        self.assertEqual(row["category"]["parent"]["display_name"], "Parent")
+        self.assertEqual(
+            sorted(t["display_name"] for t in row["tags"]),
+            sorted(t.label for t in item.tags.all()),
+        )
+
+    def test_retrieve(self):
+        item = make_items(1)[0]
+        response = self.client.get(f"/api/items/{item.pk}/", {"expand": "category"})
+        self.assertEqual(response.data["category"]["name"], item.category.name)
+
+    def test_depth_and_unknown_relations(self):
+        make_items(1)
+        for expand in ("category.parent.parent", "nope", "name"):
+            response = self.client.get("/api/items/", {"expand": expand})
+            self.assertEqual(response.status_code, 400, expand)
+        self.assertEqual(Item.objects.count(), 1)
+
+    def test_nested_display_names_are_annotated(self):
+        # Item.__str__ reads its category and tags, the annotation does not
+        def prices(count):
+            for item in make_items(count):
+                Price.objects.create(item=item, amount=Decimal("1.00"))
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(
+                    "/api/prices/", {"page": "all", "expand": "item"}
+                )
+            self.assertEqual(response.status_code, 200)
+            return response, len(queries)
+
+        _, few = prices(2)
+        response, many = prices(10)
+        self.assertEqual(few, many)
+        row = response.data["results"][0]
+        item = annotate_display_name(Item.objects.filter(pk=row["item"]["id"])).get()
+        self.assertEqual(row["item"]["display_name"], item.display_name)
@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient
+from knox.models import AuthToken
+from .utils import ApiTestCase, make_items
+
+
+class ExportTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.items = make_items(5)
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv(self):
+        response = self.client.get("/api/items/export/", {"status": 1})
+        self.assertIn("attachment;", response["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(self.read(response))))
+        header, body = rows[0], rows[1:]
+        self.assertEqual(header[:2], ["id", "displayName"])
+        self.assertEqual(len(body), 2)
+        # Choice columns are exported with their labels
+        self.assertEqual({row[header.index("status")] for row in body}, {"Live"})
+
+    def test_ndjson_with_sparse_fields(self):
+        response = self.client.get(
+            "/api/items/export/", {"export_format": "ndjson", "fields": "name"}
+        )
+        records = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(records), 5)
+        self.assertEqual(set(records[0]), {"id", "name"})
+
+    def test_unknown_format(self):
+        response = self.client.get("/api/items/export/", {"export_format": "xls"})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_async_export_streams_an_async_iterator(self):
+        _, token = await sync_to_async(AuthToken.objects.create)(self.user)
+        response = await AsyncClient().get(
+            "/aapi/items/export/",
+            {"export_format": "tsv"},
+            headers={"Authorization": f"Token {token}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        lines = [line async for line in response.streaming_content]
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(lines[0].decode().split("\t")[:2], ["id", "displayName"])
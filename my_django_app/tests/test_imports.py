@@ -0,0 +1,92 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from .models import Category, Item, Price, Tag
+from .utils import ApiTestCase, make_items
+
+
+def upload(text, name="rows.csv"):
+    return SimpleUploadedFile(name, text.encode())
+
+
+class ImportTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name="Tools")
+        self.tags = [Tag.objects.create(label=f"tag {i}") for i in range(3)]
+
+    def post(self, text, name="rows.csv", url="/api/items/import/", **params):
+        query = "&".join(f"{k}={v}" for k, v in params.items())
+        return self.client.post(
+            f"{url}?{query}", {"file": upload(text, name)}, format="multipart"
+        )
+
+    def test_create_with_choice_labels_and_links(self):
+        a, b, c = (tag.pk for tag in self.tags)
+        rows = "".join(
+            f'Item {i},{self.category.pk},Live,1.50,2,"{a},{b}"\n' for i in range(20)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post("name,category,status,price,qty,tags\n" + rows)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["created"], 20)
+        self.assertEqual(Item.objects.filter(status=1).count(), 20)
+        self.assertEqual(Item.tags.through.objects.count(), 40)
+        # Links are written per batch, not per row
+        inserts = [q for q in queries if "INSERT" in q["sql"] and "tags" in q["sql"]]
+        self.assertEqual(len(inserts), 1)
+
+    def test_update_replaces_links(self):
+        item = make_items(1)[0]
+        item.tags.set(self.tags)
+        response = self.post(
+            f'{{"id": {item.pk}, "name": "Renamed", "tags": [{self.tags[0].pk}]}}\n',
+            name="rows.ndjson",
+        )
+        self.assertEqual(response.json()["updated"], 1, response.content)
+        item.refresh_from_db()
+        self.assertEqual(item.name, "Renamed")
+        self.assertEqual(list(item.tags.all()), [self.tags[0]])
+
+    def test_invalid_rows_are_reported(self):
+        response = self.post(
+            "name,category,status,price\nOk,%d,0,1\nBad,999,0,1\n" % self.category.pk
+        )
+        result = response.json()
+        self.assertEqual((result["created"], result["failed"]), (1, 1))
+        self.assertEqual(result["errors"][0]["row"], 3)
+
+    def test_dry_run_writes_nothing(self):
+        response = self.post(
+            "name,category,status,price\nOk,%d,0,1\n" % self.category.pk, dry_run="true"
+        )
+        self.assertEqual(response.json()["created"], 1)
+        self.assertFalse(Item.objects.exists())
+
+    def test_batch_size_is_validated(self):
+        for value in ("abc", "0", "-5"):
+            response = self.post("name\nx\n", batch_size=value)
+            self.assertEqual(response.status_code, 400, value)
+
+    def test_background_needs_a_shared_cache(self):
+        response = self.post("name\nx\n", background="true")
+        self.assertEqual(response.status_code, 400)
+
+    def test_immutable_rows_are_versioned(self):
+        item = make_items(1)[0]
+        response = self.post(
+            f"item,amount\n{item.pk},1.00\n", url="/api/prices/import/"
+        )
+        self.assertEqual(response.json()["created"], 1, response.content)
+        price = Price.objects.get()
+        self.assertIsNotNone(price.lineage_id)
+
+        response = self.post(
+            f"id,amount\n{price.pk},2.00\n", url="/api/prices/import/"
+        )
+        self.assertEqual(response.json()["updated"], 1, response.content)
+        history = Price.objects.history(price.lineage_id)
+        self.assertEqual(
+            [(p.version, p.is_active, str(p.amount)) for p in history],
+            [(1, False, "1.00"), (2, True, "2.00")],
+        )
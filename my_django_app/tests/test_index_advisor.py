@@ -0,0 +1,126 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from ..index_advisor import (
+    Candidate,
+    is_project_app,
+    list_shape,
+    missing_indexes,
+    shape_candidates,
+)
+from ..management.commands.index_advisor import Command
+from .models import Item
+from .utils import ApiTestCase, make_items
+
+
+def fake_connection(vendor, partial):
+    return SimpleNamespace(
+        vendor=vendor,
+        features=SimpleNamespace(supports_partial_indexes=partial),
+        ops=SimpleNamespace(quote_name=lambda name: f"`{name}`"),
+    )
+
+
+class CandidateSqlTests(SimpleTestCase):
+    def candidate(self):
+        return Candidate(
+            Item, "btree", [("status", False), ("id", True)], [("is_featured", "")]
+        )
+
+    def test_sqlite(self):
+        sql = self.candidate().create_sql(fake_connection("sqlite", True))
+        self.assertIn("CREATE INDEX IF NOT EXISTS", sql)
+        self.assertTrue(sql.endswith("(`status`, `id` DESC) WHERE `is_featured`"))
+
+    def test_postgresql_builds_concurrently(self):
+        candidate = self.candidate()
+        connection = fake_connection("postgresql", True)
+        self.assertIn("CREATE INDEX CONCURRENTLY IF NOT EXISTS", candidate.create_sql(connection))
+        self.assertIn("DROP INDEX CONCURRENTLY IF EXISTS", candidate.drop_sql(connection))
+
+    def test_mysql_has_no_if_not_exists_or_partial_indexes(self):
+        connection = fake_connection("mysql", False)
+        with self.assertRaises(ValueError):
+            self.candidate().create_sql(connection)
+        candidate = self.candidate().without_condition()
+        sql = candidate.create_sql(connection)
+        self.assertNotIn("IF NOT EXISTS", sql)
+        self.assertNotIn("WHERE", sql)
+        self.assertIn("(`is_featured`, `status`, `id` DESC)", sql)
+        self.assertEqual(
+            candidate.drop_sql(connection),
+            f"DROP INDEX `{candidate.name}` ON `{Item._meta.db_table}`",
+        )
+
+
+class ShapeTests(SimpleTestCase):
+    def test_equality_filters_then_order(self):
+        shape = list_shape(
+            Item, {"status": "1", "category": "2", "is_featured": "true"}, ["-id"]
+        )
+        self.assertEqual(shape["values"], {"is_featured": "true"})
+        [candidate] = shape_candidates(Item, shape)
+        self.assertEqual(
+            candidate.columns, (("category_id", False), ("status", False), ("id", True))
+        )
+        self.assertEqual(candidate.condition, (("is_featured", ""),))
+
+
+class MissingIndexTests(ApiTestCase):
+    def test_existing_indexes_cover_candidates(self):
+        covered = Candidate(Item, "btree", [("status", False)])
+        missing = Candidate(Item, "btree", [("qty", False), ("price", False)])
+        self.assertEqual(missing_indexes([covered, missing], connection), [missing])
+
+    def test_async_list_records_its_shape(self):
+        make_items(3)
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        with override_settings(LIST_SHAPE_LOG=path, LIST_SHAPE_SAMPLE_RATE=1):
+            self.client.get("/api/items/", {"status": "1"})
+            self.client.get("/aapi/items/", {"status": "1"})
+        with open(path) as f:
+            shapes = [json.loads(line) for line in f]
+        self.assertEqual([s["filter"] for s in shapes], [["status"], ["status"]])
+
+
+class WriteTests(ApiTestCase):
+    def run_advisor(self, *shapes):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, "w") as f:
+            for shape in shapes:
+                f.write(json.dumps(shape) + "\n")
+        self.addCleanup(os.remove, path)
+        stdout, stderr = StringIO(), StringIO()
+        with mock.patch.object(Command, "write_migration") as write_migration:
+            call_command(
+                "index_advisor",
+                log=path,
+                min_count=1,
+                write=True,
+                stdout=stdout,
+                stderr=stderr,
+            )
+        return write_migration, stdout.getvalue(), stderr.getvalue()
+
+    def test_project_apps_only(self):
+        self.assertTrue(is_project_app("my_django_app"))
+        self.assertFalse(is_project_app("auth"))
+
+        user_shape = list_shape(User, {"email": "a@example.com"}, [])
+        item_shape = list_shape(Item, {"qty": "1"}, [])
+        write_migration, stdout, stderr = self.run_advisor(user_shape, item_shape)
+        [call] = write_migration.call_args_list
+        self.assertEqual(call.args[2], "my_django_app")
+        self.assertEqual({c.model for c in call.args[3]}, {Item})
+        self.assertIn(User._meta.db_table, stdout)
+        self.assertNotIn(f"ON {connection.ops.quote_name(Item._meta.db_table)}", stdout)
+        self.assertIn("auth is an installed package", stderr)
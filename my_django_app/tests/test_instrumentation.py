@@ -0,0 +1,139 @@
+import json
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from ..instrumentation import (
+    QueryBudgetExceeded,
+    QueryInstrumentationMiddleware,
+    record_queries,
+    sql_shape,
+)
+from .models import Item
+from .utils import make_items
+
+
+def n_plus_one(request):
+    names = [item.category.name for item in Item.objects.order_by("id")]
+    return HttpResponse(", ".join(names))
+
+
+class SqlShapeTests(TestCase):
+    def test_literals_and_in_lists_collapse(self):
+        self.assertEqual(
+            sql_shape(
+                "SELECT * FROM t WHERE id = 12 AND name = 'it''s' AND x IN (%s, %s)"
+            ),
+            "SELECT * FROM t WHERE id = ? AND name = ? AND x IN (...)",
+        )
+        self.assertEqual(
+            sql_shape("SELECT * FROM t WHERE x IN (%s)"),
+            sql_shape("SELECT * FROM t WHERE x IN (%s, %s, %s)"),
+        )
+        # Digits inside identifiers are kept
+        self.assertEqual(
+            sql_shape('SELECT "t2"."a1" FROM t2'), 'SELECT "t2"."a1" FROM t2'
+        )
+
+
+@override_settings(QUERY_BUDGET=None, QUERY_REPEAT_THRESHOLD=3, QUERY_SLOWEST_COUNT=2)
+class QueryInstrumentationMiddlewareTests(TestCase):
+    def setUp(self):
+        make_items(4, categories=4)
+
+    def call(self, view=n_plus_one):
+        request = RequestFactory().get("/items/", {"q": "1"})
+        return QueryInstrumentationMiddleware(view)(request)
+
+    def logged(self, view=n_plus_one):
+        with self.assertLogs("my_django_app.queries", "INFO") as logs:
+            response = self.call(view)
+        return response, logs.records
+
+    def test_server_timing(self):
+        def view(request):
+            response = n_plus_one(request)
+            response["Server-Timing"] = 'cache;desc="hit"'
+            return response
+
+        timing = self.logged(view)[0]["Server-Timing"]
+        self.assertRegex(
+            timing,
+            r'^cache;desc="hit", db;dur=\d+\.\d;desc="5 queries, 0 connects", '
+            r"app;dur=\d+\.\d$",
+        )
+
+    def test_log_record(self):
+        _, records = self.logged()
+        record = records[0].queries
+        self.assertEqual(json.loads(records[0].getMessage()), record)
+        self.assertEqual(
+            set(record),
+            {
+                "method",
+                "path",
+                "status",
+                "queries",
+                "connections",
+                "db_ms",
+                "total_ms",
+                "slowest",
+                "repeated",
+            },
+        )
+        self.assertEqual((record["method"], record["path"]), ("GET", "/items/"))
+        self.assertEqual((record["status"], record["queries"]), (200, 5))
+        self.assertEqual(len(record["slowest"]), 2)
+        self.assertEqual(record["slowest"][0]["database"], "default")
+
+    def test_repeated_shapes(self):
+        _, records = self.logged()
+        self.assertEqual(records[0].levelname, "WARNING")
+        [repeated] = records[0].queries["repeated"]
+        self.assertEqual(repeated["count"], 4)
+        self.assertIn("WHERE", repeated["sql"])
+        self.assertNotRegex(repeated["sql"], r"= \d")
+        # Comprehensions are inlined into their function from Python 3.12
+        self.assertRegex(
+            repeated["origin"], r"test_instrumentation\.py:\d+ \((<listcomp>|n_plus_one)\)$"
+        )
+
+    @override_settings(QUERY_REPEAT_THRESHOLD=10)
+    def test_under_threshold_logs_info(self):
+        _, records = self.logged()
+        self.assertEqual(records[0].levelname, "INFO")
+        self.assertEqual(records[0].queries["repeated"], [])
+
+    @override_settings(QUERY_BUDGET=3)
+    def test_budget_warns(self):
+        response, records = self.logged()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            records[-1].getMessage(), "GET /items/ ran 5 queries (budget 3)"
+        )
+
+    @override_settings(QUERY_BUDGET=3, QUERY_BUDGET_ACTION="raise")
+    def test_budget_raises(self):
+        with self.assertLogs("my_django_app.queries"):
+            with self.assertRaisesMessage(QueryBudgetExceeded, "(budget 3)"):
+                self.call()
+
+    @override_settings(QUERY_BUDGET=5, QUERY_BUDGET_ACTION="raise")
+    def test_within_budget(self):
+        self.assertEqual(self.logged()[0].status_code, 200)
+
+    def test_connections_opened_are_counted(self):
+        def view(request):
+            connection_created.send(sender=type(connection), connection=connection)
+            return HttpResponse()
+
+        response, records = self.logged(view)
+        self.assertIn("0 queries, 1 connects", response["Server-Timing"])
+        self.assertEqual(records[0].queries["connections"], 1)
+
+    def test_nested_recorders_each_count(self):
+        with record_queries() as outer:
+            Item.objects.count()
+            with record_queries(using="default") as inner:
+                Item.objects.count()
+        self.assertEqual((outer.count, inner.count), (2, 1))
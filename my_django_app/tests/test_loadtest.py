@@ -0,0 +1,61 @@
+from unittest import mock
+from .. import loadtest
+from ..loadtest import run_load
+from .utils import ApiTestCase, make_items
+
+
+class FakeResponse:
+    status = 200
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def read(self):
+        return b"{}"
+
+
+class RunLoadTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        make_items(5)
+
+    def run_load(self, urlopen):
+        with mock.patch.object(loadtest, "urlopen", urlopen):
+            return run_load(
+                "http://testserver",
+                mix={"list": 1},
+                concurrency=2,
+                requests=6,
+                models=["my_django_app.Item"],
+                seed=1,
+            )
+
+    def test_statuses(self):
+        report = self.run_load(lambda request, timeout: FakeResponse())
+        self.assertEqual(report["kinds"]["list"]["statuses"], {"200": 6})
+        self.assertEqual(report["total"]["requests"], 6)
+
+    def test_exceptions_are_counted_as_errors(self):
+        urlopen = mock.Mock(side_effect=RuntimeError("boom"))
+        with self.assertLogs(loadtest.logger, "ERROR") as logs:
+            report = self.run_load(urlopen)
+        self.assertEqual(report["kinds"]["list"]["statuses"], {"RuntimeError": 6})
+        self.assertEqual(urlopen.call_count, 6)
+        self.assertEqual(len(logs.records), 1)
+
+    def test_worker_failures_are_raised(self):
+        calls = []
+
+        def clock():
+            # The deadline and the start of the run are read before any worker
+            calls.append(None)
+            if len(calls) > 2:
+                raise KeyError("clock")
+            return 0.0
+
+        with mock.patch.object(loadtest, "perf_counter", clock):
+            with self.assertRaises(KeyError):
+                self.run_load(lambda request, timeout: FakeResponse())
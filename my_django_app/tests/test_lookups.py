@@ -0,0 +1,96 @@
+from django.core.exceptions import ValidationError
+from django.db import connection
+from .models import Listing
+from .utils import ApiTestCase
+
+
+class VendorConnection:
+    """The test connection, reporting another vendor to the lookups."""
+
+    def __init__(self, vendor):
+        self.vendor = vendor
+
+    def __getattr__(self, name):
+        return getattr(connection, name)
+
+
+class ArrayLookupTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        rows = [
+            ("ab", ["a", "b"], [1, 2]),
+            ("b", ["b"], [2]),
+            ("c", ["c"], []),
+            ("none", [], [3]),
+        ]
+        for title, labels, sizes in rows:
+            Listing.objects.create(title=title, labels=labels, sizes=sizes)
+
+    def titles(self, **lookups):
+        return sorted(Listing.objects.filter(**lookups).values_list("title", flat=True))
+
+    def test_orm_lookups(self):
+        self.assertEqual(self.titles(labels__has=["a", "b"]), ["ab"])
+        self.assertEqual(self.titles(labels__contains="b"), ["ab", "b"])
+        self.assertEqual(self.titles(labels__overlaps="a,c"), ["ab", "c"])
+        self.assertEqual(
+            self.titles(labels__contained_by=["b", "c"]), ["b", "c", "none"]
+        )
+        self.assertEqual(self.titles(sizes__has=["2"]), ["ab", "b"])
+        self.assertEqual(self.titles(sizes__overlaps=[3, 1]), ["ab", "none"])
+
+    def test_list_endpoint(self):
+        def titles(**params):
+            response = self.client.get("/api/listings/", {"page": "all", **params})
+            self.assertEqual(response.status_code, 200)
+            return sorted(row["title"] for row in response.data["results"])
+
+        self.assertEqual(titles(labels__has="a,b"), ["ab"])
+        self.assertEqual(titles(labels__overlaps="a,c"), ["ab", "c"])
+        self.assertEqual(titles(labels__contained_by="b,c"), ["b", "c", "none"])
+        self.assertEqual(titles(labels__not_overlaps="a,c"), ["b", "none"])
+
+    def test_valid_choices(self):
+        field = Listing._meta.get_field("labels")
+        self.assertEqual(field.valid_choice_set, frozenset({"a", "b", "c"}))
+        field.clean(["a", "c"], None)
+        with self.assertRaises(ValidationError):
+            field.clean(["a", "d"], None)
+
+    def test_indexes(self):
+        self.assertEqual(
+            [index.fields for index in Listing._meta.indexes if index.suffix == "gin"],
+            [["labels"]],
+        )
+        self.assertEqual(Listing._meta.get_field("sizes").db_type(connection), "text")
+        self.assertEqual(
+            Listing._meta.get_field("sizes").db_type(VendorConnection("postgresql")),
+            "integer[]",
+        )
+
+    def compile(self, vendor, **lookups):
+        query = Listing.objects.filter(**lookups).query
+        compiler = query.get_compiler(connection=connection)
+        lookup = query.where.children[0]
+        return getattr(lookup, f"as_{vendor}")(compiler, VendorConnection(vendor))
+
+    def test_postgresql_sql(self):
+        sql, params = self.compile("postgresql", labels__has=["a"])
+        self.assertRegex(sql, r'"labels" @> %s::jsonb$')
+        sql, params = self.compile("postgresql", labels__overlaps=["a", "b"])
+        self.assertRegex(sql, r'"labels" \?\| %s$')
+        self.assertEqual(params, (["a", "b"],))
+        sql, params = self.compile("postgresql", sizes__overlaps=[1])
+        self.assertRegex(sql, r'"sizes" && %s::integer\[\]$')
+        self.assertEqual(params, ([1],))
+        sql, _ = self.compile("postgresql", sizes__contained_by=[1])
+        self.assertRegex(sql, r'"sizes" <@ %s::integer\[\]$')
+
+    def test_mysql_sql(self):
+        sql, params = self.compile("mysql", labels__has=["a"])
+        self.assertRegex(sql, r'^JSON_CONTAINS\(.*"labels", %s\)$')
+        sql, _ = self.compile("mysql", labels__overlaps=["a"])
+        self.assertRegex(sql, r'^JSON_OVERLAPS\(.*"labels", %s\)$')
+        sql, params = self.compile("mysql", labels__contained_by=["a"])
+        self.assertRegex(sql, r'^JSON_CONTAINS\(%s, .*"labels"\)$')
+        self.assertEqual(params, ('["a"]',))
@@ -0,0 +1,118 @@
+import asyncio
+import gzip
+from unittest import mock
+from django.http import HttpResponse, StreamingHttpResponse
+from django.middleware.cache import FetchFromCacheMiddleware, UpdateCacheMiddleware
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from lzstring import LZString
+from .. import middleware
+from ..middleware import CompressionMiddleware
+
+BODY = b'{"results": [' + b", ".join([b'{"name": "Item"}'] * 200) + b"]}"
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1024)
+@mock.patch.object(middleware, "brotli", None)
+class CompressionMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def get(self, response, **headers):
+        request = self.factory.get("/", headers=headers)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def json(self, body=BODY):
+        return HttpResponse(body, content_type="application/json")
+
+    def test_gzip_round_trip(self):
+        response = self.get(self.json(), accept_encoding="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertEqual(gzip.decompress(response.content), BODY)
+
+    def test_lzstring_round_trip(self):
+        response = self.get(self.json(), x_compress="lzstring", accept_encoding="gzip")
+        self.assertEqual(response["X-Content-Encoding"], "lzstring")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        text = LZString().decompressFromEncodedURIComponent(response.content.decode())
+        self.assertEqual(text.encode(), BODY)
+
+    def test_lzstring_leaves_binary_bodies_to_accept_encoding(self):
+        body = bytes(range(256)) * 24
+        binary = HttpResponse(body, content_type="application/octet-stream")
+        response = self.get(binary, x_compress="lzstring", accept_encoding="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), body)
+
+        binary = HttpResponse(body, content_type="application/octet-stream")
+        response = self.get(binary, x_compress="lzstring")
+        self.assertEqual(response.content, body)
+
+    def test_lzstring_falls_back_on_undecodable_text(self):
+        body = b"\xff\xfe" * 1024
+        response = self.get(self.json(body), x_compress="lzstring")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, body)
+        self.assertFalse(response.has_header("X-Content-Encoding"))
+
+    def test_streaming_round_trip(self):
+        chunks = [BODY[i : i + 100] for i in range(0, len(BODY), 100)]
+        response = self.get(StreamingHttpResponse(chunks), accept_encoding="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), BODY)
+
+    def test_async_streaming_round_trip(self):
+        async def chunks():
+            for i in range(0, len(BODY), 100):
+                yield BODY[i : i + 100]
+
+        async def read(response):
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        response = self.get(StreamingHttpResponse(chunks()), accept_encoding="gzip")
+        self.assertEqual(gzip.decompress(asyncio.run(read(response))), BODY)
+
+    def test_small_bodies_are_not_compressed(self):
+        response = self.get(self.json(b'{"a": 1}'), accept_encoding="gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, b'{"a": 1}')
+
+    def test_negotiation(self):
+        for accept in ("gzip;q=0", "identity", "", "*;q=0"):
+            with self.subTest(accept=accept):
+                response = self.get(self.json(), accept_encoding=accept)
+                self.assertFalse(response.has_header("Content-Encoding"))
+        response = self.get(self.json(), accept_encoding="identity, *;q=0.5")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_vary(self):
+        for body in (BODY, b"{}"):
+            response = self.get(self.json(body), accept_encoding="gzip")
+            self.assertIn("Accept-Encoding", response["Vary"])
+            self.assertIn("X-Compress", response["Vary"])
+
+    def test_etag_is_weakened(self):
+        response = self.json()
+        response["ETag"] = '"abc"'
+        self.assertEqual(self.get(response, accept_encoding="gzip")["ETag"], 'W/"abc"')
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        CACHE_MIDDLEWARE_SECONDS=60,
+    )
+    def test_cache_hits_are_not_compressed_again(self):
+        calls = []
+
+        def view(request):
+            calls.append(request)
+            return self.json()
+
+        stack = UpdateCacheMiddleware(
+            CompressionMiddleware(FetchFromCacheMiddleware(view))
+        )
+        first = stack(self.factory.get("/cached/", headers={"accept_encoding": "gzip"}))
+        second = stack(self.factory.get("/cached/", headers={"accept_encoding": "gzip"}))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(second["Content-Encoding"], "gzip")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(gzip.decompress(second.content), BODY)
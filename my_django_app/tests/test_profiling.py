@@ -0,0 +1,114 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from knox.models import AuthToken
+from .. import profiling
+
+MIDDLEWARE = [
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "my_django_app.profiling.ProfilingMiddleware",
+]
+
+
+@override_settings(ROOT_URLCONF="my_django_app.tests.urls", MIDDLEWARE=MIDDLEWARE)
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        patcher = override_settings(PROFILE_DIR=self.directory, PROFILE_KEEP=2)
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+        User = get_user_model()
+        self.staff = User.objects.create_user("staff", password=None, is_staff=True)
+        self.user = User.objects.create_user("user", password=None)
+
+    def profiled(self, **headers):
+        return self.client.get("/api/items/", {"_profile": "1"}, headers=headers)
+
+    def test_staff_session_is_profiled(self):
+        self.client.force_login(self.staff)
+        response = self.profiled()
+        profile_id = response["X-Profile-Id"]
+        self.assertTrue(
+            os.path.isfile(os.path.join(self.directory, f"{profile_id}.prof"))
+        )
+        with open(os.path.join(self.directory, f"{profile_id}.json")) as f:
+            meta = json.load(f)
+        self.assertEqual(meta["path"], "/api/items/")
+        self.assertEqual(meta["params"], {"_profile": ["1"]})
+        # The API only takes knox tokens, the middleware also takes sessions
+        self.assertEqual(meta["status"], response.status_code)
+        self.assertEqual(meta["user"], "staff")
+        self.assertTrue(meta["top"])
+
+    def test_staff_knox_token_is_profiled(self):
+        _, token = AuthToken.objects.create(self.staff)
+        response = self.client.get(
+            "/api/items/", headers={"x_profile": "1", "authorization": f"Token {token}"}
+        )
+        self.assertIn("X-Profile-Id", response)
+
+    def test_others_are_not_profiled(self):
+        self.assertNotIn("X-Profile-Id", self.profiled())
+        self.client.force_login(self.user)
+        self.assertNotIn("X-Profile-Id", self.profiled())
+        _, token = AuthToken.objects.create(self.user)
+        self.client.logout()
+        self.assertNotIn("X-Profile-Id", self.profiled(authorization=f"Token {token}"))
+        self.assertNotIn("X-Profile-Id", self.profiled(authorization="Token bad"))
+        self.client.force_login(self.staff)
+        self.assertNotIn("X-Profile-Id", self.client.get("/api/items/"))
+
+    def test_old_profiles_are_pruned(self):
+        self.client.force_login(self.staff)
+        for _ in range(3):
+            self.profiled()
+        names = os.listdir(self.directory)
+        self.assertEqual(len([n for n in names if n.endswith(".prof")]), 2)
+        self.assertEqual(len([n for n in names if n.endswith(".json")]), 2)
+
+    def test_one_profile_at_a_time(self):
+        self.client.force_login(self.staff)
+        with profiling.profile_lock:
+            response = self.profiled()
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertIn("X-Profile-Id", self.profiled())
+
+    def test_another_active_profiler(self):
+        self.client.force_login(self.staff)
+        with mock.patch("cProfile.Profile.enable", side_effect=ValueError):
+            response = self.profiled()
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertFalse(profiling.profile_lock.locked())
+
+    def test_list_and_download(self):
+        self.client.force_login(self.staff)
+        profile_id = self.profiled()["X-Profile-Id"]
+        response = self.client.get("/profiling/profiles/")
+        self.assertContains(response, f"{profile_id}.prof")
+        response = self.client.get(f"/profiling/profiles/{profile_id}.prof")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("attachment", response["Content-Disposition"])
+        response.close()
+
+    def test_views_are_staff_only(self):
+        self.client.force_login(self.user)
+        response = self.client.get("/profiling/profiles/")
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("/admin/login/", response["Location"])
+
+    def test_download_rejects_other_paths(self):
+        outside = os.path.join(os.path.dirname(self.directory), "secret.prof")
+        open(outside, "w").close()
+        self.addCleanup(os.remove, outside)
+        self.client.force_login(self.staff)
+        for name in ("..%2Fsecret.prof", "../secret.prof", "missing.prof", "x.json"):
+            with self.subTest(name=name):
+                response = self.client.get(f"/profiling/profiles/{name}")
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,203 @@
+import json
+import re
+import shutil
+import subprocess
+import textwrap
+import unittest
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from django.test import SimpleTestCase
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+from .. import renderers
+from ..renderers import FastCamelCaseJSONRenderer, to_columnar
+from .models import Item
+from .utils import ApiTestCase, make_items
+
+
+def decode(payload):
+    """Python port of the decoder in the renderers module docstring."""
+    columns = payload["columns"]
+    encodings = payload.get("encodings", {})
+    dictionaries = payload.get("dictionaries", {})
+    if "rows" in payload:
+        n = len(payload["rows"])
+        raw = {c: [row[i] for row in payload["rows"]] for i, c in enumerate(columns)}
+    else:
+        n = len(payload["data"][columns[0]]) if columns else 0
+        raw = payload["data"]
+    values = {}
+    for column in columns:
+        col = raw[column]
+        if encodings.get(column) == "delta":
+            decoded, previous = [], 0
+            for value in col:
+                previous += value
+                decoded.append(previous)
+            col = decoded
+        elif encodings.get(column) == "dict":
+            col = [None if v is None else dictionaries[column][v] for v in col]
+        values[column] = col
+    return [{column: values[column][i] for column in columns} for i in range(n)]
+
+
+def docstring_decoder():
+    """The JavaScript decode() from the renderers module docstring."""
+    source = re.search(
+        r"^    function decode\(payload\) \{$.*?^    \}$",
+        renderers.__doc__,
+        re.M | re.S,
+    ).group(0)
+    return textwrap.dedent(source)
+
+
+class FastCamelCaseJSONRendererTests(SimpleTestCase):
+    def assertSameBytes(self, data):
+        try:
+            expected = CamelCaseJSONRenderer().render(data)
+        except ValueError:
+            with self.assertRaises(ValueError):
+                FastCamelCaseJSONRenderer().render(data)
+        else:
+            self.assertEqual(FastCamelCaseJSONRenderer().render(data), expected)
+
+    def test_same_bytes_as_camel_case_renderer(self):
+        values = [
+            Decimal("0.00001"),
+            Decimal("12.50"),
+            Decimal("1E+20"),
+            datetime(2024, 5, 6, 7, 8, 9, 123456, tzinfo=timezone.utc),
+            datetime(2024, 5, 6, 7, 8, 9, tzinfo=timezone(timedelta(hours=2))),
+            datetime(2024, 5, 6, 7, 8, 9),
+            date(2024, 5, 6),
+            time(7, 8, 9, 500),
+            timedelta(days=1, seconds=5),
+            uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            2**64,
+            -(2**63) - 1,
+            1e16,
+            1e-5,
+            0.1,
+            "line\u2028break\u2029",
+            float("nan"),
+            float("inf"),
+            Decimal("NaN"),
+        ]
+        for value in values:
+            with self.subTest(value=value):
+                self.assertSameBytes({"a_b": value, "nested_list": [{"c_d": value}]})
+
+
+ROWS = [
+    {"id": 12, "name": "a", "status": 1, "category": 7, "tags": [1, 2]},
+    {"id": 11, "name": "b", "status": 0, "category": 7, "tags": []},
+    {"id": 15, "name": None, "status": 1, "category": None, "tags": [2]},
+    {"id": 3, "name": "d", "status": 1, "category": 9, "tags": [1]},
+]
+
+
+class ColumnarTests(SimpleTestCase):
+    def page(self, rows=ROWS):
+        return {"count": len(rows), "ids": [r["id"] for r in rows], "results": rows}
+
+    def test_delta_and_dict_encodings(self):
+        payload = to_columnar(self.page(), Item)
+        self.assertNotIn("results", payload)
+        self.assertNotIn("ids", payload)
+        self.assertEqual(payload["count"], 4)
+        self.assertEqual(
+            payload["columns"], ["id", "name", "status", "category", "tags"]
+        )
+        self.assertEqual(
+            payload["encodings"], {"id": "delta", "status": "dict", "category": "dict"}
+        )
+        self.assertEqual(payload["data"]["id"], [12, -1, 4, -12])
+        self.assertEqual(payload["dictionaries"]["status"], [1, 0])
+        self.assertEqual(payload["data"]["status"], [0, 1, 0, 0])
+        self.assertEqual(payload["dictionaries"]["category"], [7, 9])
+        self.assertEqual(payload["data"]["category"], [0, 0, None, 1])
+        # Many-to-many and text columns are sent as they are
+        self.assertEqual(payload["data"]["tags"], [[1, 2], [], [2], [1]])
+        self.assertEqual(decode(payload), ROWS)
+
+    def test_rows_layout(self):
+        payload = to_columnar(self.page(), Item, layout="rows")
+        self.assertNotIn("data", payload)
+        self.assertEqual(payload["rows"][0], [12, "a", 0, 0, [1, 2]])
+        self.assertEqual(decode(payload), ROWS)
+
+    def test_unencodable_columns_are_sent_as_is(self):
+        rows = [{"id": "a1", "status": [1]}, {"id": "b2", "status": {"x": 1}}]
+        payload = to_columnar(self.page(rows), Item)
+        self.assertEqual(payload["encodings"], {})
+        self.assertEqual(decode(payload), rows)
+
+    def test_missing_keys_decode_as_null(self):
+        rows = [{"id": 1, "name": "a"}, {"id": 2, "status": 1}]
+        payload = to_columnar(self.page(rows), Item)
+        self.assertEqual(
+            decode(payload),
+            [
+                {"id": 1, "name": "a", "status": None},
+                {"id": 2, "name": None, "status": 1},
+            ],
+        )
+
+    def test_empty_page(self):
+        payload = to_columnar(self.page([]), Item)
+        self.assertEqual((payload["columns"], payload["data"]), ([], {}))
+        self.assertEqual(decode(payload), [])
+
+    @unittest.skipUnless(shutil.which("node"), "needs node")
+    def test_docstring_decoder_round_trips(self):
+        script = (
+            docstring_decoder()
+            + "\nconst input = JSON.parse(require('fs').readFileSync(0, 'utf8'));"
+            + "\nprocess.stdout.write(JSON.stringify(input.map(decode)));"
+        )
+        payloads = [
+            to_columnar(self.page(), Item),
+            to_columnar(self.page(), Item, layout="rows"),
+        ]
+        output = subprocess.run(
+            ["node", "-e", script],
+            input=json.dumps(payloads),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        self.assertEqual(json.loads(output), [ROWS, ROWS])
+
+
+class ColumnarRendererTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        make_items(5)
+
+    def get(self, **params):
+        response = self.client.get("/api/items/", params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_round_trip_through_the_api(self):
+        expected = self.get()
+        for layout in ("columns", "rows"):
+            with self.subTest(layout=layout):
+                payload = self.get(format="columnar", layout=layout)
+                self.assertEqual(decode(payload), expected["results"])
+                self.assertEqual(payload["count"], expected["count"])
+                self.assertEqual(payload["related"], expected["related"])
+                self.assertEqual(payload["encodings"]["id"], "delta")
+                self.assertEqual(payload["encodings"]["category"], "dict")
+
+    def test_accept_header(self):
+        response = self.client.get(
+            "/api/items/", headers={"accept": "application/vnd.columnar+json"}
+        )
+        self.assertEqual(response["Content-Type"], "application/vnd.columnar+json")
+        self.assertIn("columns", json.loads(response.content))
+
+    def test_retrieve_is_plain_json(self):
+        item_id = self.get()["results"][0]["id"]
+        response = self.client.get(f"/api/items/{item_id}/", {"format": "columnar"})
+        self.assertEqual(json.loads(response.content)["id"], item_id)
@@ -0,0 +1,46 @@
+import time
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from ..routers import STICKY_COOKIE, ReplicaRouter, get_read_alias, mark_sticky
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"], REPLICA_STICKY_SECONDS=10)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        cache.clear()
+
+    def test_reads_go_to_a_replica(self):
+        self.assertEqual(get_read_alias(self.factory.get("/")), "replica_1")
+        self.assertIsNone(get_read_alias(self.factory.post("/")))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        self.assertIsNone(get_read_alias(self.factory.get("/")))
+
+    def test_cookie_sticks_to_primary_after_a_write(self):
+        response = HttpResponse()
+        mark_sticky(self.factory.post("/"), response)
+        request = self.factory.get("/")
+        request.COOKIES[STICKY_COOKIE] = response.cookies[STICKY_COOKIE].value
+        self.assertIsNone(get_read_alias(request))
+
+        request.COOKIES[STICKY_COOKIE] = str(time.time() - 1)
+        self.assertEqual(get_read_alias(request), "replica_1")
+        request.COOKIES[STICKY_COOKIE] = "garbage"
+        self.assertEqual(get_read_alias(request), "replica_1")
+
+    def test_token_sticks_without_cookies(self):
+        write = self.factory.post("/")
+        write.auth = type("Token", (), {"token_key": "abc"})()
+        mark_sticky(write, HttpResponse())
+        read = self.factory.get("/")
+        read.auth = write.auth
+        self.assertIsNone(get_read_alias(read))
+        self.assertEqual(get_read_alias(self.factory.get("/")), "replica_1")
+
+    def test_migrations_stay_off_replicas(self):
+        router = ReplicaRouter()
+        self.assertFalse(router.allow_migrate("replica_1", "my_django_app"))
+        self.assertIsNone(router.allow_migrate("default", "my_django_app"))
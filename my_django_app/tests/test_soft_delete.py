@@ -0,0 +1,59 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from ..fields import SoftDeleteQuerySet
+from .models import Note, Voucher
+
+
+class SoftDeleteTests(TestCase):
+    def setUp(self):
+        self.notes = [Note.objects.create(text=f"note {i}") for i in range(5)]
+
+    def test_delete_hides_from_default_manager(self):
+        self.notes[0].delete()
+        self.assertEqual(Note.objects.count(), 4)
+        self.assertEqual(Note.all_objects.count(), 5)
+        self.assertIsNotNone(Note.all_objects.get(pk=self.notes[0].pk).deleted_at)
+
+    def test_queryset_delete_is_soft(self):
+        Note.objects.filter(pk__in=[n.pk for n in self.notes[:3]]).delete()
+        self.assertEqual(Note.objects.count(), 2)
+        self.assertEqual(Note.all_objects.count(), 5)
+
+    def test_hard_delete_returns_delete_shape(self):
+        deleted, per_model = Note.objects.filter(pk=self.notes[0].pk).hard_delete()
+        self.assertEqual((deleted, per_model), (1, {Note._meta.label: 1}))
+
+    def test_batched_hard_delete_returns_delete_shape(self):
+        deleted, per_model = Note.objects.all().hard_delete(batch_size=2)
+        self.assertEqual((deleted, per_model), (5, {Note._meta.label: 5}))
+        self.assertEqual(Note.all_objects.count(), 0)
+
+    def test_alive_and_dead(self):
+        self.notes[0].delete()
+        queryset = SoftDeleteQuerySet(Note)
+        self.assertEqual(queryset.alive().count(), 4)
+        self.assertEqual(list(queryset.dead()), [self.notes[0]])
+
+    def test_purge_only_removes_old_deletions(self):
+        old, recent = self.notes[:2]
+        Note.objects.filter(pk__in=[old.pk, recent.pk]).delete()
+        Note.all_objects.filter(pk=old.pk).update(
+            deleted_at=timezone.now() - timedelta(days=60)
+        )
+        deleted, _ = Note.objects.purge(before=timezone.now() - timedelta(days=30))
+        self.assertEqual(deleted, 1)
+        self.assertTrue(Note.all_objects.filter(pk=recent.pk).exists())
+
+
+class AliveIndexTests(TestCase):
+    def alive_indexes(self, model):
+        return [i.fields for i in model._meta.indexes if i.suffix == "alv"]
+
+    def test_alive_indexes_on_pk_and_updated_at(self):
+        self.assertEqual(self.alive_indexes(Note), [["id"], ["updated_at", "id"]])
+
+    def test_custom_primary_key(self):
+        self.assertEqual(self.alive_indexes(Voucher), [["code"]])
+        Voucher.objects.create(code="A")
+        self.assertEqual(Voucher.objects.get().pk, "A")
@@ -0,0 +1,69 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from .utils import ApiTestCase, make_items
+
+
+class SparseFieldsTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.items = make_items(3)
+
+    def get(self, path="/api/items/", **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data, queries
+
+    def item_selects(self, queries):
+        return [
+            q["sql"]
+            for q in queries
+            if q["sql"].startswith("SELECT") and 'FROM "my_django_app_item"' in q["sql"]
+        ]
+
+    def test_fields_trims_payload_and_columns(self):
+        data, queries = self.get(fields="name")
+        self.assertEqual(
+            {tuple(sorted(row)) for row in data["results"]}, {("id", "name")}
+        )
+        selects = [sql for sql in self.item_selects(queries) if "COUNT(" not in sql]
+        self.assertTrue(selects)
+        for sql in selects:
+            self.assertIn('"my_django_app_item"."name"', sql)
+            self.assertNotIn('"my_django_app_item"."price"', sql)
+            self.assertNotIn('"my_django_app_item"."labels"', sql)
+
+    def test_camel_case_fields(self):
+        data, _ = self.get(fields="isFeatured,price")
+        self.assertEqual(set(data["results"][0]), {"id", "is_featured", "price"})
+
+    def test_display_name_needs_the_whole_row(self):
+        data, queries = self.get(fields="display_name")
+        self.assertEqual(set(data["results"][0]), {"id", "display_name"})
+        self.assertIn('"my_django_app_item"."price"', self.item_selects(queries)[-1])
+
+    def test_omit(self):
+        data, _ = self.get(omit="price,tags,id")
+        row = data["results"][0]
+        self.assertNotIn("price", row)
+        self.assertNotIn("tags", row)
+        self.assertIn("id", row)
+        self.assertIn("name", row)
+
+    def test_meta_false_drops_metadata(self):
+        full, _ = self.get()
+        bare, _ = self.get(meta="false")
+        self.assertIn("related", full)
+        self.assertIn("option_fields", full)
+        for key in ("related", "related_fields", "option_fields", "price_fields"):
+            self.assertNotIn(key, bare)
+        self.assertEqual(bare["ids"], full["ids"])
+        self.assertEqual(len(bare["results"]), len(full["results"]))
+
+    def test_retrieve_is_trimmed(self):
+        path = f"/api/items/{self.items[0].pk}/"
+        data, _ = self.get(path, fields="name")
+        self.assertEqual(data, {"id": self.items[0].pk, "name": self.items[0].name})
+        data, _ = self.get(path, omit="price")
+        self.assertNotIn("price", data)
+        self.assertIn("qty", data)
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from ..storage import ContentAddressedStorage, collect_garbage, content_storage
+from ..views import RegistrationAPI
+from .models import Attachment
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        patcher = mock.patch.object(
+            content_storage, "_wrapped", ContentAddressedStorage(location=location)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def attach(self, title, content):
+        attachment = Attachment(title=title)
+        attachment.file.save(f"{title}.txt", ContentFile(content))
+        return attachment
+
+    def test_identical_uploads_share_one_file(self):
+        a = self.attach("a", b"same")
+        b = self.attach("b", b"same")
+        self.assertEqual(a.file.name, b.file.name)
+        self.assertRegex(a.file.name, r"^[0-9a-f]{2}/[0-9a-f]{64}\.txt$")
+
+    def test_deleting_a_row_keeps_the_shared_file(self):
+        a = self.attach("a", b"same")
+        b = self.attach("b", b"same")
+        Attachment.all_objects.filter(pk=a.pk).delete()
+        a.file.delete(save=False)
+        self.assertTrue(content_storage.exists(b.file.name))
+
+    def test_collect_garbage_removes_unreferenced_files(self):
+        kept = self.attach("kept", b"kept")
+        gone = self.attach("gone", b"gone")
+        deleted = self.attach("deleted", b"deleted")
+        deleted.delete()  # soft-deleted rows still refer to their file
+        Attachment.all_objects.filter(pk=gone.pk).delete()
+
+        self.assertEqual(collect_garbage(min_age=3600), [])
+        self.assertEqual(collect_garbage(min_age=0, dry_run=True), [gone.file.name])
+        self.assertTrue(content_storage.exists(gone.file.name))
+
+        call_command("collect_content_garbage", "--min-age", "0", stdout=open(os.devnull, "w"))
+        self.assertFalse(content_storage.exists(gone.file.name))
+        self.assertTrue(content_storage.exists(kept.file.name))
+        self.assertTrue(content_storage.exists(deleted.file.name))
+
+    def test_pinned_uploads_survive_collect_garbage(self):
+        request = RequestFactory().post(
+            "/", {"avatar": SimpleUploadedFile("me.png", b"avatar")}
+        )
+        url = RegistrationAPI().upload(request)
+        name = url.split("/files/", 1)[1]
+        self.assertTrue(content_storage.exists(name))
+        self.assertEqual(collect_garbage(min_age=0), [])
+
+        content_storage.unpin(name)
+        self.assertEqual(collect_garbage(min_age=0), [name])
+
+    def test_reuploading_old_garbage_refreshes_it(self):
+        old = self.attach("old", b"same")
+        Attachment.all_objects.filter(pk=old.pk).delete()
+        path = content_storage.path(old.file.name)
+        os.utime(path, (0, 0))
+
+        # A new row points at the old file but has not been committed yet
+        name = content_storage.save("new.txt", ContentFile(b"same"))
+        self.assertEqual(name, old.file.name)
+        self.assertEqual(collect_garbage(min_age=3600), [])
+        self.assertTrue(content_storage.exists(name))
@@ -0,0 +1,63 @@
+import sys
+import types
+from django.test import SimpleTestCase, override_settings
+from django.urls import include, resolve
+from ..urls import LazyRouterPatterns, auto_create_urlpatterns
+from . import async_viewsets, models, viewsets
+
+
+def make_module(name):
+    module = types.ModuleType(name)
+    sys.modules[name] = module
+    return module
+
+
+class LazyRouterTests(SimpleTestCase):
+    def test_built_on_first_read(self):
+        patterns = auto_create_urlpatterns(viewsets)
+        self.assertIsInstance(patterns, LazyRouterPatterns)
+        include(patterns)
+        self.assertIsNone(patterns._patterns)
+
+        self.assertGreater(len(patterns), 0)
+        built = patterns._patterns
+        self.assertIs(patterns.patterns, built)
+        self.assertEqual(list(patterns), built)
+        self.assertEqual(patterns + [], built)
+        self.assertEqual([] + patterns, built)
+
+    @override_settings(ROOT_URLCONF="my_django_app.tests.urls")
+    def test_routes_resolve(self):
+        match = resolve("/api/items/")
+        self.assertIs(match.func.cls, viewsets.ItemViewSet)
+        match = resolve("/aapi/items/1/")
+        self.assertIs(match.func.cls, async_viewsets.ItemViewSet)
+        self.assertEqual(match.kwargs, {"pk": "1"})
+
+
+class ModuleRegistrationTests(SimpleTestCase):
+    def tearDown(self):
+        sys.modules.pop("generated_viewsets", None)
+
+    def test_target_module(self):
+        from ..viewsets import auto_create_viewsets
+
+        module = make_module("generated_viewsets")
+        auto_create_viewsets(models, target_module="generated_viewsets")
+        self.assertEqual(module.ItemViewSet.__module__, "generated_viewsets")
+        self.assertIs(module.ItemViewSet.queryset.model, models.Item)
+
+    def test_caller_module(self):
+        module = make_module("generated_viewsets")
+        code = (
+            "from my_django_app.serializers import auto_create_serializers\n"
+            "from my_django_app.viewsets import auto_create_viewsets\n"
+            "from my_django_app.tests import models\n"
+            "auto_create_serializers(models)\n"
+            "auto_create_viewsets(models)\n"
+        )
+        exec(code, vars(module))
+        self.assertEqual(module.TagSerializer.__module__, "generated_viewsets")
+        self.assertEqual(module.TagViewSet.__module__, "generated_viewsets")
+        self.assertIs(module.TagViewSet.queryset.model, models.Tag)
+        self.assertIsNot(module.TagViewSet, viewsets.TagViewSet)
@@ -0,0 +1,31 @@
+import os
+from unittest import mock
+from django.test import SimpleTestCase
+from ..utils import GET_DATABASES
+
+
+class GetDatabasesTests(SimpleTestCase):
+    def build(self, **env):
+        with mock.patch.dict(os.environ, env, clear=True):
+            return GET_DATABASES()
+
+    def test_sqlite_keeps_replicas(self):
+        databases = self.build(
+            DB_ENGINE="sqlite3", DB_NAME="primary.db", DB_REPLICA_NAMES="r1.db,r2.db"
+        )
+        self.assertEqual(set(databases), {"default", "replica_1", "replica_2"})
+        self.assertEqual(databases["replica_2"]["NAME"], "r2.db")
+        self.assertTrue(databases["replica_1"]["REPLICA"])
+        self.assertNotIn("HOST", databases["default"])
+
+    def test_postgresql_replica_hosts(self):
+        databases = self.build(
+            DB_NAME="app", DB_HOST="primary", DB_REPLICA_HOSTS="r1:6432", DB_POOL="false"
+        )
+        self.assertEqual(databases["default"]["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual(databases["replica_1"]["HOST"], "r1")
+        self.assertEqual(databases["replica_1"]["PORT"], "6432")
+        self.assertEqual(databases["replica_1"]["NAME"], "app")
+
+    def test_without_replicas(self):
+        self.assertEqual(set(self.build(DB_ENGINE="sqlite3")), {"default"})
@@ -0,0 +1,103 @@
+from decimal import Decimal
+from django.test import TestCase
+from django.utils import timezone
+from .models import Category, Item, Price, PriceArchive
+
+
+class ImmutableModelTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Tools")
+        self.item = Item.objects.create(
+            name="Hammer", category=category, status=1, price=Decimal("9.99")
+        )
+
+    def test_save_inserts_a_new_version(self):
+        price = Price.objects.create(item=self.item, amount=Decimal("1.00"))
+        first_pk, lineage = price.pk, price.lineage_id
+        price.amount = Decimal("2.00")
+        price.save()
+        self.assertNotEqual(price.pk, first_pk)
+        self.assertEqual(price.version, 2)
+        versions = Price.objects.filter(lineage_id=lineage).order_by("version")
+        self.assertEqual([v.is_active for v in versions], [False, True])
+        self.assertIsNotNone(versions[0].valid_to)
+
+    def test_stale_instance_saves_after_latest_version(self):
+        price = Price.objects.create(item=self.item, amount=Decimal("1.00"))
+        stale = Price.objects.get(pk=price.pk)
+        price.amount = Decimal("2.00")
+        price.save()
+        stale.amount = Decimal("3.00")
+        stale.save()
+        self.assertEqual(stale.version, 3)
+        active = Price.objects.filter(lineage_id=price.lineage_id).active()
+        self.assertEqual(list(active), [stale])
+
+    def test_bulk_save_versions_every_object(self):
+        prices = [
+            Price.objects.create(item=self.item, amount=Decimal(i)) for i in range(3)
+        ]
+        stale = Price.objects.get(pk=prices[0].pk)
+        prices[0].save()
+        Price.objects.bulk_save([stale, *prices[1:]])
+        self.assertEqual(Price.objects.active().count(), 3)
+        self.assertEqual(
+            sorted(Price.objects.active().values_list("version", flat=True)), [2, 2, 3]
+        )
+
+    def test_bulk_save_numbers_versions_of_one_lineage(self):
+        price = Price.objects.create(item=self.item, amount=Decimal("1.00"))
+        first = Price.objects.get(pk=price.pk)
+        second = Price.objects.get(pk=price.pk)
+        first.amount, second.amount = Decimal("2.00"), Decimal("3.00")
+        Price.objects.bulk_save([first, second])
+
+        versions = Price.objects.filter(lineage_id=price.lineage_id).order_by("version")
+        self.assertEqual(
+            list(versions.values_list("version", "amount", "is_active")),
+            [
+                (1, Decimal("1.00"), False),
+                (2, Decimal("2.00"), False),
+                (3, Decimal("3.00"), True),
+            ],
+        )
+
+    def test_as_of(self):
+        price = Price.objects.create(item=self.item, amount=Decimal("1.00"))
+        before = timezone.now()
+        price.amount = Decimal("2.00")
+        price.save()
+        self.assertEqual(Price.objects.as_of(before).get().amount, Decimal("1.00"))
+        self.assertEqual(Price.objects.as_of(timezone.now()).get().amount, Decimal("2.00"))
+
+    def test_delete_is_refused(self):
+        price = Price.objects.create(item=self.item, amount=Decimal("1.00"))
+        with self.assertRaises(NotImplementedError):
+            price.delete()
+
+
+class HistoryTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Tools")
+        item = Item.objects.create(
+            name="Hammer", category=category, status=1, price=Decimal("9.99")
+        )
+        self.price = Price.objects.create(item=item, amount=Decimal("1.00"))
+        for amount in ("2.00", "3.00"):
+            self.price.amount = Decimal(amount)
+            self.price.save()
+
+    def test_history_is_a_queryset(self):
+        history = Price.objects.history(self.price.lineage_id)
+        self.assertEqual(list(history.values_list("version", flat=True)), [1, 2, 3])
+        self.assertEqual(history.active().get(), self.price)
+
+    def test_full_history_includes_archived_versions(self):
+        moved = Price.objects.archive(before=timezone.now())
+        self.assertEqual(moved, 2)
+        self.assertEqual(Price.objects.history(self.price.lineage_id).count(), 1)
+        versions = Price.objects.full_history(self.price.lineage_id)
+        self.assertEqual([v.version for v in versions], [1, 2, 3])
+        self.assertEqual(
+            [type(v) for v in versions], [PriceArchive, PriceArchive, Price]
+        )
@@ -0,0 +1,94 @@
+from django.apps import apps
+from django.db.models import DateField, DateTimeField, Field, TimeField
+from django.test import TestCase, override_settings
+from ..fields import AmountField
+from ..paginations import CustomPagination, get_field_kinds, to_camel_case
+from ..serializers import get_model_attributes, get_serializer_class
+from ..viewsets import CustomModelViewSet, get_display_fields
+from ..warmup import iter_viewsets, warm_up
+from .models import Tag
+
+
+def test_models():
+    return [
+        model
+        for model in apps.get_app_config("my_django_app").get_models()
+        if model.__module__ == "my_django_app.tests.models"
+    ]
+
+
+class CachedModelWalkTests(TestCase):
+    """The per-model caches give what the uncached code computed per request."""
+
+    def test_model_attributes(self):
+        for model in test_models():
+            with self.subTest(model=model.__name__):
+                instance = model()
+                properties = {
+                    attr
+                    for attr in dir(instance)
+                    if isinstance(getattr(model, attr, None), property)
+                    and attr != "pk"
+                }
+                attrs, cached_properties = get_model_attributes(model)
+                self.assertEqual(cached_properties, properties)
+                # Only per-instance state is missing from the class
+                self.assertEqual(set(dir(instance)) - set(attrs), {"_state"})
+        self.assertEqual(get_model_attributes(Tag)[1], {"slug"})
+
+    def test_properties_are_serialized(self):
+        tag = Tag.objects.create(label="Big Tag")
+        data = get_serializer_class(Tag)(tag).data
+        self.assertEqual(data["slug"], "big-tag")
+
+    def test_field_kinds(self):
+        kinds = {
+            "related_fields": lambda f: f.is_relation
+            and (f.many_to_one or f.many_to_many or f.one_to_one),
+            "option_fields": lambda f: getattr(f, "choices", None),
+            "datetime_fields": lambda f: isinstance(f, DateTimeField),
+            "date_fields": lambda f: isinstance(f, DateField),
+            "time_fields": lambda f: isinstance(f, TimeField),
+            "price_fields": lambda f: isinstance(f, AmountField),
+        }
+        for model in test_models():
+            with self.subTest(model=model.__name__):
+                expected = {name: [] for name in kinds}
+                for field in model._meta.get_fields():
+                    if not isinstance(field, Field):
+                        continue
+                    # First matching kind, as the uncached if/elif chain did
+                    for name, matches in kinds.items():
+                        if matches(field):
+                            expected[name].append(to_camel_case(field.name))
+                            break
+                paginator = CustomPagination()
+                paginator.model = model
+                metadata = paginator.build_field_metadata([], [])
+                self.assertEqual({name: metadata[name] for name in kinds}, expected)
+                self.assertIs(get_field_kinds(model), get_field_kinds(model))
+
+    def test_display_fields(self):
+        for model in test_models():
+            with self.subTest(model=model.__name__):
+                self.assertEqual(
+                    get_display_fields(model), get_display_fields(model, set())
+                )
+
+
+@override_settings(ROOT_URLCONF="my_django_app.tests.urls")
+class WarmUpTests(TestCase):
+    def test_warm_up(self):
+        viewsets = list(iter_viewsets())
+        self.assertTrue(viewsets)
+        self.assertTrue(all(issubclass(v, CustomModelViewSet) for v in viewsets))
+        self.assertEqual(len(viewsets), len(set(viewsets)))
+
+        with self.assertLogs("my_django_app.warmup", "INFO") as logs:
+            timings = warm_up()
+        self.assertEqual(set(timings), {"urls", "viewsets", "connections"})
+        self.assertEqual([r.levelname for r in logs.records], ["INFO"])
+        self.assertIn(f"Warmed up {len(viewsets)} viewsets", logs.output[0])
+
+        with self.assertLogs("my_django_app.warmup", "INFO"):
+            self.assertNotIn("connections", warm_up(connect=False))
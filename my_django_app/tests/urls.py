@@ -0,0 +1,11 @@
+from django.urls import include, path
+from ..urls import auto_create_urlpatterns, file_url_patterns, profiling_url_patterns
+from . import admin, async_viewsets, viewsets
+
+urlpatterns = [
+    path("admin/", admin.site.urls),
+    path("api/", include(auto_create_urlpatterns(viewsets))),
+    path("aapi/", include(auto_create_urlpatterns(async_viewsets))),
+    path("files/", include(file_url_patterns())),
+    path("profiling/", include(profiling_url_patterns())),
+]
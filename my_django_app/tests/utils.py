@@ -0,0 +1,30 @@
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from .models import Category, Item, Tag
+
+
+def make_items(count, categories=2):
+    categories = [Category.objects.create(name=f"Category {i}") for i in range(categories)]
+    tags = [Tag.objects.create(label=f"tag {i}") for i in range(3)]
+    items = []
+    for i in range(count):
+        item = Item.objects.create(
+            name=f"Item {i}",
+            category=categories[i % len(categories)],
+            status=i % 2,
+            price=Decimal(i) + Decimal("0.50"),
+            qty=i % 10,
+        )
+        item.tags.set(tags[: i % 3])
+        items.append(item)
+    return items
+
+
+@override_settings(ROOT_URLCONF="my_django_app.tests.urls")
+class ApiTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser("admin", "", None)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
@@ -0,0 +1,4 @@
+from ..viewsets import auto_create_viewsets
+from . import models
+
+auto_create_viewsets(models)
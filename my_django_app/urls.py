@@ -1,29 +1,66 @@
+from collections.abc import Sequence
+
+
+class LazyRouterPatterns(Sequence):
+    """
+    The URL patterns of auto_create_urlpatterns(), built the first time
+    they are read: include() keeps this sequence without iterating it, so
+    importing the URLconf registers nothing and the router and its routes
+    are built when the resolver first needs them (or by warmup.warm_up()).
+    Adding it to a list builds it and gives a plain list.
+    """
+
+    def __init__(self, vs_module):
+        self.vs_module = vs_module
+        self._patterns = None
+
+    @property
+    def patterns(self):
+        if self._patterns is None:
+            self._patterns = build_router_urlpatterns(self.vs_module)
+        return self._patterns
+
+    def __getitem__(self, index):
+        return self.patterns[index]
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def __add__(self, other):
+        return [*self.patterns, *other]
+
+    def __radd__(self, other):
+        return [*other, *self.patterns]
+
+
 def auto_create_urlpatterns(vs_module):
+    return LazyRouterPatterns(vs_module)
+
+
+def build_router_urlpatterns(vs_module):
     from django.urls import include, path
     from django.conf import settings
     from django.conf.urls.static import static
     from rest_framework.routers import DefaultRouter
     from rest_framework.viewsets import ViewSetMixin
-    import inflect
     import re
-    from .utils import camel_to_kebab
+    from .utils import camel_to_kebab, pluralize
 
     router = DefaultRouter()
 
-    inflector = inflect.engine()
-
-    for attr_name in dir(vs_module):
-        viewset = getattr(vs_module, attr_name)
+    for attr_name, viewset in sorted(vars(vs_module).items()):
         if (
             isinstance(viewset, type)
             and issubclass(viewset, ViewSetMixin)
             and attr_name != "CustomModelViewSet"
             and attr_name != "viewset"
+            # Base classes such as AsyncCustomModelViewSet have no queryset
+            and getattr(viewset, "queryset", None) is not None
         ):
             base = re.sub(r"ViewSet$", "", attr_name)
             if base != "CustomModel":
                 kebab = camel_to_kebab(base)
-                route = inflector.plural(kebab)
+                route = pluralize(kebab)
                 router.register(route, viewset, basename=viewset.__module__ + route)
 
     urlpatterns = [
@@ -45,3 +82,30 @@ def auth_url_patterns():
     ]
 
     return urlpatterns
+
+
+def profiling_url_patterns():
+    from django.urls import path
+    from . import profiling
+
+    urlpatterns = [
+        path("profiles/", profiling.profile_list, name="profiles"),
+        path(
+            "profiles/<str:name>",
+            profiling.profile_download,
+            name="profile-download",
+        ),
+    ]
+
+    return urlpatterns
+
+
+def file_url_patterns():
+    from django.urls import path
+    from . import storage
+
+    urlpatterns = [
+        path("<path:name>", storage.hashed_file, name="hashed-file"),
+    ]
+
+    return urlpatterns
@@ -14,6 +14,9 @@ from datetime import datetime
 from django.utils import timezone
 import socket
 import os
+import sys
+from functools import lru_cache
+from importlib.util import find_spec
 from dotenv import load_dotenv
 from django.db.models import Aggregate, FloatField, F, ExpressionWrapper
 from django.db.models.fields.related import ForeignObjectRel, ManyToManyRel
@@ -188,6 +191,37 @@ def camel_to_kebab(name: str) -> str:
     return re.sub(r"(?<!^)(?=[A-Z])", "-", name).lower()
 
 
+@lru_cache(maxsize=None)
+def get_inflect_engine():
+    # inflect is slow to import and to build, only pay for it when used
+    import inflect
+
+    return inflect.engine()
+
+
+@lru_cache(maxsize=None)
+def pluralize(word: str) -> str:
+    return get_inflect_engine().plural(word)
+
+
+def get_app_model(app_label: str, model_name: str):
+    """
+    Model registered under app_label with exactly this class name, or None.
+    Uses the registry's own name index instead of scanning every model.
+    """
+    from django.apps import apps
+
+    model = apps.all_models.get(app_label, {}).get(model_name.lower())
+    if model is not None and model.__name__ == model_name:
+        return model
+    return None
+
+
+def get_caller_module(depth: int = 1) -> str:
+    """Name of the module calling the function that calls this."""
+    return sys._getframe(depth + 1).f_globals["__name__"]
+
+
 def LOAD_ENV(BASE_DIR):
     load_dotenv(os.path.join(BASE_DIR, ".env"), override=True)
     env_type = os.environ.get("ENV")
@@ -238,6 +272,104 @@ def GET_BOOL(key: str, default: str = "False") -> bool:
     return val in ("true", "1", "yes")
 
 
+# Connection defaults per ENV. The Pi pays most for connecting, so it
+# keeps connections longest; local development keeps per-request ones.
+DATABASE_PROFILES = {
+    "local": {"CONN_MAX_AGE": 0, "POOL": False, "POOL_MIN_SIZE": 1, "POOL_MAX_SIZE": 4},
+    "lan": {"CONN_MAX_AGE": 60, "POOL": True, "POOL_MIN_SIZE": 2, "POOL_MAX_SIZE": 8},
+    "rpi": {"CONN_MAX_AGE": 600, "POOL": True, "POOL_MIN_SIZE": 1, "POOL_MAX_SIZE": 4},
+    "production": {
+        "CONN_MAX_AGE": 60,
+        "POOL": True,
+        "POOL_MIN_SIZE": 4,
+        "POOL_MAX_SIZE": 20,
+    },
+}
+
+
+def GET_DATABASES() -> dict:
+    """
+    DATABASES built from DB_* env vars, with connection defaults for ENV
+    (see DATABASE_PROFILES), plus the replicas of GET_REPLICA_DATABASES().
+
+        DB_ENGINE (postgresql), DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+        DB_CONN_MAX_AGE, DB_CONN_HEALTH_CHECKS
+        DB_POOL, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT
+        DB_DISABLE_SERVER_SIDE_CURSORS  # true behind a transaction-mode pgbouncer
+
+    The psycopg pool is only used with psycopg 3 and psycopg_pool installed;
+    pooled connections are returned after each request, so CONN_MAX_AGE is
+    0 with the pool. Without it, persistent connections are health checked.
+    """
+    env_type = GET_ENV("ENV", "local")
+    profile = DATABASE_PROFILES.get(env_type, DATABASE_PROFILES["local"])
+    engine = GET_ENV("DB_ENGINE", "postgresql")
+    if "." not in engine:
+        engine = f"django.db.backends.{engine}"
+
+    default = {
+        "ENGINE": engine,
+        "NAME": GET_ENV("DB_NAME"),
+        "CONN_MAX_AGE": int(GET_ENV("DB_CONN_MAX_AGE", str(profile["CONN_MAX_AGE"]))),
+        "CONN_HEALTH_CHECKS": GET_BOOL("DB_CONN_HEALTH_CHECKS", "True"),
+        "OPTIONS": {},
+    }
+    if not engine.endswith("sqlite3"):
+        default.update(
+            {
+                "USER": GET_ENV("DB_USER"),
+                "PASSWORD": GET_ENV("DB_PASSWORD"),
+                "HOST": GET_ENV("DB_HOST", "localhost"),
+                "PORT": GET_ENV("DB_PORT", "5432"),
+                "DISABLE_SERVER_SIDE_CURSORS": GET_BOOL(
+                    "DB_DISABLE_SERVER_SIDE_CURSORS"
+                ),
+            }
+        )
+        use_pool = GET_BOOL("DB_POOL", str(profile["POOL"]))
+        if use_pool and find_spec("psycopg") and find_spec("psycopg_pool"):
+            default["CONN_MAX_AGE"] = 0
+            default["OPTIONS"]["pool"] = {
+                "min_size": int(
+                    GET_ENV("DB_POOL_MIN_SIZE", str(profile["POOL_MIN_SIZE"]))
+                ),
+                "max_size": int(
+                    GET_ENV("DB_POOL_MAX_SIZE", str(profile["POOL_MAX_SIZE"]))
+                ),
+                "timeout": float(GET_ENV("DB_POOL_TIMEOUT", "10")),
+            }
+
+    return {"default": default, **GET_REPLICA_DATABASES(default)}
+
+
+def GET_REPLICA_DATABASES(primary: dict) -> dict:
+    """
+    replica_1, replica_2, ... copied from the primary's settings with the
+    hosts in DB_REPLICA_HOSTS (host or host:port), or the database names
+    in DB_REPLICA_NAMES (e.g. SQLite files for local testing).
+    Tests run them as mirrors of the primary.
+    """
+    replicas = {}
+    hosts = GET_ENV_LIST("DB_REPLICA_HOSTS")
+    names = GET_ENV_LIST("DB_REPLICA_NAMES")
+    for i, value in enumerate(hosts or names, start=1):
+        conf = {
+            **primary,
+            "OPTIONS": {**primary.get("OPTIONS", {})},
+            "REPLICA": True,
+            "TEST": {"MIRROR": "default"},
+        }
+        if hosts:
+            host, _, port = value.partition(":")
+            conf["HOST"] = host
+            if port:
+                conf["PORT"] = port
+        else:
+            conf["NAME"] = value
+        replicas[f"replica_{i}"] = conf
+    return replicas
+
+
 class SumProduct(Aggregate):
     function = "SUM"
     template = "%(function)s(%(expressions)s)"
@@ -294,3 +426,17 @@ def CannotEqual(field1: str, field2: str, model_name: str = None, name: str = No
             raise ValueError("model_name is required if name is not provided")
         name = f"{model_name.lower()}_cannot_equal_{field1}_{field2}"
     return models.CheckConstraint(check=~Q(**{field1: F(field2)}), name=name)
+
+
+def UniqueWhenAlive(*fields: str, model_name: str = None, name: str = None):
+    """
+    Unique constraint that only applies to rows that are not soft-deleted,
+    so a deleted row never blocks re-creating the same value.
+    Defaults to an app/class interpolated name when declared on an abstract model.
+    """
+    if not name:
+        prefix = model_name.lower() if model_name else "%(app_label)s_%(class)s"
+        name = f"{prefix}_alive_unique_{'_'.join(fields)}"
+    return models.UniqueConstraint(
+        fields=list(fields), condition=Q(deleted_at__isnull=True), name=name
+    )
@@ -8,7 +8,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from django.conf import settings
-import os
+from .storage import content_storage
 from django.http import JsonResponse
 from .viewsets import CustomAuthentication
 from django.views.decorators.csrf import ensure_csrf_cookie
@@ -34,16 +34,13 @@ class RegistrationAPI(generics.GenericAPIView):
     api_view = ["POST", "GET"]
 
     def upload(self, request):
-        uploaded_filename = request.FILES["avatar"].name
-        try:
-            os.mkdir(settings.STATICFILES_DIRS[0])
-        except:
-            pass
-        full_filename = os.path.join(settings.STATICFILES_DIRS[0], uploaded_filename)
-        fout = open(full_filename, "wb+")
-        with request.FILES["avatar"] as f:
-            fout.write(f.read())
-        fout.close()
+        """Store the avatar content-addressed and return its URL."""
+        name = content_storage.save(
+            request.FILES["avatar"].name, request.FILES["avatar"]
+        )
+        # Only the returned URL refers to it, keep it from collect_garbage()
+        content_storage.pin(name)
+        return content_storage.url(name)
 
     def get(self, request):
         return response.Response()
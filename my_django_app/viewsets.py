@@ -3,7 +3,7 @@ from .serializers import *
 from .permissions import CustomDjangoModelPermission
 from knox.auth import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
-from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
 from django.db.models import Q
 import json
 from lzstring import LZString
@@ -11,13 +11,41 @@ from django.db.models import CharField
 from django.utils.module_loading import import_string
 from . import fields
 import sys
-import inspect
 from django.db.models.functions import Concat
+from .utils import get_app_model, get_caller_module
+from functools import lru_cache
+import asyncio
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.core.paginator import InvalidPage
+from django.shortcuts import aget_object_or_404
+from django.utils.decorators import classonlymethod
+from rest_framework import exceptions
+from rest_framework.decorators import action
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from .exports import EXPORT_FORMATS, aiter_export, iter_export
+from .aggregates import aggregate_queryset
+from .imports import (
+    IMPORT_FORMATS,
+    check_job_cache,
+    get_import_job,
+    guess_import_format,
+    import_rows,
+    start_import_job,
+)
+import tempfile
+import time
+from django.conf import settings
+from djangorestframework_camel_case.util import camel_to_underscore
+from .renderers import get_renderer_classes
+from .routers import get_read_alias, mark_sticky, SAFE_METHODS
+from .index_advisor import record_list_shape, sample_list_shape, write_list_shape
 from django.db.models import BooleanField, Value, F, Case, When, CharField
+from django.db.models import ForeignObjectRel, Prefetch
 
 
 class CustomAuthentication(TokenAuthentication):
-    def authenticate(self, request):
+    def get_token(self, request):
         token = request.COOKIES.get("knox_token")
 
         if not token:
@@ -26,12 +54,27 @@ class CustomAuthentication(TokenAuthentication):
                 token = token.split("Token ")[1]
             elif "token" in request.data:
                 token = request.data.get("token")
+        return token
+
+    def authenticate(self, request):
+        token = self.get_token(request)
 
         if token:
             return self.authenticate_credentials(token.encode("utf-8"))
 
         return None
 
+    async def aauthenticate(self, request):
+        token = self.get_token(request)
+
+        if token:
+            # knox looks up and renews the token through the sync ORM
+            return await sync_to_async(self.authenticate_credentials)(
+                token.encode("utf-8")
+            )
+
+        return None
+
 
 def decode_query_param(encoded_param):
     lz = LZString()
@@ -40,7 +83,7 @@ def decode_query_param(encoded_param):
 
 def get_display_fields(model, visited=None, depth=0, max_depth=2):
     if visited is None:
-        visited = set()
+        return list(_cached_display_fields(model, depth, max_depth))
     if model in visited or depth > max_depth:
         return []
 
@@ -63,6 +106,11 @@ def get_display_fields(model, visited=None, depth=0, max_depth=2):
     return result
 
 
+@lru_cache(maxsize=None)
+def _cached_display_fields(model, depth, max_depth):
+    return tuple(get_display_fields(model, set(), depth, max_depth))
+
+
 def annotate_display_name(queryset):
     display_fields = get_display_fields(queryset.model)
 
@@ -133,6 +181,11 @@ def annotate_display_name(queryset):
 
 
 def get_char_fields(model, prefix="", depth=0, max_depth=2):
+    return list(_cached_char_fields(model, prefix, depth, max_depth))
+
+
+@lru_cache(maxsize=None)
+def _cached_char_fields(model, prefix, depth, max_depth):
     if depth > max_depth:
         return []
 
@@ -147,14 +200,105 @@ def get_char_fields(model, prefix="", depth=0, max_depth=2):
             and not f.many_to_many
         ):
             char_fields.extend(
-                get_char_fields(
+                _cached_char_fields(
                     f.related_model,
-                    prefix=f"{prefix}{f.name}__",
-                    depth=depth + 1,
-                    max_depth=max_depth,
+                    f"{prefix}{f.name}__",
+                    depth + 1,
+                    max_depth,
                 )
             )
-    return char_fields
+    return tuple(char_fields)
+
+
+def parse_field_list(model, value):
+    """'name,categoryId,category_id' -> {"name", "category"}"""
+    attnames = {f.attname: f.name for f in model._meta.concrete_fields}
+    names = set()
+    for name in value.split(","):
+        name = camel_to_underscore(name.strip())
+        if name:
+            names.add(attnames.get(name, name))
+    return names
+
+
+def get_sparse_columns(model, selected):
+    """
+    The columns to load with only() for the selected serializer fields, or
+    None when the whole row is needed: display_name (__str__) and
+    properties may read any column.
+    """
+    _, properties = get_model_attributes(model)
+    if "display_name" in selected or selected & properties:
+        return None
+    return [
+        f.name
+        for f in model._meta.concrete_fields
+        if f.primary_key or f.name in selected
+    ]
+
+
+def parse_expand(model, value, allowed=None, max_depth=2):
+    """
+    'category,category.parent,tags' -> {"category": {"parent": {}}, "tags": {}}.
+    Paths are checked against the allowed dotted paths (a prefix of one is
+    allowed too); without an allowlist every forward relation may be
+    expanded, reverse relations never.
+    """
+    tree = {}
+    for path in filter(None, (p.strip() for p in value.split(","))):
+        parts = [camel_to_underscore(part) for part in path.split(".")]
+        dotted = ".".join(parts)
+        if len(parts) > max_depth:
+            raise exceptions.ValidationError(
+                {"expand": f"{dotted} is deeper than {max_depth} levels."}
+            )
+        if allowed is not None and not any(
+            a == dotted or a.startswith(dotted + ".") for a in allowed
+        ):
+            raise exceptions.ValidationError({"expand": f"Cannot expand {dotted}."})
+        node, current = tree, model
+        for part in parts:
+            attnames = {f.attname: f.name for f in current._meta.concrete_fields}
+            name = attnames.get(part, part)
+            relation = get_relations(current).get(name)
+            if relation is None or (
+                allowed is None and isinstance(relation, ForeignObjectRel)
+            ):
+                raise exceptions.ValidationError({"expand": f"Cannot expand {dotted}."})
+            node = node.setdefault(name, {})
+            current = relation.related_model
+    return tree
+
+
+def freeze_expand(tree):
+    """Hashable form of an expand tree, ((name, subtree), ...)."""
+    return tuple(sorted((name, freeze_expand(sub)) for name, sub in tree.items()))
+
+
+def iter_expanded_models(model, expand):
+    for name, subtree in expand:
+        related = get_relations(model)[name].related_model
+        yield related
+        yield from iter_expanded_models(related, subtree)
+
+
+def expand_queryset(queryset, expand):
+    """
+    Load the relations of a frozen expand tree with the queryset, one query
+    per relation. The related rows carry the display_name annotation, which
+    the nested serializers read instead of calling __str__ (that may load
+    more relations per row), and their many-to-many ids are prefetched.
+    """
+    model = queryset.model
+    for name, subtree in expand:
+        related = get_relations(model)[name].related_model
+        expanded = {child for child, _ in subtree}
+        nested = related._default_manager.prefetch_related(
+            *[f.name for f in related._meta.many_to_many if f.name not in expanded]
+        )
+        nested = annotate_display_name(expand_queryset(nested, subtree))
+        queryset = queryset.prefetch_related(Prefetch(name, nested))
+    return queryset
 
 
 class CustomModelViewSet(viewsets.ModelViewSet):
@@ -164,23 +308,21 @@ class CustomModelViewSet(viewsets.ModelViewSet):
         CustomDjangoModelPermission,
     ]
     authentication_classes = (CustomAuthentication,)
+    renderer_classes = get_renderer_classes()
+    # Dotted paths ?expand= may follow, e.g. ["category", "category.parent"].
+    # None allows every forward relation.
+    expandable_fields = None
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
 
-        if cls.__name__ == "CustomModelViewSet":
+        if cls.__name__ == "CustomModelViewSet" or cls.queryset is None:
             return
 
         model_name = cls.__name__.replace("ViewSet", "")
-        model = next(
-            (
-                m
-                for m in apps.get_models()
-                if m.__name__ == model_name
-                and m._meta.app_label == cls.queryset.model._meta.app_label
-            ),
-            None,
-        )
+        model = cls.queryset.model
+        if model.__name__ != model_name:
+            model = get_app_model(model._meta.app_label, model_name)
 
         if model:
             cls.queryset = model.objects.all()
@@ -190,9 +332,51 @@ class CustomModelViewSet(viewsets.ModelViewSet):
             except ImportError:
                 pass
 
-    def list(self, request, *args, **kwargs):
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.read_alias = get_read_alias(request)
+        self.expand = self.get_expand()
+
+    def get_expand(self):
+        """
+        The frozen ?expand= tree of list and retrieve requests. The user
+        needs view permission on every expanded model.
+        """
+        if self.action not in ("list", "retrieve"):
+            return ()
+        model = self.queryset.model
+        expand = freeze_expand(
+            parse_expand(
+                model,
+                self.request.query_params.get("expand", ""),
+                self.expandable_fields,
+                getattr(settings, "EXPAND_MAX_DEPTH", 2),
+            )
+        )
+        for related in iter_expanded_models(model, expand):
+            opts = related._meta
+            if not self.request.user.has_perm(f"{opts.app_label}.view_{opts.model_name}"):
+                raise exceptions.PermissionDenied(f"Cannot expand {opts.verbose_name}.")
+        return expand
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        expand = getattr(self, "expand", ())
+        if expand:
+            queryset = expand_queryset(queryset, expand)
+        # Reads of safe requests go to a replica, see routers.py
+        alias = getattr(self, "read_alias", None)
+        return queryset.using(alias) if alias else queryset
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            mark_sticky(request, response)
+        return response
+
+    def get_list_params(self):
+        """(params, order_by) of the request, with the LZString `q` payload decoded."""
         params = self.request.query_params.copy()
-        page_param = params.get("page", None)
         order_by = params.pop("order_by", [])
         encoded = params.get("q", None)
 
@@ -203,7 +387,56 @@ class CustomModelViewSet(viewsets.ModelViewSet):
                 params = decoded_params
             except Exception as e:
                 print("Decoding failed:", e)
+        return params, order_by
+
+    def get_sparse_fields(self):
+        """
+        (requested, omitted) field names from ?fields= and ?omit=, camelCase
+        or snake_case and comma separated. requested is None without ?fields=.
+        """
+        query_params = self.request.query_params
+        model = self.queryset.model
+        requested = query_params.get("fields")
+        if requested is not None:
+            requested = parse_field_list(model, requested) | {"id"}
+            # Expanded relations are part of the response
+            requested |= {name for name, _ in getattr(self, "expand", ())}
+        omitted = parse_field_list(model, query_params.get("omit", "")) - {"id"}
+        return requested, omitted
+
+    def get_selected_fields(self):
+        """The serializer fields the response keeps, or None for all of them."""
+        requested, omitted = self.get_sparse_fields()
+        if requested is None and not omitted:
+            return None
+        if requested is None:
+            model = self.queryset.model
+            _, properties = get_model_attributes(model)
+            requested = {
+                f.name
+                for f in model._meta.get_fields()
+                if f.concrete or not f.auto_created
+            }
+            requested |= properties | {"display_name"}
+        return requested - omitted
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ("list", "retrieve"):
+            context["fields"], context["omit"] = self.get_sparse_fields()
+            context["expand"] = getattr(self, "expand", ())
+        return context
+
+    def get_paginated_response(self, data):
+        self.paginator.fields = self.get_selected_fields()
+        self.paginator.include_meta = self.request.query_params.get("meta") not in (
+            "0",
+            "false",
+        )
+        return super().get_paginated_response(data)
 
+    def filter_list_queryset(self, queryset, params, order_by):
+        """Apply the filter, search, exclude and order_by params list() accepts."""
         filter_kwargs = {}
         exclude_kwargs = {}
         search_q = Q()
@@ -252,9 +485,25 @@ class CustomModelViewSet(viewsets.ModelViewSet):
                 else:
                     filter_kwargs[key] = value
 
+        # The display_name annotation joins the display FKs, skip it when unused
+        selected = self.get_selected_fields()
+        filtered_on_display = any(
+            key.startswith("display_name") for key in params
+        ) or any("display_name" in key for key in order_by)
+        if self.action == "aggregate":
+            if filtered_on_display:
+                queryset = annotate_display_name(queryset)
+        elif (
+            selected is None or "display_name" in selected or filtered_on_display
+        ):
+            queryset = annotate_display_name(queryset)
+        else:
+            columns = get_sparse_columns(queryset.model, selected)
+            if columns is not None:
+                queryset = queryset.only(*columns)
+
         queryset = (
-            annotate_display_name(self.filter_queryset(self.get_queryset()))
-            .filter(**filter_kwargs)
+            queryset.filter(**filter_kwargs)
             .filter(search_q)
             .exclude(**exclude_kwargs)
         )
@@ -266,6 +515,14 @@ class CustomModelViewSet(viewsets.ModelViewSet):
                 print("Order failed:", e)
         else:
             queryset = queryset.order_by("-id")
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        started = time.perf_counter()
+        params, order_by = self.get_list_params()
+        queryset = self.filter_list_queryset(
+            self.filter_queryset(self.get_queryset()), params, order_by
+        )
 
         self.paginator.model = queryset.model
 
@@ -278,37 +535,343 @@ class CustomModelViewSet(viewsets.ModelViewSet):
         queryset = self.paginate_queryset(queryset)
         if queryset is not None:
             serializer = self.get_serializer(queryset, many=True)
-            return self.get_paginated_response(serializer.data)
+            data = serializer.data
+            record_list_shape(
+                self.paginator.model, params, order_by, time.perf_counter() - started
+            )
+            return self.get_paginated_response(data)
+
+    def get_export_queryset(self, request):
+        """(queryset, export format) for an export request."""
+        export_format = request.query_params.get("export_format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            raise exceptions.ValidationError(
+                {"export_format": f"Choose one of {', '.join(EXPORT_FORMATS)}."}
+            )
+        params, order_by = self.get_list_params()
+        queryset = self.filter_list_queryset(
+            self.filter_queryset(self.get_queryset()), params, order_by
+        )
+        return queryset, export_format
 
+    def get_export_response(self, lines, model, export_format):
+        filename = f"{model._meta.model_name}-{timezone.localdate():%Y%m%d}.{export_format}"
+        response = StreamingHttpResponse(
+            lines, content_type=EXPORT_FORMATS[export_format]
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=False, methods=["get"])
+    def export(self, request, *args, **kwargs):
+        """
+        Stream the rows list() would return as CSV, TSV or NDJSON,
+        chosen with ?export_format= (DRF reserves ?format=).
+        """
+        queryset, export_format = self.get_export_queryset(request)
+        lines = iter_export(
+            queryset,
+            export_format,
+            self.get_selected_fields(),
+            # Rows fetched per round trip of the server-side cursor
+            chunk_size=getattr(settings, "EXPORT_CHUNK_SIZE", 2000),
+        )
+        return self.get_export_response(lines, queryset.model, export_format)
+
+    @action(detail=False, methods=["get"])
+    def aggregate(self, request, *args, **kwargs):
+        """
+        Grouped measures over the rows list() would return, in one GROUP BY:
+        ?group_by=category,status&measures=count,sum:price,avg:price.
+        See aggregates.py for the measures and ?sample=.
+        """
+        params, order_by = self.get_list_params()
+        for name in ("group_by", "measures", "sample"):
+            params.pop(name, None)
+        queryset = self.filter_list_queryset(
+            self.filter_queryset(self.get_queryset()), params, order_by
+        )
+        query_params = request.query_params
+        return response.Response(
+            aggregate_queryset(
+                queryset,
+                query_params.get("group_by", ""),
+                query_params.get("measures", ""),
+                sample=query_params.get("sample"),
+                max_groups=getattr(settings, "AGGREGATE_MAX_GROUPS", 10000),
+            )
+        )
 
-def auto_create_viewsets(models, excluded_models=None):
-    all_viewsets = []
-    frame = inspect.stack()[1]
-    caller_module = inspect.getmodule(frame[0])
-    target_module = caller_module.__name__
+    @action(detail=False, methods=["get", "post"], url_path="import")
+    def import_rows(self, request, *args, **kwargs):
+        """
+        POST a CSV, TSV or NDJSON `file` to create rows, or update the ones
+        whose `id` exists. ?dry_run=true only validates, ?background=true
+        returns a job id to poll with GET ?job=<id>. Background jobs need a
+        shared cache and run in this worker, so they do not survive it.
+        """
+        if request.method == "GET":
+            job = get_import_job(request.query_params.get("job", ""))
+            if job is None:
+                raise exceptions.NotFound("Unknown import job.")
+            return response.Response(job)
+
+        model = self.queryset.model
+        perms = [
+            f"{model._meta.app_label}.{action}_{model._meta.model_name}"
+            for action in ("add", "change")
+        ]
+        if not request.user.has_perms(perms):
+            raise exceptions.PermissionDenied()
+
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise exceptions.ValidationError({"file": "Upload a CSV or NDJSON file."})
+        import_format = request.query_params.get(
+            "import_format", guess_import_format(upload.name)
+        )
+        if import_format not in IMPORT_FORMATS:
+            raise exceptions.ValidationError(
+                {"import_format": f"Choose one of {', '.join(IMPORT_FORMATS)}."}
+            )
+        try:
+            batch_size = int(request.query_params.get("batch_size", 1000))
+        except ValueError:
+            batch_size = 0
+        if batch_size < 1:
+            raise exceptions.ValidationError({"batch_size": "Use a positive integer."})
+        options = {
+            "batch_size": batch_size,
+            "dry_run": request.query_params.get("dry_run") in ("1", "true"),
+        }
+
+        if request.query_params.get("background") in ("1", "true"):
+            try:
+                check_job_cache()
+            except ImproperlyConfigured as e:
+                raise exceptions.ValidationError({"background": str(e)})
+            with tempfile.NamedTemporaryFile(delete=False) as f:
+                for chunk in upload.chunks():
+                    f.write(chunk)
+            job_id = start_import_job(
+                self.get_serializer_class(), f.name, import_format, **options
+            )
+            return response.Response({"job": job_id}, status=202)
 
-    excluded_models = excluded_models or []
+        result = import_rows(
+            self.get_serializer_class(), upload, import_format, **options
+        )
+        return response.Response(result, status=400 if "error" in result else 200)
 
-    for name in dir(models):
-        obj = getattr(models, name)
-        if name in excluded_models:
-            continue
-        if (
-            isinstance(obj, type)
-            and issubclass(obj, fields.CustomModel)
-            and obj.__module__ == models.__name__
-        ):
-            model_class = obj
-            model_name = model_class.__name__
-            viewset_name = f"{model_name}ViewSet"
-            viewset = type(
-                name + "ViewSet",
-                (CustomModelViewSet,),
-                {
-                    "__module__": target_module,
-                    "queryset": model_class.objects.all(),
-                },
+
+class AsyncCustomModelViewSet(CustomModelViewSet):
+    """
+    CustomModelViewSet for ASGI deployments.
+
+    Authentication, list and retrieve use the async ORM. Serialization and
+    the pagination metadata (which may touch related objects) run in a
+    worker thread, as do the other actions.
+    """
+
+    @classonlymethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        # dispatch() returns a coroutine, let Django await it
+        return markcoroutinefunction(view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.aperform_authentication(request)
+        # Model permissions may load the user's permissions from the database
+        await sync_to_async(self.check_permissions)(request)
+        self.check_throttles(request)
+        self.read_alias = await sync_to_async(get_read_alias)(request)
+        self.expand = await sync_to_async(self.get_expand)()
+
+    async def aperform_authentication(self, request):
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, "aauthenticate"):
+                    user_auth = await authenticator.aauthenticate(request)
+                else:
+                    user_auth = await sync_to_async(authenticator.authenticate)(
+                        request
+                    )
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth
+                return
+
+        request._not_authenticated()
+
+    async def apaginate(self, queryset):
+        """
+        The page (or every row for page=all) of the queryset. The count and
+        the rows are two queries run one after the other: the async ORM
+        sends both through the same connection.
+        """
+        paginator = self.paginator
+        request = self.request
+        paginator.request = request
+        paginator.page_param = request.query_params.get(paginator.page_query_param)
+
+        if paginator.page_param == "all":
+            paginator.all_data = [obj async for obj in queryset.aiterator()]
+            return paginator.all_data
+
+        page_size = paginator.get_page_size(request)
+        if not page_size:
+            return [obj async for obj in queryset.aiterator()]
+
+        django_paginator = paginator.django_paginator_class(queryset, page_size)
+        number = paginator.page_param or 1
+        if number in paginator.last_page_strings:
+            number = None  # resolved once the count is known
+        else:
+            try:
+                number = int(number)
+            except (TypeError, ValueError):
+                raise exceptions.NotFound(
+                    paginator.invalid_page_message.format(
+                        page_number=number,
+                        message="That page number is not an integer",
+                    )
+                )
+
+        async def fetch(offset):
+            return [obj async for obj in queryset[offset : offset + page_size]]
+
+        django_paginator.__dict__["count"] = await queryset.acount()
+        if number is None:
+            number = django_paginator.num_pages
+        rows = await fetch(max(number - 1, 0) * page_size)
+
+        try:
+            number = django_paginator.validate_number(number)
+        except InvalidPage as exc:
+            raise exceptions.NotFound(
+                paginator.invalid_page_message.format(
+                    page_number=number, message=str(exc)
+                )
             )
-            all_viewsets.append(viewset)
-            setattr(sys.modules[target_module], viewset_name, viewset)
+        paginator.page = django_paginator.page(number)
+        paginator.page.object_list = rows
+        return rows
+
+    def get_page_response(self, rows):
+        serializer = self.get_serializer(rows, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    async def list(self, request, *args, **kwargs):
+        started = time.perf_counter()
+        params, order_by = self.get_list_params()
+        queryset = self.filter_list_queryset(
+            self.filter_queryset(self.get_queryset()), params, order_by
+        )
+
+        self.paginator.model = queryset.model
+
+        check_last_updated = params.get("check_last_updated")
+        last_updated = params.get("last_updated")
+        if check_last_updated:
+            queryset = queryset.filter(updated_at__gte=last_updated)
+            return response.Response({"count": await queryset.acount()})
+
+        rows = await self.apaginate(queryset)
+        page_response = await sync_to_async(self.get_page_response)(rows)
+        shape = sample_list_shape(
+            self.paginator.model, params, order_by, time.perf_counter() - started
+        )
+        if shape is not None:
+            # File I/O, kept off the event loop
+            await sync_to_async(write_list_shape, thread_sensitive=False)(shape)
+        return page_response
+
+    @action(detail=False, methods=["get"])
+    async def export(self, request, *args, **kwargs):
+        """
+        export() from an async iterator: ASGI servers buffer a sync one
+        whole before sending it.
+        """
+        queryset, export_format = self.get_export_queryset(request)
+        lines = aiter_export(
+            queryset,
+            export_format,
+            self.get_selected_fields(),
+            chunk_size=getattr(settings, "EXPORT_CHUNK_SIZE", 2000),
+        )
+        return self.get_export_response(lines, queryset.model, export_format)
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = await aget_object_or_404(
+            queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        await sync_to_async(self.check_object_permissions)(self.request, obj)
+        return obj
+
+    async def retrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        data = await sync_to_async(lambda: self.get_serializer(instance).data)()
+        return response.Response(data)
+
+
+def auto_create_viewsets(
+    models, excluded_models=None, target_module=None, viewset_class=None
+):
+    all_viewsets = []
+    target_module = target_module or get_caller_module()
+    viewset_class = viewset_class or CustomModelViewSet
+
+    for name, model_class in fields.iter_custom_models(models, excluded_models):
+        model_name = model_class.__name__
+        viewset_name = f"{model_name}ViewSet"
+        viewset = type(
+            name + "ViewSet",
+            (viewset_class,),
+            {
+                "__module__": target_module,
+                "queryset": model_class.objects.all(),
+            },
+        )
+        all_viewsets.append(viewset)
+        setattr(sys.modules[target_module], viewset_name, viewset)
     return all_viewsets
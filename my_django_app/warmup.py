@@ -0,0 +1,107 @@
+"""
+Warm-up for fresh worker processes.
+
+Everything here is otherwise built lazily by the first request a worker
+serves: the URL resolver, serializer fields, display/search field walks,
+pagination metadata, plurals and database connections.
+
+gunicorn.conf.py:
+
+    preload_app = True
+    from my_django_app.warmup import when_ready, post_worker_init
+"""
+
+import logging
+from time import perf_counter
+from django.db import connections
+from django.urls import URLPattern, URLResolver, get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def iter_viewsets(patterns=None):
+    """Yield every CustomModelViewSet routed in the URLconf, once."""
+    from .viewsets import CustomModelViewSet
+
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    seen = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            viewsets = iter_viewsets(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            cls = getattr(pattern.callback, "cls", None)
+            viewsets = [cls] if cls else []
+        else:
+            continue
+        for cls in viewsets:
+            if issubclass(cls, CustomModelViewSet) and cls not in seen:
+                seen.add(cls)
+                yield cls
+
+
+def warm_viewset(viewset):
+    from .paginations import get_field_kinds
+    from .viewsets import annotate_display_name, get_char_fields, get_display_fields
+
+    model = viewset.queryset.model
+    get_display_fields(model)
+    get_char_fields(model)
+    get_field_kinds(model)
+    str(model._meta.verbose_name_plural)
+    if viewset.serializer_class is not None:
+        viewset.serializer_class().fields
+    # Resolve the display_name expressions once; needs no connection
+    queryset = annotate_display_name(model.objects.all())
+    queryset.query.get_compiler(queryset.db).as_sql()
+
+
+def connect_all():
+    for conn in connections.all():
+        conn.ensure_connection()
+
+
+def warm_up(connect=True):
+    """
+    Build the per-process caches and optionally open database connections.
+    Returns the time spent per stage, in seconds.
+    """
+    timings = {}
+
+    start = perf_counter()
+    resolver = get_resolver()
+    # Populating the reverse dict compiles every route regex
+    resolver.reverse_dict
+    viewsets = list(iter_viewsets())
+    timings["urls"] = perf_counter() - start
+
+    start = perf_counter()
+    for viewset in viewsets:
+        try:
+            warm_viewset(viewset)
+        except Exception:
+            logger.exception("Warm-up failed for %s", viewset.__name__)
+    timings["viewsets"] = perf_counter() - start
+
+    if connect:
+        start = perf_counter()
+        connect_all()
+        timings["connections"] = perf_counter() - start
+
+    logger.info(
+        "Warmed up %d viewsets (%s)",
+        len(viewsets),
+        ", ".join(f"{k} {v * 1000:.0f} ms" for k, v in timings.items()),
+    )
+    return timings
+
+
+def when_ready(server):
+    """gunicorn hook: with preload_app, warm up the master once before forking."""
+    # Connections must not be shared with the forked workers
+    warm_up(connect=False)
+
+
+def post_worker_init(worker):
+    """gunicorn hook: runs in each worker once the application is loaded."""
+    warm_up(connect=True)